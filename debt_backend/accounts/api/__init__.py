@@ -1,5 +1,5 @@
-from accounts.api.friend_requests import FriendRequestAPIView
-from accounts.api.friends import FriendAPIView
+from accounts.api.friend_requests import FriendRequestAPIView, FriendRequestBulkAPIView
+from accounts.api.friends import FriendAPIView, FriendDetailAPIView, FriendSuggestionAPIView
 from accounts.api.tokens import (
     DecoratedTokenObtainPairView,
     DecoratedTokenRefreshView,
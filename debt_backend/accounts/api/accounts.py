@@ -1,11 +1,12 @@
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from accounts import selectors
 from accounts.models import Account
 from accounts.serializers import (
     InputAccountRegisterSerializer,
@@ -64,6 +65,8 @@ class AccountAPIView(APIView):
         if current_user.id == pk:
             user = current_user
         else:
-            user = get_object_or_404(current_user.friends.all(), pk=pk)
+            if not selectors.are_friends(current_user, pk):
+                raise NotFound
+            user = get_object_or_404(Account, pk=pk)
         data = OutputAccountSerializer(user).data
         return Response(data=data, status=status.HTTP_200_OK)
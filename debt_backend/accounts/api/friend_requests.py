@@ -9,9 +9,15 @@ from accounts.models import Account
 from accounts.serializers import (
     OutputFriendRequestSerializer,
     InputFriendRequestSerializer,
+    InputFriendRequestBulkSerializer,
     InputFriendRequestUpdateSerializer,
 )
-from accounts.services import CreateFriendRequestService, UpdateFriendRequestService
+from accounts.services import (
+    BulkCreateFriendRequestService,
+    CreateFriendRequestService,
+    UpdateFriendRequestService,
+)
+from idempotency import IdempotentResponse, idempotent
 
 
 class FriendRequestAPIView(APIView):
@@ -38,6 +44,7 @@ In cases like:
  - etc...
 """,
         request_body=InputFriendRequestSerializer(),
+        manual_parameters=IdempotentResponse.get_swagger_parameters(),
         tags=["friend requests"],
         responses={
             201: 'Empty',
@@ -45,9 +52,12 @@ In cases like:
 One of errors:
  - Trying to be friend with self.
  - This user is already in friendship.
-"""
+""",
+            409: "Request with the same `Idempotency-Key` is in progress.",
+            422: "`Idempotency-Key` is already used for another request.",
         },
     )
+    @idempotent('friend_requests')
     def post(self, request):
         serializer = InputFriendRequestSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -87,3 +97,39 @@ One of errors:
             raise ValidationError("Wrong user")
 
         return Response(status=status.HTTP_200_OK)
+
+
+class FriendRequestBulkAPIView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Create friend requests to many usernames",
+        operation_description="""
+Friend requests are sent to all of `usernames` at once, e.g. to imported contacts.  
+`201` status code is returned even if some or all of them could not be created.  
+In cases like:  
+ - users does not exists  
+ - users are already friends  
+ - requests already sent  
+""",
+        request_body=InputFriendRequestBulkSerializer(),
+        manual_parameters=IdempotentResponse.get_swagger_parameters(),
+        tags=["friend requests"],
+        responses={
+            201: 'Empty',
+            409: "Request with the same `Idempotency-Key` is in progress.",
+            422: "`Idempotency-Key` is already used for another request.",
+        },
+    )
+    @idempotent('friend_requests_bulk')
+    def post(self, request):
+        serializer = InputFriendRequestBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # To avoid bruteforce nothing is told about particular usernames
+        BulkCreateFriendRequestService(
+            from_user=request.user,
+            to_usernames=serializer.validated_data['usernames'],
+        ).create_requests()
+
+        return Response(status=status.HTTP_201_CREATED)
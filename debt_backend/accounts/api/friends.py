@@ -1,9 +1,25 @@
+from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import permissions, status
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from accounts.serializers import OutputAccountShortSerializer
+from accounts import selectors
+from accounts.models import Account
+from accounts.serializers import (
+    InputFriendListFilterSerializer,
+    OutputAccountShortSerializer,
+    OutputFriendSuggestionSerializer,
+)
+from accounts.services import RemoveFriendService
+from etags import conditional_by_version
+from pagination import KeysetPagination
+from redis_utils import COLLECTION_FRIENDS
+
+
+class FriendshipPagination(KeysetPagination):
+    ordering = ('-created_at', '-id')
 
 
 class FriendAPIView(APIView):
@@ -11,12 +27,84 @@ class FriendAPIView(APIView):
 
     @swagger_auto_schema(
         operation_summary="List of friends",
+        operation_description="Recently added first, paginated, next page is in `Link` header.",
+        tags=["friends"],
+        manual_parameters=[
+            openapi.Parameter(
+                'username', openapi.IN_QUERY,
+                description="Only friends with username starting with it",
+                type=openapi.TYPE_STRING,
+            ),
+            *FriendshipPagination.get_swagger_parameters(),
+        ],
+        responses={
+            200: OutputAccountShortSerializer(many=True),
+            304: "Not modified, if `If-None-Match` matches `ETag` of previous response.",
+        }
+    )
+    @conditional_by_version(COLLECTION_FRIENDS)
+    def get(self, request):
+        filter_serializer = InputFriendListFilterSerializer(data=request.query_params)
+        filter_serializer.is_valid(raise_exception=True)
+
+        paginator = FriendshipPagination()
+        friendships = paginator.paginate_queryset(
+            selectors.get_friendships(
+                request.user,
+                username_prefix=filter_serializer.validated_data.get('username'),
+            ),
+            request,
+            view=self,
+        )
+
+        serializer = OutputAccountShortSerializer(
+            [friendship.to_account for friendship in friendships],
+            many=True,
+        )
+        return paginator.get_paginated_response(serializer.data)
+
+
+class FriendDetailAPIView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Remove friend",
+        operation_description="Common debts and debt requests are kept.",
+        tags=["friends"],
+        responses={
+            204: 'Empty',
+            404: "Not a friend.",
+        }
+    )
+    def delete(self, request, friend_id):
+        try:
+            RemoveFriendService(user=request.user, friend_id=friend_id).remove_friend()
+        except Account.DoesNotExist as exc:
+            raise NotFound from exc
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class FriendSuggestionAPIView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="People you may know",
+        operation_description="Friends of friends ranked by number of mutual friends, "
+                              "precomputed, may lag behind recent changes of friends.",
         tags=["friends"],
-        responses={200: OutputAccountShortSerializer(many=True)}
+        responses={
+            200: OutputFriendSuggestionSerializer(many=True),
+        }
     )
     def get(self, request):
-        user = request.user
-        friends = user.friends.all()
+        suggestions = selectors.get_friend_suggestions(request.user)
 
-        serializer = OutputAccountShortSerializer(friends, many=True)
+        serializer = OutputFriendSuggestionSerializer(
+            [
+                {'id': account.id, 'username': account.username, 'mutual_friends': mutual}
+                for account, mutual in suggestions
+            ],
+            many=True,
+        )
         return Response(data=serializer.data, status=status.HTTP_200_OK)
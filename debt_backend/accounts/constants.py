@@ -5,3 +5,13 @@ FRIEND_REQUEST_STATUS = (
     (STATUS_ACCEPT, 'Accept'),
     (STATUS_DECLINE, 'Decline'),
 )
+
+# cached friend ids are also fixed by `repair_friend_ids` command,
+# TTL bounds how long a missed update can live
+FRIEND_IDS_CACHE_TIMEOUT = 60 * 60 * 24
+
+FRIEND_SUGGESTIONS_SIZE = 50
+# suggestions are recomputed by `refresh_friend_suggestions` command, expected daily,
+# TTL drops ones of accounts not refreshed anymore, e.g. deleted
+FRIEND_SUGGESTIONS_TIMEOUT = 60 * 60 * 24 * 3
+FRIEND_SUGGESTIONS_REFRESH_CHUNK_SIZE = 1000
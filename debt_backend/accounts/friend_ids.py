@@ -0,0 +1,139 @@
+import uuid
+from typing import Iterable, Set
+
+from django.db import transaction
+from django_redis import get_redis_connection
+from redis.exceptions import WatchError
+
+from accounts import constants
+from accounts.models import Account
+
+
+class FriendIds:
+    """
+    Per-account Redis set of friend ids, so "are we friends" is `SISMEMBER`
+    instead of a query to friendship table.
+
+    Set is loaded from database on first use. Member `LOADED` marks a loaded
+    set, a set without it (e.g. created by `add` of not loaded account)
+    is incomplete and is loaded again. Removed friendship drops sets instead
+    of changing them, so a rolled back transaction can't leave them wrong.
+
+    Dropping also increments per-account generation. Set is loaded under
+    `WATCH` of generation, so a load that read database before friend was
+    removed doesn't write the set after it is dropped.
+    """
+    connection = get_redis_connection("default")
+    LOADED = ''
+
+    def __init__(self, account_id: uuid.UUID):
+        self.account_id = account_id
+        self.key = f'friends:{account_id}'
+        # not under `friends:` prefix, it would be taken for a set by `iterate_cached`
+        self.generation_key = f'friends_generation:{account_id}'
+
+    def contains(self, friend_id: uuid.UUID) -> bool:
+        is_friend, is_loaded = self.connection.smismember(self.key, [str(friend_id), self.LOADED])
+        if is_loaded:
+            return bool(is_friend)
+        return str(friend_id) in self._load()
+
+    def get(self) -> Set[uuid.UUID]:
+        members = {member.decode() for member in self.connection.smembers(self.key)}
+        if self.LOADED not in members:
+            members = self._load()
+        members.discard(self.LOADED)
+        return {uuid.UUID(member) for member in members}
+
+    def _load(self) -> Set[str]:
+        with self.connection.pipeline() as pipeline:
+            pipeline.watch(self.generation_key)
+            friend_ids = {str(friend_id) for friend_id in self._get_from_database()}
+            pipeline.multi()
+            pipeline.sadd(self.key, self.LOADED, *friend_ids)
+            pipeline.expire(self.key, constants.FRIEND_IDS_CACHE_TIMEOUT)
+            try:
+                pipeline.execute()
+            except WatchError:
+                # dropped while loading, next use loads it again
+                pass
+        return friend_ids
+
+    def _get_from_database(self) -> Set[uuid.UUID]:
+        return set(
+            Account.friends.through.objects
+            .filter(from_account_id=self.account_id)
+            .values_list('to_account_id', flat=True)
+        )
+
+    def repair(self) -> bool:
+        """
+        Replace loaded set that differs from database, return whether it differed.
+        """
+        with self.connection.pipeline() as pipeline:
+            pipeline.watch(self.generation_key)
+            members = {member.decode() for member in pipeline.smembers(self.key)}
+            if self.LOADED not in members:
+                return False
+
+            friend_ids = {str(friend_id) for friend_id in self._get_from_database()}
+            if members - {self.LOADED} == friend_ids:
+                return False
+            pipeline.multi()
+            pipeline.delete(self.key)
+            pipeline.sadd(self.key, self.LOADED, *friend_ids)
+            pipeline.expire(self.key, constants.FRIEND_IDS_CACHE_TIMEOUT)
+            try:
+                pipeline.execute()
+            except WatchError:
+                # dropped while repairing, there is nothing to repair
+                return False
+        return True
+
+    @classmethod
+    def iterate_cached(cls) -> Iterable['FriendIds']:
+        for key in cls.connection.scan_iter(match='friends:*'):
+            yield cls(uuid.UUID(key.decode().split(':', 1)[1]))
+
+    @classmethod
+    def add(cls, account_id: uuid.UUID, friend_ids: Iterable[uuid.UUID]) -> None:
+        """
+        Add friendship of `account_id` with every of `friend_ids` to both sides after commit.
+        """
+        friend_ids = list(friend_ids)
+        if friend_ids:
+            transaction.on_commit(lambda: cls._add(account_id, friend_ids))
+
+    @classmethod
+    def _add(cls, account_id: uuid.UUID, friend_ids: Iterable[uuid.UUID]) -> None:
+        pipeline = cls.connection.pipeline()
+        for key, members in (
+                (cls(account_id).key, [str(friend_id) for friend_id in friend_ids]),
+                *((cls(friend_id).key, [str(account_id)]) for friend_id in friend_ids),
+        ):
+            pipeline.sadd(key, *members)
+            # TTL of loaded set is kept, incomplete one gets it too
+            pipeline.expire(key, constants.FRIEND_IDS_CACHE_TIMEOUT, nx=True)
+        pipeline.execute()
+
+    @classmethod
+    def invalidate(cls, account_ids: Iterable[uuid.UUID]) -> None:
+        """
+        Drop sets now, so removed friend isn't seen even before commit,
+        and again after commit, as they could be loaded from not yet committed state.
+        """
+        friend_ids = [cls(account_id) for account_id in set(account_ids)]
+        if not friend_ids:
+            return
+        cls._drop(friend_ids)
+        transaction.on_commit(lambda: cls._drop(friend_ids))
+
+    @classmethod
+    def _drop(cls, friend_ids: Iterable['FriendIds']) -> None:
+        pipeline = cls.connection.pipeline()
+        for cached in friend_ids:
+            pipeline.delete(cached.key)
+            pipeline.incr(cached.generation_key)
+            # outlives any load running at the moment
+            pipeline.expire(cached.generation_key, constants.FRIEND_IDS_CACHE_TIMEOUT)
+        pipeline.execute()
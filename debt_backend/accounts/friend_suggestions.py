@@ -0,0 +1,147 @@
+import uuid
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+from django.db import connection, transaction
+from django_redis import get_redis_connection
+
+from accounts import constants
+from accounts.friend_ids import FriendIds
+from accounts.models import Account, Friendship
+
+
+class FriendSuggestions:
+    """
+    Per-account Redis sorted set of "people you may know": friends of friends,
+    who aren't friends yet, scored by number of mutual friends.
+    Only top `FRIEND_SUGGESTIONS_SIZE` are kept, so reading is `ZREVRANGE`
+    regardless of size of account's network.
+
+    Sets are computed by `refresh` batch job and are kept up to date
+    on accepted friend requests by `add_friendship`. Candidate that fell out
+    of the top and comes back gets score counted from that moment, removed
+    friendships aren't applied, both are fixed by the next `refresh`.
+    """
+    connection = get_redis_connection("default")
+
+    def __init__(self, account_id: uuid.UUID):
+        self.account_id = account_id
+        self.key = f'friend_suggestions:{account_id}'
+
+    def get(self) -> List[Tuple[uuid.UUID, int]]:
+        """
+        Suggested account ids with numbers of mutual friends, most mutual first.
+        """
+        return [
+            (uuid.UUID(candidate_id.decode()), int(mutual))
+            for candidate_id, mutual in self.connection.zrevrange(self.key, 0, -1, withscores=True)
+        ]
+
+    @classmethod
+    def refresh(cls, chunk_size: int = constants.FRIEND_SUGGESTIONS_REFRESH_CHUNK_SIZE) -> int:
+        """
+        Recompute sets of all accounts, `chunk_size` accounts at a time,
+        return number of refreshed accounts.
+        """
+        refreshed = 0
+        last_id = None
+        while True:
+            accounts = Account.objects.order_by('id')
+            if last_id is not None:
+                accounts = accounts.filter(id__gt=last_id)
+            account_ids = list(accounts.values_list('id', flat=True)[:chunk_size])
+            if not account_ids:
+                return refreshed
+
+            suggestions = cls._get_from_database(account_ids)
+            pipeline = cls.connection.pipeline()
+            for account_id in account_ids:
+                key = cls(account_id).key
+                pipeline.delete(key)
+                if suggestions.get(account_id):
+                    pipeline.zadd(key, suggestions[account_id])
+                    pipeline.expire(key, constants.FRIEND_SUGGESTIONS_TIMEOUT)
+            pipeline.execute()
+
+            refreshed += len(account_ids)
+            last_id = account_ids[-1]
+
+    @staticmethod
+    def _get_from_database(account_ids: Sequence[uuid.UUID]) -> Dict[uuid.UUID, Dict[str, int]]:
+        table = Friendship._meta.db_table
+        with connection.cursor() as cursor:
+            # friends of friends are counted per candidate, ties are ranked
+            # the same way as `ZREVRANGE` does, by member descending
+            cursor.execute(f"""
+                SELECT account_id, candidate_id, mutual
+                FROM (
+                    SELECT
+                        friends.from_account_id AS account_id,
+                        friends_of_friends.to_account_id AS candidate_id,
+                        count(*) AS mutual,
+                        row_number() OVER (
+                            PARTITION BY friends.from_account_id
+                            ORDER BY count(*) DESC, friends_of_friends.to_account_id::text DESC
+                        ) AS rank
+                    FROM {table} friends
+                    JOIN {table} friends_of_friends
+                      ON friends_of_friends.from_account_id = friends.to_account_id
+                    WHERE friends.from_account_id = ANY(%s)
+                      AND friends_of_friends.to_account_id <> friends.from_account_id
+                      AND NOT EXISTS (
+                          SELECT 1 FROM {table} friendship
+                          WHERE friendship.from_account_id = friends.from_account_id
+                            AND friendship.to_account_id = friends_of_friends.to_account_id
+                      )
+                    GROUP BY friends.from_account_id, friends_of_friends.to_account_id
+                ) candidates
+                WHERE rank <= %s
+            """, [list(account_ids), constants.FRIEND_SUGGESTIONS_SIZE])
+            rows = cursor.fetchall()
+
+        suggestions = {}
+        for account_id, candidate_id, mutual in rows:
+            suggestions.setdefault(account_id, {})[str(candidate_id)] = mutual
+        return suggestions
+
+    @classmethod
+    def add_friendship(cls, account_id: uuid.UUID, friend_id: uuid.UUID) -> None:
+        """
+        Apply new friendship of `account_id` and `friend_id` after commit,
+        when cached friend ids already have it.
+        """
+        transaction.on_commit(lambda: cls._add_friendship(account_id, friend_id))
+
+    @classmethod
+    def _add_friendship(cls, account_id: uuid.UUID, friend_id: uuid.UUID) -> None:
+        friends = FriendIds(account_id).get() - {friend_id}
+        friends_of_friend = FriendIds(friend_id).get() - {account_id}
+
+        increments: Dict[uuid.UUID, Set[uuid.UUID]] = {
+            # friends of one side are new friends of friends of the other
+            account_id: friends_of_friend - friends,
+            friend_id: friends - friends_of_friend,
+        }
+        # and each side is a new friend of friend of the other side's friends
+        for candidate_id, account_ids in (
+                (friend_id, friends - friends_of_friend),
+                (account_id, friends_of_friend - friends),
+        ):
+            for suggested_to in account_ids:
+                increments.setdefault(suggested_to, set()).add(candidate_id)
+
+        pipeline = cls.connection.pipeline()
+        pipeline.zrem(cls(account_id).key, str(friend_id))
+        pipeline.zrem(cls(friend_id).key, str(account_id))
+        for suggested_to, candidate_ids in increments.items():
+            cls._increment(pipeline, cls(suggested_to).key, candidate_ids)
+        pipeline.execute()
+
+    @staticmethod
+    def _increment(pipeline, key: str, candidate_ids: Iterable[uuid.UUID]) -> None:
+        candidate_ids = list(candidate_ids)
+        if not candidate_ids:
+            return
+        for candidate_id in candidate_ids:
+            pipeline.zincrby(key, 1, str(candidate_id))
+        pipeline.zremrangebyrank(key, 0, -constants.FRIEND_SUGGESTIONS_SIZE - 1)
+        pipeline.expire(key, constants.FRIEND_SUGGESTIONS_TIMEOUT, nx=True)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from accounts.friend_suggestions import FriendSuggestions
+
+
+class Command(BaseCommand):
+    help = "Recompute friend suggestions of all accounts, meant to be run daily"
+
+    def handle(self, *args, **options):
+        refreshed = FriendSuggestions.refresh()
+        self.stdout.write(f"Refreshed: {refreshed}")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from accounts.friend_ids import FriendIds
+
+
+class Command(BaseCommand):
+    help = "Compare cached friend ids with database and fix the ones that differ"
+
+    def handle(self, *args, **options):
+        checked = repaired = 0
+        for friend_ids in FriendIds.iterate_cached():
+            checked += 1
+            if friend_ids.repair():
+                repaired += 1
+                self.stdout.write(f"Repaired: {friend_ids.account_id}")
+        self.stdout.write(f"Checked: {checked}, repaired: {repaired}")
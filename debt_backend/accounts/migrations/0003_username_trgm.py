@@ -0,0 +1,22 @@
+# Generated by Django 4.0 on 2026-10-18 15:37
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # index is built without locking writes
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0002_alter_account_friends'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name='account',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['username'], name='account_username_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
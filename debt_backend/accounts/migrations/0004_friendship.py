@@ -0,0 +1,94 @@
+# Generated by Django 4.0 on 2026-10-18 15:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+CHUNK_SIZE = 10_000
+
+
+def _copy_in_chunks(schema_editor, source: str, target: str, with_created_at: bool) -> None:
+    # every chunk is committed on its own, so friendships are never locked
+    # for the whole copy, and copy can be restarted after failure
+    columns = 'from_account_id, to_account_id'
+    values = columns
+    if with_created_at:
+        columns += ', created_at'
+        values += ', now()'
+
+    last_id = 0
+    with schema_editor.connection.cursor() as cursor:
+        while True:
+            cursor.execute(f"""
+                WITH chunk AS (
+                    SELECT id, from_account_id, to_account_id FROM {source}
+                    WHERE id > %s
+                    ORDER BY id
+                    LIMIT %s
+                ), copied AS (
+                    INSERT INTO {target} ({columns})
+                    SELECT {values} FROM chunk
+                    ON CONFLICT DO NOTHING
+                )
+                SELECT max(id) FROM chunk
+            """, [last_id, CHUNK_SIZE])
+            last_id = cursor.fetchone()[0]
+            if last_id is None:
+                return
+
+
+def _get_tables(apps):
+    # auto created friends table is still in state of this migration
+    account = apps.get_model('accounts', 'Account')
+    friendship = apps.get_model('accounts', 'Friendship')
+    return account._meta.get_field('friends').remote_field.through._meta.db_table, friendship._meta.db_table
+
+
+def copy_friendships(apps, schema_editor):
+    old_table, new_table = _get_tables(apps)
+    _copy_in_chunks(schema_editor, old_table, new_table, with_created_at=True)
+
+
+def copy_friendships_back(apps, schema_editor):
+    old_table, new_table = _get_tables(apps)
+    _copy_in_chunks(schema_editor, new_table, old_table, with_created_at=False)
+
+
+class Migration(migrations.Migration):
+    # friendships are copied in chunks, every chunk in its own transaction
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0003_username_trgm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Friendship',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('from_account', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('to_account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['from_account', '-created_at', '-id'], name='friendship_created_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='friendship',
+            constraint=models.UniqueConstraint(fields=('from_account', 'to_account'), name='friendship_unique'),
+        ),
+        migrations.RunPython(copy_friendships, copy_friendships_back),
+        # M2M can't be altered to use `through`, it is replaced,
+        # writes to old table made during deploy after the copy are lost
+        migrations.RemoveField(
+            model_name='account',
+            name='friends',
+        ),
+        migrations.AddField(
+            model_name='account',
+            name='friends',
+            field=models.ManyToManyField(blank=True, through='accounts.Friendship', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -1,6 +1,7 @@
 import uuid
 
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 
 
@@ -8,7 +9,53 @@ class Account(AbstractUser):
     REQUIRED_FIELDS = []
 
     id = models.UUIDField(default=uuid.uuid4, primary_key=True)
-    friends = models.ManyToManyField('self', symmetrical=True, blank=True)
+    friends = models.ManyToManyField(
+        'self',
+        through='accounts.Friendship',
+        through_fields=('from_account', 'to_account'),
+        symmetrical=True,
+        blank=True,
+    )
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # fuzzy search by username
+            GinIndex(fields=['username'], name='account_username_trgm', opclasses=['gin_trgm_ops']),
+        ]
+
+
+class Friendship(models.Model):
+    """
+    Friendship is symmetrical, so every one is stored as two rows,
+    one per direction, and friends of account are rows `from_account`.
+    """
+    # indexed by unique (from_account, to_account) constraint
+    from_account = models.ForeignKey(
+        Account,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False,
+    )
+    to_account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['from_account', 'to_account'],
+                name='friendship_unique',
+            ),
+        ]
+        indexes = [
+            # friends of account, recently added first
+            models.Index(
+                fields=['from_account', '-created_at', '-id'],
+                name='friendship_created_idx',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Friendship: ({self.from_account_id} -> {self.to_account_id})"
 
 
 class FriendRequest(models.Model):
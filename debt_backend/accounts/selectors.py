@@ -1,7 +1,46 @@
+import uuid
+from typing import List, Optional, Set, Tuple
+
 from django.db.models import QuerySet
 
-from accounts.models import Account, FriendRequest
+from accounts.friend_ids import FriendIds
+from accounts.friend_suggestions import FriendSuggestions
+from accounts.models import Account, FriendRequest, Friendship
 
 
 def get_friend_requests_to_accept(user: Account) -> QuerySet[FriendRequest]:
-    return user.friend_requests.order_by('-created_at').select_related('to_user')
+    return user.friend_requests.order_by('-created_at').select_related('from_user', 'to_user')
+
+
+def get_friendships(user: Account, username_prefix: Optional[str] = None) -> QuerySet[Friendship]:
+    friendships = Friendship.objects.filter(from_account=user).select_related('to_account')
+    if username_prefix:
+        # served by `varchar_pattern_ops` index Django creates for unique username
+        friendships = friendships.filter(to_account__username__startswith=username_prefix)
+    return friendships
+
+
+def are_friends(user: Account, friend_id: uuid.UUID) -> bool:
+    """
+    Every friendship check goes through here, it's `SISMEMBER` on
+    cached friend ids, database is queried only to load them.
+    """
+    return FriendIds(user.id).contains(friend_id)
+
+
+def get_friend_ids(user: Account) -> Set[uuid.UUID]:
+    return FriendIds(user.id).get()
+
+
+def get_friend_suggestions(user: Account) -> List[Tuple[Account, int]]:
+    """
+    Precomputed suggestions with numbers of mutual friends, most mutual first.
+    """
+    suggestions = FriendSuggestions(user.id).get()
+    accounts = Account.objects.in_bulk([account_id for account_id, _ in suggestions])
+    return [
+        (accounts[account_id], mutual)
+        for account_id, mutual in suggestions
+        # deleted since last refresh
+        if account_id in accounts
+    ]
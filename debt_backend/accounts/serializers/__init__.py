@@ -5,11 +5,14 @@ from accounts.serializers.tokens import (
 )
 from accounts.serializers.accounts import (
     InputAccountRegisterSerializer,
+    InputFriendListFilterSerializer,
     OutputAccountShortSerializer,
+    OutputFriendSuggestionSerializer,
     OutputAccountSerializer,
 )
 from accounts.serializers.friend_requests import (
     InputFriendRequestSerializer,
+    InputFriendRequestBulkSerializer,
     InputFriendRequestUpdateSerializer,
     OutputFriendRequestSerializer,
 )
@@ -6,9 +6,17 @@ class InputAccountRegisterSerializer(serializers.Serializer):
     password = serializers.CharField()
 
 
+class InputFriendListFilterSerializer(serializers.Serializer):
+    username = serializers.CharField(required=False, max_length=150)
+
+
 class OutputAccountShortSerializer(serializers.Serializer):
     id = serializers.UUIDField()
     username = serializers.CharField()
 
 
+class OutputFriendSuggestionSerializer(OutputAccountShortSerializer):
+    mutual_friends = serializers.IntegerField()
+
+
 OutputAccountSerializer = OutputAccountShortSerializer
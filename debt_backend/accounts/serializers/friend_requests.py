@@ -8,6 +8,14 @@ class InputFriendRequestSerializer(serializers.Serializer):
     username = serializers.CharField()
 
 
+class InputFriendRequestBulkSerializer(serializers.Serializer):
+    usernames = serializers.ListField(
+        child=serializers.CharField(max_length=150),
+        allow_empty=False,
+        max_length=500,
+    )
+
+
 class OutputFriendRequestSerializer(serializers.Serializer):
     id = serializers.UUIDField()
     from_user = OutputAccountShortSerializer()
@@ -1,9 +1,14 @@
+import uuid
+from typing import Iterable
+
 from django.db import transaction
 from rest_framework.exceptions import ValidationError
 
-from accounts import constants
+from accounts import constants, selectors
 from accounts.errors import AlreadyFriendsError, WrongUserError
-from accounts.models import Account, FriendRequest
+from accounts.friend_suggestions import FriendSuggestions
+from accounts.models import Account, FriendRequest, Friendship
+from redis_utils import COLLECTION_FRIENDS, CollectionVersion
 
 
 class CreateFriendRequestService:
@@ -28,7 +33,7 @@ class CreateFriendRequestService:
             user_1: Account,
             user_2: Account,
     ) -> None:
-        if user_1.friends.filter(pk=user_2.pk).exists():
+        if selectors.are_friends(user_1, user_2.pk):
             raise AlreadyFriendsError
 
     def _validate_creator_is_not_same_with_username(self):
@@ -36,6 +41,43 @@ class CreateFriendRequestService:
             raise ValidationError("Trying to be friend with self.")
 
 
+class BulkCreateFriendRequestService:
+    """
+    Send friend requests to many usernames at once (e.g. imported contacts).
+    Unknown usernames, friends and already requested users are skipped
+    silently, so the result doesn't tell which usernames exist.
+    """
+    def __init__(self, from_user: Account, to_usernames: Iterable[str]):
+        self.from_user = from_user
+        self.to_usernames = set(to_usernames)
+
+    def create_requests(self) -> None:
+        FriendRequest.objects.bulk_create(
+            [
+                FriendRequest(from_user=self.from_user, to_user_id=to_user_id)
+                for to_user_id in self._get_to_user_ids()
+            ],
+            # request sent concurrently is left as is, like with `get_or_create`
+            ignore_conflicts=True,
+        )
+
+    def _get_to_user_ids(self) -> Iterable[uuid.UUID]:
+        friend_ids = Friendship.objects \
+            .filter(from_account=self.from_user) \
+            .values('to_account')
+        requested_ids = FriendRequest.objects \
+            .filter(from_user=self.from_user) \
+            .values('to_user')
+        return (
+            Account.objects
+            .filter(username__in=self.to_usernames)
+            .exclude(pk=self.from_user.pk)
+            .exclude(pk__in=friend_ids)
+            .exclude(pk__in=requested_ids)
+            .values_list('pk', flat=True)
+        )
+
+
 class UpdateFriendRequestService:
     def __init__(self, friend_request_id: str, status: str, user: Account):
         self.friend_request = FriendRequest.objects.get(
@@ -62,6 +104,21 @@ class UpdateFriendRequestService:
         with transaction.atomic():
             self.user.friends.add(from_user)
             self.friend_request.delete()
+            FriendSuggestions.add_friendship(self.user.id, from_user.id)
+        CollectionVersion.bump(COLLECTION_FRIENDS, [self.user.id, from_user.id])
 
     def _decline_friend_request(self):
         self.friend_request.delete()
+
+
+class RemoveFriendService:
+    def __init__(self, user: Account, friend_id: uuid.UUID):
+        self.user = user
+        self.friend_id = friend_id
+
+    def remove_friend(self) -> None:
+        if not selectors.are_friends(self.user, self.friend_id):
+            raise Account.DoesNotExist
+        # cached friend ids are dropped by `m2m_changed` receiver
+        self.user.friends.remove(self.friend_id)
+        CollectionVersion.bump(COLLECTION_FRIENDS, [self.user.id, self.friend_id])
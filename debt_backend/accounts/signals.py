@@ -0,0 +1,16 @@
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+
+from accounts.friend_ids import FriendIds
+from accounts.models import Account
+
+
+@receiver(m2m_changed, sender=Account.friends.through)
+def update_friend_ids(sender, instance: Account, action: str, pk_set, **kwargs):
+    # sent once for both directions of symmetrical friendship
+    if action == 'post_add':
+        FriendIds.add(instance.pk, pk_set)
+    elif action == 'post_remove':
+        FriendIds.invalidate([instance.pk, *pk_set])
+    elif action == 'pre_clear':
+        FriendIds.invalidate([instance.pk, *instance.friends.values_list('pk', flat=True)])
@@ -2,7 +2,10 @@ from django.urls import path
 
 from accounts.api import (
     FriendAPIView,
+    FriendDetailAPIView,
+    FriendSuggestionAPIView,
     FriendRequestAPIView,
+    FriendRequestBulkAPIView,
     DecoratedTokenObtainPairView,
     DecoratedTokenRefreshView,
     RegisterAccountAPIView,
@@ -18,7 +21,10 @@ urlpatterns = [
     path('token/refresh/', DecoratedTokenRefreshView.as_view(), name='token_refresh'),
     path('token/verify/', DecoratedTokenVerifyView.as_view(), name='token_verify'),
     path('friends/', FriendAPIView.as_view(), name='friends'),
+    path('friends/suggestions/', FriendSuggestionAPIView.as_view(), name='friend_suggestions'),
+    path('friends/<uuid:friend_id>/', FriendDetailAPIView.as_view(), name='friend_detail'),
     path('friend-requests/', FriendRequestAPIView.as_view(), name='friend_requests'),
+    path('friend-requests/bulk/', FriendRequestBulkAPIView.as_view(), name='friend_requests_bulk'),
     path('me/', AccountSelfAPIView.as_view(), name='account_self'),
     path('<uuid:pk>/', AccountAPIView.as_view(), name='account_detail'),
 ]
@@ -1,13 +1,13 @@
 from django.contrib import admin
-from django.db.models import Q
 from django.http import HttpResponseRedirect
+from django.shortcuts import get_object_or_404
 from django.urls import reverse
 
 from django_object_actions import DjangoObjectActions
 
 from debts import constants as debt_constants
 from debts.admin_utils import ObjectActionsController
-from debts.models import Debt, DebtRequest, ClosedDebtRequest
+from debts.models import ArchivedDebt, Debt, DebtPayment, DebtRequest, ClosedDebtRequest
 from debts.services import (
     DebtRequestUpdateStatusService,
     CreateClosedDebtRequestService,
@@ -34,17 +34,33 @@ class IsActiveListFilter(admin.SimpleListFilter):
 class IsActiveDebtListFilter(IsActiveListFilter):
     def queryset(self, request, queryset):
         if self.value() == self.STATUS_TRUE:
-            return queryset.filter(closed_request__is_closed=False)
+            return queryset.exclude(status=debt_constants.DEBT_STATUS_CLOSED)
 
         if self.value() == self.STATUS_FALSE:
-            return queryset.filter(
-                Q(closed_request__isnull=True) | Q(closed_request__is_closed=True)
-            )
+            return queryset.filter(status=debt_constants.DEBT_STATUS_CLOSED)
+
+
+class DebtPaymentInline(admin.TabularInline):
+    model = DebtPayment
+    fields = ('money', 'creator', 'created')
+    readonly_fields = fields
+    ordering = ('-created',)
+    extra = 0
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('creator')
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(Debt)
 class DebtAdmin(DjangoObjectActions, admin.ModelAdmin):
-    list_display = ('__str__', 'is_active', 'created')
+    list_display = ('__str__', 'remaining_money', 'status', 'created')
+    list_select_related = ('creditor', 'debtor')
     list_filter = (IsActiveDebtListFilter,)
     search_fields = ['creditor__username', 'debtor__username']
     search_help_text = "Search through creditor/debtor name"
@@ -53,11 +69,20 @@ class DebtAdmin(DjangoObjectActions, admin.ModelAdmin):
         (None, {
             'fields': (
                 'id', 'creditor', 'debtor',
-                'money', 'description', 'created',
+                'money', 'remaining_money', 'description', 'status',
+                'created', 'closed_at',
             ),
         }),
     )
-    readonly_fields = ('id', 'created')
+    # debts are created from requests only, so `DebtBalance` is shifted
+    readonly_fields = (
+        'id', 'creditor', 'debtor', 'money', 'remaining_money', 'status',
+        'created', 'closed_at',
+    )
+    inlines = (DebtPaymentInline,)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_remaining_money()
 
     action_controller = ObjectActionsController()
 
@@ -93,6 +118,9 @@ class DebtAdmin(DjangoObjectActions, admin.ModelAdmin):
         obj = self.get_object(request, object_id)
         return self.action_controller.filter_by_object(obj)
 
+    def has_add_permission(self, request):
+        return False
+
     def has_change_permission(self, request, obj=None):
         return obj and obj.is_active
 
@@ -103,15 +131,15 @@ class DebtAdmin(DjangoObjectActions, admin.ModelAdmin):
 class IsActiveDebtRequestListFilter(IsActiveListFilter):
     def queryset(self, request, queryset):
         if self.value() == self.STATUS_TRUE:
-            return queryset.filter(connected_debt__isnull=True, declined=False)
+            return queryset.filter(status=debt_constants.DEBT_REQUEST_STATUS_PENDING)
 
         if self.value() == self.STATUS_FALSE:
-            return queryset.filter(Q(declined=True) | Q(connected_debt__isnull=False))
+            return queryset.exclude(status=debt_constants.DEBT_REQUEST_STATUS_PENDING)
 
 
 @admin.register(DebtRequest)
 class DebtRequestAdmin(DjangoObjectActions, admin.ModelAdmin):
-    list_display = ('__str__', 'is_active', 'declined', 'created')
+    list_display = ('__str__', 'status', 'created')
     list_filter = (IsActiveDebtRequestListFilter,)
     search_fields = ['creditor__username', 'debtor__username']
     search_help_text = "Search through creditor/debtor name"
@@ -119,13 +147,13 @@ class DebtRequestAdmin(DjangoObjectActions, admin.ModelAdmin):
         (None, {
             'fields': (
                 'id', 'creditor', 'debtor', 'creator',
-                'money', 'declined', 'description',
+                'money', 'status', 'description',
                 'created',
             ),
         }),
     )
     readonly_fields = (
-        'id', 'created', 'declined',
+        'id', 'created', 'status',
     )
 
     action_controller = ObjectActionsController()
@@ -146,12 +174,26 @@ class DebtRequestAdmin(DjangoObjectActions, admin.ModelAdmin):
             creator=request.user,
         ).update_debt_request_from_admin()
 
-    @action_controller.show_when(lambda obj: not obj.is_active and not obj.declined)
+    @action_controller.show_when(
+        lambda obj: obj.status == debt_constants.DEBT_REQUEST_STATUS_ACCEPTED
+        and obj.connected_debt is not None
+    )
     def connected_debt(self, request, obj):
         return HttpResponseRedirect(
             reverse("admin:debts_debt_change", args=(obj.connected_debt.id,))
         )
 
+    # debt of accepted request could be moved to archive
+    @action_controller.show_when(
+        lambda obj: obj.status == debt_constants.DEBT_REQUEST_STATUS_ACCEPTED
+        and obj.connected_debt is None
+    )
+    def archived_debt(self, request, obj):
+        archived_debt = get_object_or_404(ArchivedDebt, from_request_id=obj.pk)
+        return HttpResponseRedirect(
+            reverse("admin:debts_archiveddebt_change", args=(archived_debt.id,))
+        )
+
     change_actions = action_controller.change_actions
 
     def get_change_actions(self, request, object_id, _):
@@ -207,4 +249,21 @@ class ClosedDebtRequestAdmin(admin.ModelAdmin):
         return False
 
 
+@admin.register(ArchivedDebt)
+class ArchivedDebtAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'closed_at', 'archived_at')
+    list_select_related = ('creditor', 'debtor')
+    search_fields = ['creditor__username', 'debtor__username']
+    search_help_text = "Search through creditor/debtor name"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
 admin.site.disable_action('delete_selected')
@@ -1,2 +1,9 @@
-from debts.api.debt_requests import DebtRequestAPIView
-from debts.api.debts import DebtAPIView
+from debts.api.debt_requests import DebtRequestAPIView, DebtRequestBulkAPIView
+from debts.api.debts import DebtAPIView, CloseCommonDebtsAPIView
+from debts.api.debt_payments import DebtPaymentAPIView
+from debts.api.balances import DebtBalanceAPIView
+from debts.api.settle_up import SettleUpAPIView
+from debts.api.split_debt_requests import SplitDebtRequestAPIView
+from debts.api.summary import DebtsSummaryAPIView
+from debts.api.export import DebtsExportAPIView
+from debts.api.search import DebtsSearchAPIView
@@ -0,0 +1,29 @@
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from debts import selectors
+from debts.serializers import OutputDebtBalanceSerializer
+
+
+class DebtBalanceAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="List of balances with friends",
+        operation_description="""
+Positive `balance` means counterparty owes current user,  
+negative - current user owes counterparty.
+""",
+        tags=["debts"],
+        responses={
+            200: OutputDebtBalanceSerializer(many=True),
+        }
+    )
+    def get(self, request):
+        balances = selectors.get_balances(request.user)
+
+        serializer = OutputDebtBalanceSerializer(balances, many=True)
+        return Response(data=serializer.data, status=status.HTTP_200_OK)
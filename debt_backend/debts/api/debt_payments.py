@@ -0,0 +1,68 @@
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from debts import selectors
+from debts.models import Debt
+from debts.serializers import (
+    InputDebtPaymentSerializer,
+    OutputDebtPaymentSerializer,
+    OutputCreatedDebtPaymentSerializer,
+)
+from debts.services import CreateDebtPaymentService
+
+
+class DebtPaymentAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="List of debt payments",
+        tags=["debts"],
+        responses={
+            200: OutputDebtPaymentSerializer(many=True),
+            404: "Debt is not found.",
+        }
+    )
+    def get(self, request, debt_id):
+        try:
+            debt = selectors.get_related_debt(request.user, debt_id)
+        except Debt.DoesNotExist as exc:
+            raise NotFound from exc
+
+        payments = selectors.get_debt_payments(debt)
+        data = OutputDebtPaymentSerializer(payments, many=True).data
+        return Response(data=data)
+
+    @swagger_auto_schema(
+        operation_summary="Register debt payment",
+        operation_description="Debt is closed when it is paid in full.",
+        request_body=InputDebtPaymentSerializer(),
+        tags=["debts"],
+        responses={
+            201: OutputCreatedDebtPaymentSerializer(),
+            400: """
+One of Errors:  
+- Only creditor can register payment.  
+- Debt is not active.  
+- Payment is greater than remaining money.
+""",
+            404: "Debt is not found.",
+        }
+    )
+    def post(self, request, debt_id):
+        serializer = InputDebtPaymentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            payment = CreateDebtPaymentService(
+                debt_id=debt_id,
+                creator=request.user,
+                **serializer.validated_data,
+            ).create_payment()
+        except Debt.DoesNotExist as exc:
+            raise NotFound from exc
+
+        data = OutputCreatedDebtPaymentSerializer(payment).data
+        return Response(data=data, status=status.HTTP_201_CREATED)
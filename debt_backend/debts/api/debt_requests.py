@@ -11,9 +11,20 @@ from debts.serializers import (
     OutputDebtSerializer,
     InputDebtRequestSerializer,
     OutputDebtRequestSerializer,
+    OutputDebtRequestValuesSerializer,
     InputDebtRequestUpdateSerializer,
+    InputDebtRequestBulkUpdateSerializer,
+    OutputDebtRequestBulkUpdateSerializer,
 )
-from debts.services import CreateDebtRequestService, DebtRequestUpdateStatusService
+from debts.services import (
+    CreateDebtRequestService,
+    DebtRequestUpdateStatusService,
+    BulkDebtRequestUpdateStatusService,
+)
+from etags import conditional_by_version
+from idempotency import IdempotentResponse, idempotent
+from pagination import KeysetPagination
+from redis_utils import COLLECTION_DEBT_REQUESTS
 
 
 class DebtRequestAPIView(APIView):
@@ -21,28 +32,37 @@ class DebtRequestAPIView(APIView):
 
     @swagger_auto_schema(
         operation_summary="List of debt requests",
+        operation_description="Paginated, next page is in `Link` header.",
         tags=["debt requests"],
+        manual_parameters=KeysetPagination.get_swagger_parameters(),
         responses={
             200: OutputDebtRequestSerializer(many=True),
+            304: "Not modified, if `If-None-Match` matches `ETag` of previous response.",
         },
     )
+    @conditional_by_version(COLLECTION_DEBT_REQUESTS)
     def get(self, request):
-        debt_requests = selectors.get_active_debt_requests(request.user)
+        paginator = KeysetPagination()
+        debt_requests = paginator.paginate_union(
+            [
+                debt_requests.values(*OutputDebtRequestValuesSerializer.values)
+                for debt_requests in selectors.get_active_debt_requests_by_role(request.user)
+            ],
+            request,
+            view=self,
+        )
 
-        output_serializer = OutputDebtRequestSerializer(
+        output_serializer = OutputDebtRequestValuesSerializer(
             debt_requests,
-            many=True,
             context={'request': request},
         )
-        return Response(
-            data=output_serializer.data,
-            status=status.HTTP_200_OK,
-        )
+        return paginator.get_paginated_response(output_serializer.data)
 
     @swagger_auto_schema(
         operation_summary="Create debt request",
         tags=["debt requests"],
         request_body=InputDebtRequestSerializer(),
+        manual_parameters=IdempotentResponse.get_swagger_parameters(),
         responses={
             201: 'Empty',
             400: """
@@ -50,8 +70,11 @@ One of errors:
    - Current user should be debtor or creditor.
    - You're not a friend with your debtor/creditor.
    - Cannot send debt to self.
-"""
+""",
+            409: "Request with the same `Idempotency-Key` is in progress.",
+            422: "`Idempotency-Key` is already used for another request.",
         })
+    @idempotent('debt_requests')
     def post(self, request):
         serializer = InputDebtRequestSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -99,3 +122,37 @@ One of Errors:
             return Response(data=data, status=status.HTTP_200_OK)
         else:
             return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class DebtRequestBulkAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Accept/decline many debt requests",
+        operation_description="""
+All valid debt requests are updated in one transaction.  
+Debt requests that can't be updated are skipped and listed in `errors` with one of reasons:
+- Debt request is not found.
+- Cannot change status of request from creator.
+- Debt request is not active.
+""",
+        request_body=InputDebtRequestBulkUpdateSerializer(),
+        tags=["debt requests"],
+        responses={
+            200: OutputDebtRequestBulkUpdateSerializer(),
+        },
+    )
+    def patch(self, request):
+        serializer = InputDebtRequestBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        debts, errors = BulkDebtRequestUpdateStatusService(
+            **serializer.validated_data,
+            creator=self.request.user,
+        ).update_debt_requests()
+
+        data = OutputDebtRequestBulkUpdateSerializer({
+            'debts': debts,
+            'errors': errors,
+        }).data
+        return Response(data=data, status=status.HTTP_200_OK)
@@ -1,7 +1,9 @@
-from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+from drf_yasg.utils import no_body, swagger_auto_schema
 from django.db.models import Q
 
 from rest_framework import status
+from rest_framework.exceptions import NotFound
 from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -10,8 +12,16 @@ from rest_framework.views import APIView
 from accounts.models import Account
 from debts import selectors
 from debts.models import Debt
-from debts.serializers import OutputDebtSerializer
-from debts.services import CreateClosedDebtRequestService
+from debts.serializers import (
+    OutputDebtSerializer,
+    OutputDebtValuesSerializer,
+    OutputClosedCommonDebtsSerializer,
+    InputDebtListFilterSerializer,
+)
+from debts.services import CreateClosedDebtRequestService, CloseCommonDebtsService
+from etags import conditional_by_version
+from pagination import KeysetPagination
+from redis_utils import COLLECTION_DEBTS
 
 
 class DebtAPIView(APIView):
@@ -19,17 +29,42 @@ class DebtAPIView(APIView):
 
     @swagger_auto_schema(
         operation_summary="List of debts",
+        operation_description="Paginated, next page is in `Link` header.",
         tags=["debts"],
+        manual_parameters=[
+            openapi.Parameter(
+                'active', openapi.IN_QUERY,
+                description="Only not closed debts",
+                type=openapi.TYPE_BOOLEAN,
+            ),
+            *KeysetPagination.get_swagger_parameters(),
+        ],
         responses={
             200: OutputDebtSerializer(many=True),
+            304: "Not modified, if `If-None-Match` matches `ETag` of previous response.",
         }
     )
+    @conditional_by_version(COLLECTION_DEBTS)
     def get(self, request):
         user: Account = request.user
-        debts = selectors.get_related_debts(user)
+        filter_serializer = InputDebtListFilterSerializer(data=request.query_params)
+        filter_serializer.is_valid(raise_exception=True)
 
-        result = OutputDebtSerializer(debts, many=True).data
-        return Response(data=result)
+        paginator = KeysetPagination()
+        debts = paginator.paginate_union(
+            [
+                debts.values(*OutputDebtValuesSerializer.values)
+                for debts in selectors.get_related_debts_by_role(
+                    user,
+                    only_active=filter_serializer.validated_data['active'],
+                )
+            ],
+            request,
+            view=self,
+        )
+
+        result = OutputDebtValuesSerializer(debts).data
+        return paginator.get_paginated_response(result)
 
 
 class DetailDebtApiView(APIView):
@@ -65,3 +100,30 @@ class DetailDebtApiView(APIView):
         service.create_close_debt_request()
 
         return Response(status=status.HTTP_201_CREATED)
+
+
+class CloseCommonDebtsAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Close all debts with friend",
+        operation_description="Closes every active debt between current user and friend at once.",
+        tags=["debts"],
+        request_body=no_body,
+        responses={
+            200: OutputClosedCommonDebtsSerializer(),
+            400: "Cannot close debts with self.",
+            404: "Account is not found.",
+        }
+    )
+    def post(self, request, friend_id):
+        try:
+            closed = CloseCommonDebtsService(
+                user=request.user,
+                friend_id=friend_id,
+            ).close_common_debts()
+        except Account.DoesNotExist as exc:
+            raise NotFound from exc
+
+        data = OutputClosedCommonDebtsSerializer(closed._asdict()).data
+        return Response(data=data, status=status.HTTP_200_OK)
@@ -0,0 +1,42 @@
+from django.http import StreamingHttpResponse
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+
+from debts.serializers import InputDebtsExportSerializer
+from debts.services import ExportDebtsService
+
+
+class DebtsExportAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Export debts",
+        operation_description="""
+Full history of debts and debt requests of current user, oldest first.  
+`kind` column is `debt` or `debt_request`, `closed_at` is empty for debt requests.
+""",
+        tags=["debts"],
+        manual_parameters=[
+            openapi.Parameter(
+                'export_format', openapi.IN_QUERY,
+                description="`csv` (default) or `jsonl`",
+                type=openapi.TYPE_STRING,
+            ),
+        ],
+        responses={
+            200: 'File with one debt or debt request per line.',
+        }
+    )
+    def get(self, request):
+        serializer = InputDebtsExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        service = ExportDebtsService(
+            user=request.user,
+            export_format=serializer.validated_data['export_format'],
+        )
+        response = StreamingHttpResponse(service.iter_lines(), content_type=service.content_type)
+        response['Content-Disposition'] = f'attachment; filename="{service.filename}"'
+        return response
@@ -0,0 +1,54 @@
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from debts import constants, selectors
+from debts.serializers import (
+    InputDebtsSearchSerializer,
+    OutputDebtsSearchResultSerializer,
+    OutputDebtsSearchResultValuesSerializer,
+)
+
+
+class DebtsSearchAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Search debts",
+        operation_description="""
+Debts and debt requests of current user whose description or friend username
+is similar to `q`, typos are tolerated. Best matches first.  
+`kind` is `debt` or `debt_request`.
+""",
+        tags=["debts"],
+        manual_parameters=[
+            openapi.Parameter(
+                'q', openapi.IN_QUERY,
+                description=f"At least {constants.SEARCH_MIN_LENGTH} characters",
+                type=openapi.TYPE_STRING,
+                required=True,
+            ),
+            openapi.Parameter(
+                'limit', openapi.IN_QUERY,
+                description=f"Default {constants.SEARCH_LIMIT}, max {constants.SEARCH_MAX_LIMIT}",
+                type=openapi.TYPE_INTEGER,
+            ),
+        ],
+        responses={
+            200: OutputDebtsSearchResultSerializer(many=True),
+        }
+    )
+    def get(self, request):
+        serializer = InputDebtsSearchSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        results = selectors.search_debts(
+            request.user,
+            query=serializer.validated_data['q'],
+            limit=serializer.validated_data['limit'],
+        )
+
+        data = OutputDebtsSearchResultValuesSerializer(results).data
+        return Response(data=data)
@@ -0,0 +1,46 @@
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from accounts.models import Account
+from debts.serializers import OutputTransferSerializer
+from debts.services import SettleUpService
+
+
+class SettleUpAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Transfers to settle up",
+        operation_description="""
+Transfers of current user that clear all active debts
+in the friends network current user belongs to.  
+Debtor and creditor of transfer are not necessarily friends.
+""",
+        tags=["debts"],
+        responses={
+            200: OutputTransferSerializer(many=True),
+        }
+    )
+    def get(self, request):
+        transfers = SettleUpService(request.user).get_own_transfers()
+
+        accounts = Account.objects.in_bulk({
+            account_id
+            for transfer in transfers
+            for account_id in (transfer.debtor_id, transfer.creditor_id)
+        })
+        serializer = OutputTransferSerializer(
+            [
+                {
+                    'debtor': accounts[transfer.debtor_id],
+                    'creditor': accounts[transfer.creditor_id],
+                    'money': transfer.money,
+                }
+                for transfer in transfers
+            ],
+            many=True,
+        )
+        return Response(data=serializer.data, status=status.HTTP_200_OK)
@@ -0,0 +1,56 @@
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from debts.serializers import (
+    InputSplitDebtRequestSerializer,
+    OutputDebtRequestSerializer,
+)
+from debts.services import SplitDebtRequestService
+
+
+class SplitDebtRequestAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Split bill",
+        operation_description="""
+Current user is payer and creditor of all created debt requests.  
+Payer could be one of participants, no debt request is created for payer's part.  
+Split rules:
+ - `equal` - equal parts, `share` is ignored
+ - `shares` - parts proportional to `share`
+ - `exact` - `share` is exact amount, sum should be equal to `money`
+
+Remainder cents go to participants with the biggest rounded off part.
+""",
+        tags=["debt requests"],
+        request_body=InputSplitDebtRequestSerializer(),
+        responses={
+            201: OutputDebtRequestSerializer(many=True),
+            400: """
+One of errors:
+   - Participants should be unique.
+   - There should be at least one participant except payer.
+   - You're not a friend with some of participants.
+   - Every participant should have positive share.
+   - Sum of exact amounts should be equal to money.
+"""
+        })
+    def post(self, request):
+        serializer = InputSplitDebtRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        debt_requests = SplitDebtRequestService(
+            payer=request.user,
+            **serializer.validated_data,
+        ).create_debt_requests()
+
+        output_serializer = OutputDebtRequestSerializer(
+            debt_requests,
+            many=True,
+            context={'request': request},
+        )
+        return Response(data=output_serializer.data, status=status.HTTP_201_CREATED)
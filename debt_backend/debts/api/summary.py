@@ -0,0 +1,26 @@
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from debts import selectors
+from debts.serializers import OutputDebtsSummarySerializer
+
+
+class DebtsSummaryAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Summary of active debts",
+        operation_description="Totals and breakdown by friend, "
+                              "`balance` is positive if you are owed.",
+        tags=["debts"],
+        responses={
+            200: OutputDebtsSummarySerializer(),
+        }
+    )
+    def get(self, request):
+        summary = selectors.get_debts_summary(request.user)
+
+        data = OutputDebtsSummarySerializer(summary).data
+        return Response(data=data)
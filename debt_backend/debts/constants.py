@@ -1,3 +1,31 @@
+from decimal import Decimal
+
+CENTS = Decimal('0.01')
+
+DEBTS_SUMMARY_CACHE_TIMEOUT = 60 * 60 * 24
+
+DEBT_STATUS_ACTIVE = 'active'
+DEBT_STATUS_CLOSING = 'closing'
+DEBT_STATUS_CLOSED = 'closed'
+
+DEBT_STATUSES = (
+    (DEBT_STATUS_ACTIVE, 'Active'),
+    (DEBT_STATUS_CLOSING, 'Closing'),
+    (DEBT_STATUS_CLOSED, 'Closed'),
+)
+
+DEBT_REQUEST_STATUS_PENDING = 'pending'
+DEBT_REQUEST_STATUS_ACCEPTED = 'accepted'
+DEBT_REQUEST_STATUS_DECLINED = 'declined'
+DEBT_REQUEST_STATUS_EXPIRED = 'expired'
+
+DEBT_REQUEST_STATUSES = (
+    (DEBT_REQUEST_STATUS_PENDING, 'Pending'),
+    (DEBT_REQUEST_STATUS_ACCEPTED, 'Accepted'),
+    (DEBT_REQUEST_STATUS_DECLINED, 'Declined'),
+    (DEBT_REQUEST_STATUS_EXPIRED, 'Expired'),
+)
+
 STATUS_ACCEPT = 'accept'
 STATUS_DECLINE = 'decline'
 
@@ -5,3 +33,35 @@ DEBT_REQUEST_STATUS = (
     (STATUS_ACCEPT, 'Accept'),
     (STATUS_DECLINE, 'Decline'),
 )
+
+SPLIT_EQUAL = 'equal'
+SPLIT_SHARES = 'shares'
+SPLIT_EXACT = 'exact'
+
+SPLIT_RULES = (
+    (SPLIT_EQUAL, 'Equal parts'),
+    (SPLIT_SHARES, 'Proportional to shares'),
+    (SPLIT_EXACT, 'Exact amounts'),
+)
+
+# kinds of rows in export/import and search results
+KIND_DEBT = 'debt'
+KIND_DEBT_REQUEST = 'debt_request'
+
+EXPORT_FORMAT_CSV = 'csv'
+EXPORT_FORMAT_JSONL = 'jsonl'
+
+EXPORT_FORMATS = (
+    (EXPORT_FORMAT_CSV, 'CSV'),
+    (EXPORT_FORMAT_JSONL, 'JSON Lines'),
+)
+
+EXPORT_CHUNK_SIZE = 2000
+
+# closed debts are moved to archive after
+DEBTS_ARCHIVE_AFTER_DAYS = 365
+DEBTS_ARCHIVE_BATCH_SIZE = 1000
+
+SEARCH_MIN_LENGTH = 3
+SEARCH_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
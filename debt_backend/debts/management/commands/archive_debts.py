@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from debts import constants
+from debts.services import ArchiveDebtsService
+
+
+class Command(BaseCommand):
+    help = "Move long closed debts to archive"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days',
+            type=int,
+            default=constants.DEBTS_ARCHIVE_AFTER_DAYS,
+            help="Archive debts closed more than this number of days ago",
+        )
+        parser.add_argument('--batch-size', type=int, default=constants.DEBTS_ARCHIVE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        archived = ArchiveDebtsService(
+            older_than_days=options['older_than_days'],
+            batch_size=options['batch_size'],
+        ).archive_debts()
+        self.stdout.write(f"Archived debts: {archived}")
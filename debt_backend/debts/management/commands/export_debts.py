@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import Account
+from debts import constants
+from debts.services import ExportDebtsService
+
+
+class Command(BaseCommand):
+    help = "Export full history of debts and debt requests of account"
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument(
+            '--export-format',
+            choices=[export_format for export_format, _ in constants.EXPORT_FORMATS],
+            default=constants.EXPORT_FORMAT_CSV,
+        )
+        parser.add_argument('--output', help="File to write to, stdout by default")
+        parser.add_argument('--chunk-size', type=int, default=constants.EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = Account.objects.get(username=options['username'])
+        except Account.DoesNotExist as exc:
+            raise CommandError(f"Account {options['username']} does not exist.") from exc
+
+        lines = ExportDebtsService(
+            user=user,
+            export_format=options['export_format'],
+            chunk_size=options['chunk_size'],
+        ).iter_lines()
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from debts import constants
+from debts.services.import_debts import ImportDebtsService
+
+
+class Command(BaseCommand):
+    help = """
+Import debts and debt requests from file in `export_debts` format.
+Required columns: money, creditor_username, debtor_username.
+Optional: kind, creator_username, description, created, status, closed_at.
+No notifications are sent.
+"""
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--import-format',
+            choices=[import_format for import_format, _ in constants.EXPORT_FORMATS],
+            default=constants.EXPORT_FORMAT_CSV,
+        )
+        parser.add_argument(
+            '--skip-invalid',
+            action='store_true',
+            help="Import valid rows and skip invalid ones instead of importing nothing",
+        )
+
+    def handle(self, *args, **options):
+        with open(options['path'], encoding='utf-8', newline='') as rows_file:
+            try:
+                result = ImportDebtsService(
+                    rows_file=rows_file,
+                    import_format=options['import_format'],
+                    skip_invalid=options['skip_invalid'],
+                ).import_debts()
+            except ValidationError as exc:
+                raise CommandError(' '.join(exc.detail)) from exc
+
+        for error in result.errors:
+            self.stderr.write(f"Line {error.line}: {error.message}")
+        if result.errors and not options['skip_invalid']:
+            raise CommandError(f"Nothing is imported, invalid rows: {len(result.errors)}")
+
+        self.stdout.write(f"Debts: {result.debts}")
+        self.stdout.write(f"Debt requests: {result.debt_requests}")
+        if result.errors:
+            self.stdout.write(f"Skipped: {len(result.errors)}")
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import Account
+from debts.services import SettleUpService
+
+
+class Command(BaseCommand):
+    help = "Print transfers that clear all active debts in the friends network of account"
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+
+    def handle(self, *args, **options):
+        try:
+            user = Account.objects.get(username=options['username'])
+        except Account.DoesNotExist as exc:
+            raise CommandError(f"Account {options['username']} does not exist.") from exc
+
+        transfers = SettleUpService(user).get_transfers()
+
+        usernames = dict(
+            Account.objects
+            .filter(pk__in={
+                account_id
+                for transfer in transfers
+                for account_id in (transfer.debtor_id, transfer.creditor_id)
+            })
+            .values_list('id', 'username')
+        )
+        for transfer in transfers:
+            self.stdout.write(
+                f"{usernames[transfer.debtor_id]} -> "
+                f"{usernames[transfer.creditor_id]} ({transfer.money})"
+            )
+        self.stdout.write(f"Transfers: {len(transfers)}")
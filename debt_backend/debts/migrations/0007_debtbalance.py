@@ -0,0 +1,54 @@
+# Generated by Django 4.0 on 2026-10-18 15:01
+
+from collections import defaultdict
+from decimal import Decimal
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_balances(apps, schema_editor):
+    Debt = apps.get_model('debts', 'Debt')
+    DebtBalance = apps.get_model('debts', 'DebtBalance')
+
+    totals = Debt.objects \
+        .filter(models.Q(closed_request__isnull=True) | models.Q(closed_request__is_closed=False)) \
+        .values_list('creditor_id', 'debtor_id') \
+        .annotate(total=models.Sum('money')) \
+        .order_by()
+
+    balances = defaultdict(Decimal)
+    for creditor_id, debtor_id, total in totals.iterator():
+        balances[(creditor_id, debtor_id)] += total
+        balances[(debtor_id, creditor_id)] -= total
+
+    DebtBalance.objects.bulk_create(
+        (
+            DebtBalance(account_id=account_id, counterparty_id=counterparty_id, balance=balance)
+            for (account_id, counterparty_id), balance in balances.items()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_account_friends'),
+        ('debts', '0006_closeddebtrequest_debt_closed_request'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DebtBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('balance', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='debt_balances', to='accounts.account')),
+                ('counterparty', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.account')),
+            ],
+            options={
+                'unique_together': {('account', 'counterparty')},
+            },
+        ),
+        migrations.RunPython(fill_balances, migrations.RunPython.noop),
+    ]
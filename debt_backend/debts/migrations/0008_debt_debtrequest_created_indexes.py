@@ -0,0 +1,32 @@
+# Generated by Django 4.0 on 2026-10-18 15:04
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('debts', '0007_debtbalance'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='debt',
+            index=models.Index(fields=['creditor', '-created', '-id'], name='debt_creditor_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='debt',
+            index=models.Index(fields=['debtor', '-created', '-id'], name='debt_debtor_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='debtrequest',
+            index=models.Index(fields=['creditor', '-created', '-id'], name='debtrequest_creditor_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='debtrequest',
+            index=models.Index(fields=['debtor', '-created', '-id'], name='debtrequest_debtor_idx'),
+        ),
+    ]
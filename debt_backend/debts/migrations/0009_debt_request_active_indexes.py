@@ -0,0 +1,44 @@
+# Generated by Django 4.0 on 2026-10-18 15:06
+
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0002_alter_account_friends'),
+        ('debts', '0008_debt_debtrequest_created_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='debtrequest',
+            index=models.Index(condition=models.Q(('declined', False)), fields=['creditor', '-created', '-id'], name='debtrequest_active_creditor'),
+        ),
+        AddIndexConcurrently(
+            model_name='debtrequest',
+            index=models.Index(condition=models.Q(('declined', False)), fields=['debtor', '-created', '-id'], name='debtrequest_active_debtor'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='debtrequest',
+            name='debtrequest_creditor_idx',
+        ),
+        RemoveIndexConcurrently(
+            model_name='debtrequest',
+            name='debtrequest_debtor_idx',
+        ),
+        migrations.AlterField(
+            model_name='debt',
+            name='creditor',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='creditor_debts', to='accounts.account'),
+        ),
+        migrations.AlterField(
+            model_name='debt',
+            name='debtor',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='debtor_debts', to='accounts.account'),
+        ),
+    ]
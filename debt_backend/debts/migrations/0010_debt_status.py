@@ -0,0 +1,23 @@
+# Generated by Django 4.0 on 2026-10-18 15:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('debts', '0009_debt_request_active_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='debt',
+            name='closed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='debt',
+            name='status',
+            field=models.CharField(choices=[('active', 'Active'), ('closing', 'Closing'), ('closed', 'Closed')], default='active', max_length=16),
+        ),
+    ]
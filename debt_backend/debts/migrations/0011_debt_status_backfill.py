@@ -0,0 +1,57 @@
+# Generated by Django 4.0 on 2026-10-18 15:18
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models, transaction
+
+BATCH_SIZE = 1000
+
+
+def fill_statuses(apps, schema_editor):
+    """
+    Every batch is committed on its own, so debts table
+    is never locked for the whole backfill.
+    """
+    Debt = apps.get_model('debts', 'Debt')
+    ClosedDebtRequest = apps.get_model('debts', 'ClosedDebtRequest')
+
+    debts = Debt.objects.filter(closed_request__isnull=False).order_by('pk')
+    closed = ClosedDebtRequest.objects \
+        .filter(pk=models.OuterRef('closed_request_id')) \
+        .values('closed')[:1]
+
+    last_id = None
+    while True:
+        batch = debts if last_id is None else debts.filter(pk__gt=last_id)
+        ids = list(batch.values_list('pk', flat=True)[:BATCH_SIZE])
+        if not ids:
+            break
+
+        with transaction.atomic():
+            Debt.objects \
+                .filter(pk__in=ids, closed_request__is_closed=True) \
+                .update(status='closed', closed_at=models.Subquery(closed))
+            Debt.objects \
+                .filter(pk__in=ids, closed_request__is_closed=False) \
+                .update(status='closing')
+        last_id = ids[-1]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('debts', '0010_debt_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_statuses, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='debt',
+            index=models.Index(condition=models.Q(('status', 'closed'), _negated=True), fields=['creditor', '-created', '-id'], name='debt_active_creditor'),
+        ),
+        AddIndexConcurrently(
+            model_name='debt',
+            index=models.Index(condition=models.Q(('status', 'closed'), _negated=True), fields=['debtor', '-created', '-id'], name='debt_active_debtor'),
+        ),
+    ]
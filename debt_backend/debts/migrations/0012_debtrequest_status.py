@@ -0,0 +1,23 @@
+# Generated by Django 4.0 on 2026-10-18 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('debts', '0011_debt_status_backfill'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='debtrequest',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('accepted', 'Accepted'), ('declined', 'Declined'), ('expired', 'Expired')], default='pending', max_length=16),
+        ),
+        # workers not yet updated insert debt requests without status
+        migrations.RunSQL(
+            "ALTER TABLE debts_debtrequest ALTER COLUMN status SET DEFAULT 'pending'",
+            "ALTER TABLE debts_debtrequest ALTER COLUMN status DROP DEFAULT",
+        ),
+    ]
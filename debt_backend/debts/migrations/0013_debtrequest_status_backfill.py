@@ -0,0 +1,104 @@
+# Generated by Django 4.0 on 2026-10-18 15:20
+
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models, transaction
+
+BATCH_SIZE = 1000
+
+# Workers not yet updated keep reading and writing `declined` during
+# a rolling deploy, so the column stays and is kept in sync with `status`
+# both ways. It is dropped, with the trigger, by a follow-up migration
+# once no running code uses it.
+SYNC_DECLINED_SQL = """
+    CREATE FUNCTION debtrequest_sync_declined() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' AND NEW.declined IS DISTINCT FROM OLD.declined THEN
+            NEW.status := CASE WHEN NEW.declined THEN 'declined' ELSE 'pending' END;
+        ELSE
+            NEW.declined := NEW.status = 'declined';
+        END IF;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER debtrequest_sync_declined
+    BEFORE INSERT OR UPDATE ON debts_debtrequest
+    FOR EACH ROW EXECUTE FUNCTION debtrequest_sync_declined();
+"""
+DROP_SYNC_DECLINED_SQL = """
+    DROP TRIGGER debtrequest_sync_declined ON debts_debtrequest;
+    DROP FUNCTION debtrequest_sync_declined();
+"""
+
+
+def fill_statuses(apps, schema_editor):
+    """
+    Every batch is committed on its own, so debt requests table
+    is never locked for the whole backfill.
+    """
+    DebtRequest = apps.get_model('debts', 'DebtRequest')
+
+    debt_requests = DebtRequest.objects \
+        .filter(models.Q(declined=True) | models.Q(connected_debt__isnull=False)) \
+        .order_by('pk')
+
+    last_id = None
+    while True:
+        batch = debt_requests if last_id is None else debt_requests.filter(pk__gt=last_id)
+        ids = list(batch.values_list('pk', flat=True)[:BATCH_SIZE])
+        if not ids:
+            break
+
+        with transaction.atomic():
+            DebtRequest.objects \
+                .filter(pk__in=ids, connected_debt__isnull=False) \
+                .update(status='accepted')
+            DebtRequest.objects \
+                .filter(pk__in=ids, connected_debt__isnull=True, declined=True) \
+                .update(status='declined')
+        last_id = ids[-1]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('debts', '0012_debtrequest_status'),
+    ]
+
+    operations = [
+        migrations.RunSQL(SYNC_DECLINED_SQL, DROP_SYNC_DECLINED_SQL),
+        migrations.RunPython(fill_statuses, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='debtrequest',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['creditor', '-created', '-id'], name='debtrequest_pending_creditor'),
+        ),
+        AddIndexConcurrently(
+            model_name='debtrequest',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['debtor', '-created', '-id'], name='debtrequest_pending_debtor'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='debtrequest',
+            name='debtrequest_active_creditor',
+        ),
+        RemoveIndexConcurrently(
+            model_name='debtrequest',
+            name='debtrequest_active_debtor',
+        ),
+        # code stops using `declined`, rows it inserts get the default
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    "ALTER TABLE debts_debtrequest ALTER COLUMN declined SET DEFAULT false",
+                    "ALTER TABLE debts_debtrequest ALTER COLUMN declined DROP DEFAULT",
+                ),
+            ],
+            state_operations=[
+                migrations.RemoveField(
+                    model_name='debtrequest',
+                    name='declined',
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.0 on 2026-10-18 15:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_account_friends'),
+        ('debts', '0013_debtrequest_status_backfill'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DebtPayment',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('money', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('creator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='created_debt_payments', to='accounts.account')),
+                ('debt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='debts.debt')),
+            ],
+        ),
+    ]
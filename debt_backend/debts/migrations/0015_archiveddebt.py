@@ -0,0 +1,55 @@
+# Generated by Django 4.0 on 2026-10-18 15:30
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    # index on debts table is built without locking writes
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0002_alter_account_friends'),
+        ('debts', '0014_debtpayment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedDebt',
+            fields=[
+                ('id', models.UUIDField(primary_key=True, serialize=False)),
+                ('money', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('description', models.TextField(blank=True, default='')),
+                ('status', models.CharField(choices=[('active', 'Active'), ('closing', 'Closing'), ('closed', 'Closed')], max_length=16)),
+                ('closed_at', models.DateTimeField(blank=True, null=True)),
+                ('created', models.DateTimeField()),
+                ('from_request_id', models.UUIDField(null=True)),
+                ('closed_request_id', models.UUIDField(null=True)),
+                ('payments', models.JSONField(default=list)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        AddIndexConcurrently(
+            model_name='debt',
+            index=models.Index(condition=models.Q(('status', 'closed')), fields=['closed_at'], name='debt_closed_at'),
+        ),
+        migrations.AddField(
+            model_name='archiveddebt',
+            name='creditor',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.account'),
+        ),
+        migrations.AddField(
+            model_name='archiveddebt',
+            name='debtor',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.account'),
+        ),
+        migrations.AddIndex(
+            model_name='archiveddebt',
+            index=models.Index(fields=['creditor', 'created', 'id'], name='archiveddebt_creditor_created'),
+        ),
+        migrations.AddIndex(
+            model_name='archiveddebt',
+            index=models.Index(fields=['debtor', 'created', 'id'], name='archiveddebt_debtor_created'),
+        ),
+    ]
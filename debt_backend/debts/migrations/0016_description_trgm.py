@@ -0,0 +1,27 @@
+# Generated by Django 4.0 on 2026-10-18 15:37
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # indexes are built without locking writes
+    atomic = False
+
+    dependencies = [
+        # pg_trgm extension
+        ('accounts', '0003_username_trgm'),
+        ('debts', '0015_archiveddebt'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='debt',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['description'], name='debt_description_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        AddIndexConcurrently(
+            model_name='debtrequest',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['description'], name='debtrequest_description_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -1,24 +1,64 @@
 import uuid
-from typing import Optional
+from collections import defaultdict
+from decimal import Decimal
+from typing import Iterable, List, Optional, Tuple
 
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.core.exceptions import EmptyResultSet
+from django.db import connection, models, transaction
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
+from debts import constants
+
+
+class DebtQueryset(models.QuerySet):
+    def with_remaining_money(self) -> 'DebtQueryset':
+        """
+        Annotate `remaining_money` = money minus sum of payments,
+        computed by correlated aggregate over (debt) index of payments.
+        """
+        paid = DebtPayment.objects \
+            .filter(debt=models.OuterRef('pk')) \
+            .order_by() \
+            .values('debt') \
+            .annotate(paid=models.Sum('money')) \
+            .values('paid')
+        return self.annotate(
+            remaining_money=models.F('money') - Coalesce(
+                models.Subquery(
+                    paid,
+                    output_field=models.DecimalField(max_digits=14, decimal_places=2),
+                ),
+                Decimal('0'),
+            ),
+        )
+
 
 class Debt(models.Model):
     id = models.UUIDField(default=uuid.uuid4, primary_key=True)
     money = models.DecimalField(max_digits=12, decimal_places=2, null=False)
+    # indexed by (creditor/debtor, created, id) indexes from Meta
     creditor = models.ForeignKey(
         'accounts.Account',
         on_delete=models.CASCADE,
         related_name='creditor_debts',
+        db_index=False,
     )
     debtor = models.ForeignKey(
         'accounts.Account',
         on_delete=models.CASCADE,
         related_name='debtor_debts',
+        db_index=False,
     )
     description = models.TextField(default='', blank=True, null=False)
+    # denormalized state of `closed_request`
+    status = models.CharField(
+        max_length=16,
+        choices=constants.DEBT_STATUSES,
+        default=constants.DEBT_STATUS_ACTIVE,
+    )
+    closed_at = models.DateTimeField(null=True, blank=True)
 
     created = models.DateTimeField(auto_now_add=True)
 
@@ -38,34 +78,140 @@ class Debt(models.Model):
         related_query_name='from_debt',
     )
 
+    objects = models.Manager.from_queryset(DebtQueryset)()
+
+    # set by `with_remaining_money()` annotation
+    _remaining_money: Optional[Decimal] = None
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['creditor', '-created', '-id'], name='debt_creditor_created_idx'),
+            models.Index(fields=['debtor', '-created', '-id'], name='debt_debtor_created_idx'),
+            models.Index(
+                fields=['creditor', '-created', '-id'],
+                name='debt_active_creditor',
+                condition=~models.Q(status=constants.DEBT_STATUS_CLOSED),
+            ),
+            models.Index(
+                fields=['debtor', '-created', '-id'],
+                name='debt_active_debtor',
+                condition=~models.Q(status=constants.DEBT_STATUS_CLOSED),
+            ),
+            # candidates for archive
+            models.Index(
+                fields=['closed_at'],
+                name='debt_closed_at',
+                condition=models.Q(status=constants.DEBT_STATUS_CLOSED),
+            ),
+            # fuzzy search by description
+            GinIndex(
+                fields=['description'],
+                name='debt_description_trgm',
+                opclasses=['gin_trgm_ops'],
+            ),
+        ]
+
     @property
     def is_active(self) -> bool:
-        return not (self.closed_request and self.closed_request.is_closed)
+        return self.status != constants.DEBT_STATUS_CLOSED
+
+    @property
+    def remaining_money(self) -> Decimal:
+        """
+        Money left to pay. Comes from `Debt.objects.with_remaining_money()`,
+        looked up with a query only for not annotated debt.
+        """
+        if self._remaining_money is None:
+            paid = self.payments.aggregate(paid=models.Sum('money'))['paid']
+            self._remaining_money = self.money - (paid or Decimal('0'))
+        return self._remaining_money
+
+    @remaining_money.setter
+    def remaining_money(self, value: Decimal) -> None:
+        self._remaining_money = value
 
     def close_debt(self) -> 'ClosedDebtRequest':
-        closed_debt_request, created = ClosedDebtRequest.objects.get_or_create(
-            from_debt=self
-        )
-        if created:
-            self.save()
-        closed_debt_request.close()
+        with transaction.atomic():
+            if self.closed_request_id is None:
+                self._attach_closed_request()
+            closed_debt_request = self.closed_request
+            closed_debt_request.close()
         return closed_debt_request
 
+    def _attach_closed_request(self) -> None:
+        """
+        Attach new closed request by conditional update, not by save, so of
+        concurrent closes only the first one attaches its request and others reuse it.
+        """
+        closed_debt_request = ClosedDebtRequest.objects.create()
+        is_attached = Debt.objects \
+            .filter(pk=self.pk, closed_request__isnull=True) \
+            .update(closed_request=closed_debt_request)
+        if is_attached:
+            self.closed_request = closed_debt_request
+            return
+        closed_debt_request.delete()
+        self.refresh_from_db(fields=['closed_request'])
+
     @classmethod
-    def create_from_request(cls, debt_request: 'DebtRequest') -> 'Debt':
-        return cls.objects.create(
-            money=debt_request.money,
-            creditor=debt_request.creditor,
-            debtor=debt_request.debtor,
-            description=debt_request.description,
-
-            from_request=debt_request,
-        )
+    def create_from_request(cls, debt_request: 'DebtRequest') -> Optional['Debt']:
+        """
+        Accept pending `debt_request`. None if it's already accepted
+        or declined, concurrent accepts included.
+        """
+        with transaction.atomic():
+            accepted_status = constants.DEBT_REQUEST_STATUS_ACCEPTED
+            debt_requests = DebtRequest.objects.filter(pk=debt_request.pk)
+            if not debt_requests.transition_pending(accepted_status):
+                return None
+            debt_request.status = accepted_status
+
+            debt = cls.objects.create(
+                money=debt_request.money,
+                creditor=debt_request.creditor,
+                debtor=debt_request.debtor,
+                description=debt_request.description,
+
+                from_request=debt_request,
+            )
+            debt.remaining_money = debt.money
+            DebtBalance.objects.shift([
+                (debt.creditor_id, debt.debtor_id, debt.money),
+            ])
+        return debt
 
     def __str__(self) -> str:
         return f"{self.creditor} -> {self.debtor} ({self.money})"
 
 
+class DebtRequestQueryset(models.QuerySet):
+    def transition_pending(self, status: str) -> List[uuid.UUID]:
+        """
+        Move pending requests of queryset to `status` with a single
+        `UPDATE ... WHERE status = 'pending' RETURNING id`, return ids of moved ones.
+
+        Concurrent transitions of the same request are race-free without
+        locking it in advance: the second UPDATE waits for the first one,
+        re-checks the status and skips the request. The row stays locked only
+        until the end of caller's transaction.
+        """
+        pending = self.filter(status=constants.DEBT_REQUEST_STATUS_PENDING).order_by().values('id')
+        try:
+            subquery, params = pending.query.sql_with_params()
+        except EmptyResultSet:
+            # e.g. `pk__in=[]`
+            return []
+        table = self.model._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET status = %s "
+                f"WHERE status = %s AND id IN ({subquery}) "
+                f"RETURNING id",
+                [status, constants.DEBT_REQUEST_STATUS_PENDING, *params],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
 class DebtRequest(models.Model):
     id = models.UUIDField(default=uuid.uuid4, primary_key=True)
     money = models.DecimalField(max_digits=12, decimal_places=2, null=False)
@@ -85,10 +231,36 @@ class DebtRequest(models.Model):
         related_name='created_debt_requests',
     )
     description = models.TextField(default='', blank=True, null=False)
-    declined = models.BooleanField(default=False)
+    status = models.CharField(
+        max_length=16,
+        choices=constants.DEBT_REQUEST_STATUSES,
+        default=constants.DEBT_REQUEST_STATUS_PENDING,
+    )
 
     created = models.DateTimeField(auto_now_add=True)
 
+    objects = models.Manager.from_queryset(DebtRequestQueryset)()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['creditor', '-created', '-id'],
+                name='debtrequest_pending_creditor',
+                condition=models.Q(status=constants.DEBT_REQUEST_STATUS_PENDING),
+            ),
+            models.Index(
+                fields=['debtor', '-created', '-id'],
+                name='debtrequest_pending_debtor',
+                condition=models.Q(status=constants.DEBT_REQUEST_STATUS_PENDING),
+            ),
+            # fuzzy search by description
+            GinIndex(
+                fields=['description'],
+                name='debtrequest_description_trgm',
+                opclasses=['gin_trgm_ops'],
+            ),
+        ]
+
     @property
     def connected_debt(self) -> Optional[Debt]:
         try:
@@ -97,12 +269,28 @@ class DebtRequest(models.Model):
             return None
 
     @connected_debt.setter
-    def connected_debt(self, value: Debt) -> None:
-        self._connected_debt = value
+    def connected_debt(self, value: Optional[Debt]) -> None:
+        if value is None:
+            # remember that there is no debt, so it won't be looked up
+            related = DebtRequest._connected_debt.related  # pylint: disable=E1101
+            related.set_cached_value(self, None)
+        else:
+            self._connected_debt = value
+
+    @property
+    def declined(self) -> bool:
+        return self.status == constants.DEBT_REQUEST_STATUS_DECLINED
+
+    @declined.setter
+    def declined(self, value: bool) -> None:
+        if value:
+            self.status = constants.DEBT_REQUEST_STATUS_DECLINED
+        elif self.declined:
+            self.status = constants.DEBT_REQUEST_STATUS_PENDING
 
     @property
     def is_active(self) -> bool:
-        return self.connected_debt is None and self.declined is False
+        return self.status == constants.DEBT_REQUEST_STATUS_PENDING
 
     def __str__(self) -> str:
         return f"{self.creditor} -> {self.debtor} ({self.money})"
@@ -127,6 +315,174 @@ class ClosedDebtRequest(models.Model):
         self._from_debt = value
 
     def close(self) -> None:
-        self.is_closed = True
-        self.closed = timezone.now()
-        self.save()
+        """
+        Close request and its debt by conditional updates instead of row locks,
+        so of concurrent closes only the first one shifts the balance.
+        """
+        with transaction.atomic():
+            closed = timezone.now()
+            is_closed_now = ClosedDebtRequest.objects \
+                .filter(pk=self.pk, is_closed=False) \
+                .update(is_closed=True, closed=closed)
+            if not is_closed_now:
+                self.refresh_from_db(fields=['is_closed', 'closed'])
+                return
+            self.is_closed = True
+            self.closed = closed
+
+            debt = self.from_debt
+            if debt is None:
+                return
+            self._invalidate_debts(debt)
+            # waits for running payment of the debt, it holds the debt locked
+            is_debt_closed_now = Debt.objects \
+                .filter(pk=debt.pk) \
+                .exclude(status=constants.DEBT_STATUS_CLOSED) \
+                .update(status=constants.DEBT_STATUS_CLOSED, closed_at=closed)
+            debt.status = constants.DEBT_STATUS_CLOSED
+            debt.closed_at = closed
+            if is_debt_closed_now:
+                # paid part has already left the balance with payments
+                remaining_money = Debt.objects \
+                    .with_remaining_money() \
+                    .values_list('remaining_money', flat=True) \
+                    .get(pk=debt.pk)
+                DebtBalance.objects.shift([
+                    (debt.creditor_id, debt.debtor_id, -remaining_money),
+                ])
+
+    @staticmethod
+    def _invalidate_debts(debt: Debt) -> None:
+        # update doesn't send `post_save`, closing is announced here
+        from debts import selectors
+
+        selectors.invalidate_debts_summary([debt.creditor_id, debt.debtor_id])
+
+
+class ArchivedDebt(models.Model):
+    """
+    Debt closed long ago, moved out of `Debt` by `archive_debts` command,
+    so tables and indexes of active debts stay small.
+    Payments are kept as JSON, links to requests as plain ids.
+    """
+    id = models.UUIDField(primary_key=True)
+    money = models.DecimalField(max_digits=12, decimal_places=2, null=False)
+    creditor = models.ForeignKey(
+        'accounts.Account',
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False,
+    )
+    debtor = models.ForeignKey(
+        'accounts.Account',
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False,
+    )
+    description = models.TextField(default='', blank=True, null=False)
+    status = models.CharField(max_length=16, choices=constants.DEBT_STATUSES)
+    closed_at = models.DateTimeField(null=True, blank=True)
+    created = models.DateTimeField()
+
+    from_request_id = models.UUIDField(null=True)
+    closed_request_id = models.UUIDField(null=True)
+    payments = models.JSONField(default=list)
+
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['creditor', 'created', 'id'],
+                name='archiveddebt_creditor_created',
+            ),
+            models.Index(
+                fields=['debtor', 'created', 'id'],
+                name='archiveddebt_debtor_created',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.creditor} -> {self.debtor} ({self.money})"
+
+
+class DebtPayment(models.Model):
+    """
+    Part of debt paid back to creditor. Debt is closed when it is paid in full.
+    """
+    id = models.UUIDField(default=uuid.uuid4, primary_key=True)
+    debt = models.ForeignKey(
+        'debts.Debt',
+        on_delete=models.CASCADE,
+        related_name='payments',
+    )
+    money = models.DecimalField(max_digits=12, decimal_places=2, null=False)
+    creator = models.ForeignKey(
+        'accounts.Account',
+        on_delete=models.CASCADE,
+        related_name='created_debt_payments',
+    )
+
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"{self.debt} paid {self.money}"
+
+
+class DebtBalanceQueryset(models.QuerySet):
+    def shift(self, changes: Iterable[Tuple[uuid.UUID, uuid.UUID, Decimal]]) -> None:
+        """
+        Apply `(creditor_id, debtor_id, money)` changes to both sides of every pair
+        with a single upsert. Rows are written in a stable order to avoid deadlocks
+        between concurrent shifts of the same pairs.
+        """
+        deltas = defaultdict(Decimal)
+        for creditor_id, debtor_id, money in changes:
+            deltas[(creditor_id, debtor_id)] += money
+            deltas[(debtor_id, creditor_id)] -= money
+
+        rows = sorted(
+            (account_id, counterparty_id, money)
+            for (account_id, counterparty_id), money in deltas.items()
+            if money
+        )
+        if not rows:
+            return
+
+        table = self.model._meta.db_table
+        values = ', '.join(['(%s, %s, %s)'] * len(rows))
+        params = [value for row in rows for value in row]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (account_id, counterparty_id, balance) "
+                f"VALUES {values} "
+                f"ON CONFLICT (account_id, counterparty_id) "
+                f"DO UPDATE SET balance = {table}.balance + EXCLUDED.balance",
+                params,
+            )
+
+
+class DebtBalance(models.Model):
+    """
+    How much `counterparty` owes `account` across all active debts.
+    Negative balance means `account` is the one who owes.
+    """
+    account = models.ForeignKey(
+        'accounts.Account',
+        on_delete=models.CASCADE,
+        related_name='debt_balances',
+    )
+    counterparty = models.ForeignKey(
+        'accounts.Account',
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    balance = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0'))
+
+    objects = models.Manager.from_queryset(DebtBalanceQueryset)()
+
+    class Meta:
+        unique_together = ('account', 'counterparty')
+
+    def __str__(self) -> str:
+        return f"{self.account} <- {self.counterparty} ({self.balance})"
@@ -1,23 +1,208 @@
-from django.db.models import Q, QuerySet
+import uuid
+from decimal import Decimal
+from typing import Iterable, Tuple
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.core.cache import cache
+from django.db.models import Case, CharField, F, Q, QuerySet, Sum, Value, When
+from django.db.models.functions import Greatest
 
 from accounts.models import Account
-from debts.models import Debt, DebtRequest
+from debts import constants
+from debts.models import Debt, DebtPayment, DebtRequest, DebtBalance
+from redis_utils import COLLECTION_DEBTS, CollectionVersion
 
 
-def get_related_debts(user: Account) -> QuerySet[Debt]:
-    return Debt.objects \
-        .filter(Q(debtor=user) | Q(creditor=user)) \
-        .order_by('-created')
+ACTIVE_DEBT = ~Q(status=constants.DEBT_STATUS_CLOSED)
+
+
+def get_related_debts_by_role(
+        user: Account,
+        only_active: bool = False,
+) -> Tuple[QuerySet[Debt], QuerySet[Debt]]:
+    """
+    Debts where user is debtor and debts where user is creditor.
+    Each part is served by its own (debtor/creditor, created) index,
+    use them in UNION instead of OR-filter.
+    """
+    debts = Debt.objects \
+        .select_related('creditor', 'debtor') \
+        .with_remaining_money() \
+        .order_by('-created', '-id')
+    if only_active:
+        debts = debts.filter(ACTIVE_DEBT)
+    return debts.filter(debtor=user), debts.filter(creditor=user)
+
+
+def get_related_debts(user: Account, only_active: bool = False) -> QuerySet[Debt]:
+    as_debtor, as_creditor = get_related_debts_by_role(user, only_active=only_active)
+    return as_debtor.union(as_creditor, all=True).order_by('-created', '-id')
 
 
 def get_common_debts(user: Account, friend: Account) -> QuerySet[Debt]:
     return Debt.objects \
+        .select_related('creditor', 'debtor') \
+        .with_remaining_money() \
         .filter(Q(debtor=user, creditor=friend) | Q(debtor=friend, creditor=user)) \
-        .order_by('-created')
+        .order_by('-created', '-id')
+
+
+def get_active_common_debts(user: Account, friend: Account) -> QuerySet[Debt]:
+    return get_common_debts(user, friend).filter(ACTIVE_DEBT)
+
+
+def get_related_debt(user: Account, debt_id: uuid.UUID) -> Debt:
+    return Debt.objects \
+        .filter(Q(creditor=user) | Q(debtor=user)) \
+        .get(pk=debt_id)
+
+
+def get_debt_payments(debt: Debt) -> QuerySet[DebtPayment]:
+    return DebtPayment.objects \
+        .filter(debt=debt) \
+        .select_related('creator') \
+        .order_by('-created', '-id')
+
+
+def search_debts(user: Account, query: str, limit: int) -> QuerySet:
+    """
+    `values()` rows of debts and debt requests of user whose description
+    or counterparty username is similar to `query`, best matches first.
+
+    Every (model, role, matched by) is a separate part of UNION ALL instead
+    of one OR-filter, so each part is served by its own indexes: trigram index
+    on description combined with role index, or role index for the few
+    counterparties found by trigram index on username.
+    """
+    counterparties = Account.objects \
+        .filter(username__trigram_word_similar=query) \
+        .values('id')
+    description_matches = Q(description__trigram_word_similar=query)
+
+    parts = []
+    for model, kind in ((Debt, constants.KIND_DEBT), (DebtRequest, constants.KIND_DEBT_REQUEST)):
+        for role, counterparty in (('creditor', 'debtor'), ('debtor', 'creditor')):
+            matches = (
+                description_matches,
+                # not matched by description, so parts don't overlap
+                Q(**{f'{counterparty}__in': counterparties}) & ~description_matches,
+            )
+            parts.extend(
+                model.objects
+                .filter(**{role: user})
+                .filter(match)
+                .values(
+                    'id', 'money', 'creditor_id', 'creditor__username',
+                    'debtor_id', 'debtor__username', 'description', 'created', 'status',
+                    kind=Value(kind, output_field=CharField()),
+                    rank=Greatest(
+                        TrigramWordSimilarity(query, 'description'),
+                        TrigramWordSimilarity(query, f'{counterparty}__username'),
+                    ),
+                )
+                .order_by('-rank', '-created', '-id')[:limit]
+                for match in matches
+            )
+
+    first, *rest = parts
+    return first.union(*rest, all=True).order_by('-rank', '-created', '-id')[:limit]
+
+
+def get_active_debt_requests_by_role(
+        user: Account,
+) -> Tuple[QuerySet[DebtRequest], QuerySet[DebtRequest]]:
+    """
+    Active debt requests where user is debtor and where user is creditor.
+    Each part is served by partial index on pending debt requests.
+    """
+    debt_requests = DebtRequest.objects \
+        .filter(status=constants.DEBT_REQUEST_STATUS_PENDING) \
+        .select_related('creditor', 'debtor') \
+        .order_by('-created', '-id')
+    return debt_requests.filter(debtor=user), debt_requests.filter(creditor=user)
+
+
+def get_active_debt_requests(user: Account) -> QuerySet[DebtRequest]:
+    as_debtor, as_creditor = get_active_debt_requests_by_role(user)
+    return as_debtor.union(as_creditor, all=True).order_by('-created', '-id')
+
+
+def get_balance(user: Account, friend: Account) -> Decimal:
+    balance = DebtBalance.objects \
+        .filter(account=user, counterparty=friend) \
+        .values_list('balance', flat=True) \
+        .first()
+    return balance if balance is not None else Decimal('0')
+
+
+def get_balances(user: Account) -> QuerySet[DebtBalance]:
+    return DebtBalance.objects \
+        .filter(account=user) \
+        .exclude(balance=0) \
+        .select_related('counterparty') \
+        .order_by('-balance')
+
+
+def _get_debts_summary_key(account_id: uuid.UUID, version: str) -> str:
+    return f'debts:summary:{account_id}:{version}'
+
+
+def get_debts_summary(user: Account) -> dict:
+    """
+    Totals of active debts of user (without paid parts) and breakdown by friend.
+    Cached until debts of user change, see `invalidate_debts_summary`.
+    """
+    # version is read before summary is computed, so summary computed
+    # before a change is stored under version the change has already replaced
+    version = CollectionVersion(COLLECTION_DEBTS, user.id).get()
+    key = _get_debts_summary_key(user.id, version)
+    summary = cache.get(key)
+    if summary is None:
+        summary = _get_debts_summary(user)
+        cache.set(key, summary, timeout=constants.DEBTS_SUMMARY_CACHE_TIMEOUT)
+    return summary
+
+
+def _get_debts_summary(user: Account) -> dict:
+    friends = list(
+        Debt.objects
+        .filter(Q(creditor=user) | Q(debtor=user))
+        .filter(ACTIVE_DEBT)
+        .with_remaining_money()
+        .annotate(
+            friend_id=Case(When(creditor=user, then=F('debtor_id')), default=F('creditor_id')),
+            friend_username=Case(
+                When(creditor=user, then=F('debtor__username')),
+                default=F('creditor__username'),
+            ),
+        )
+        .values('friend_id', 'friend_username')
+        .annotate(
+            owed=Sum('remaining_money', filter=Q(creditor=user), default=Decimal('0')),
+            owing=Sum('remaining_money', filter=Q(debtor=user), default=Decimal('0')),
+        )
+        .order_by('friend_username')
+    )
+    by_friend = [
+        {
+            'friend': {'id': row['friend_id'], 'username': row['friend_username']},
+            'owed': row['owed'],
+            'owing': row['owing'],
+            'balance': row['owed'] - row['owing'],
+        }
+        for row in friends
+    ]
+    owed = sum((row['owed'] for row in by_friend), Decimal('0'))
+    owing = sum((row['owing'] for row in by_friend), Decimal('0'))
+    return {
+        'owed': owed,
+        'owing': owing,
+        'balance': owed - owing,
+        'friends': by_friend,
+    }
 
 
-def get_active_debt_requests(user: Account) -> QuerySet[Debt]:
-    return DebtRequest.objects \
-        .filter(Q(debtor=user) | Q(creditor=user)) \
-        .filter(connected_debt__isnull=True, declined=False) \
-        .order_by('-created')
+def invalidate_debts_summary(account_ids: Iterable[uuid.UUID]) -> None:
+    # cached summaries are keyed by debts version, bumped one is never read again,
+    # and expires by timeout
+    CollectionVersion.bump(COLLECTION_DEBTS, account_ids)
@@ -1,6 +1,25 @@
-from debts.serializers.debts import OutputDebtSerializer
+from debts.serializers.debts import (
+    OutputDebtSerializer,
+    OutputDebtValuesSerializer,
+    InputDebtPaymentSerializer,
+    OutputDebtPaymentSerializer,
+    OutputCreatedDebtPaymentSerializer,
+    InputDebtListFilterSerializer,
+    InputDebtsExportSerializer,
+    InputDebtsSearchSerializer,
+    OutputDebtsSearchResultSerializer,
+    OutputDebtsSearchResultValuesSerializer,
+    OutputClosedCommonDebtsSerializer,
+    OutputDebtsSummarySerializer,
+)
 from debts.serializers.debt_requests import (
     InputDebtRequestSerializer,
     InputDebtRequestUpdateSerializer,
+    InputDebtRequestBulkUpdateSerializer,
+    OutputDebtRequestBulkUpdateSerializer,
     OutputDebtRequestSerializer,
+    OutputDebtRequestValuesSerializer,
+    InputSplitDebtRequestSerializer,
 )
+from debts.serializers.balances import OutputDebtBalanceSerializer
+from debts.serializers.settle_up import OutputTransferSerializer
@@ -0,0 +1,8 @@
+from rest_framework import serializers
+
+from accounts.serializers import OutputAccountShortSerializer
+
+
+class OutputDebtBalanceSerializer(serializers.Serializer):
+    counterparty = OutputAccountShortSerializer()
+    balance = serializers.DecimalField(max_digits=14, decimal_places=2)
@@ -1,8 +1,12 @@
+from decimal import Decimal
+
 from rest_framework import serializers
 
 from accounts.serializers import OutputAccountShortSerializer
 from debts import constants
 from debts.models import DebtRequest
+from debts.serializers.debts import OutputDebtSerializer, as_account
+from fast_serializers import ValuesSerializer, as_datetime, as_decimal, as_str, as_uuid
 
 
 class InputDebtRequestSerializer(serializers.Serializer):
@@ -23,7 +27,7 @@ class OutputDebtRequestSerializer(serializers.ModelSerializer):
             user = self.context['request'].user
         else:
             user = self.context['user']
-        return user == obj.creator
+        return user.id == obj.creator_id
 
     class Meta:
         model = DebtRequest
@@ -34,6 +38,66 @@ class OutputDebtRequestSerializer(serializers.ModelSerializer):
         ]
 
 
+class OutputDebtRequestValuesSerializer(ValuesSerializer):
+    """`OutputDebtRequestSerializer` for `values()` of debt requests."""
+    values = (
+        'id', 'money', 'creditor_id', 'creditor__username',
+        'debtor_id', 'debtor__username', 'creator_id', 'description',
+        'created', 'status',
+    )
+
+    def get_fields(self):
+        if self.context.get('request'):
+            user = self.context['request'].user
+        else:
+            user = self.context['user']
+
+        return {
+            'id': as_uuid('id'),
+            'money': as_decimal('money', max_digits=12, decimal_places=2),
+            'creditor': as_account('creditor'),
+            'debtor': as_account('debtor'),
+            'is_yours': lambda row: row['creator_id'] == user.id,
+            'description': as_str('description'),
+            'created': as_datetime('created'),
+            'is_active': lambda row: row['status'] == constants.DEBT_REQUEST_STATUS_PENDING,
+        }
+
+
 class InputDebtRequestUpdateSerializer(serializers.Serializer):
     debt_request_id = serializers.UUIDField()
     status = serializers.ChoiceField(constants.DEBT_REQUEST_STATUS)
+
+
+class InputDebtRequestBulkUpdateSerializer(serializers.Serializer):
+    debt_request_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        max_length=100,
+    )
+    status = serializers.ChoiceField(constants.DEBT_REQUEST_STATUS)
+
+
+class OutputDebtRequestBulkUpdateSerializer(serializers.Serializer):
+    debts = OutputDebtSerializer(many=True)
+    errors = serializers.DictField(
+        child=serializers.CharField(),
+        help_text="Reason by id for every debt request that was not updated.",
+    )
+
+
+class InputSplitParticipantSerializer(serializers.Serializer):
+    account_id = serializers.UUIDField()
+    share = serializers.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        required=False,
+        help_text="Weight for `shares` split, amount for `exact` split.",
+    )
+
+
+class InputSplitDebtRequestSerializer(serializers.Serializer):
+    money = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=Decimal('0.01'))
+    description = serializers.CharField(allow_blank=True, default='')
+    split = serializers.ChoiceField(constants.SPLIT_RULES)
+    participants = InputSplitParticipantSerializer(many=True, allow_empty=False)
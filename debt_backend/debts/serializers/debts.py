@@ -1,16 +1,154 @@
 from rest_framework import serializers
 
 from accounts.serializers import OutputAccountShortSerializer
-from debts.models import Debt
+from debts import constants
+from debts.models import Debt, DebtPayment
+from fast_serializers import (
+    ValuesSerializer,
+    as_datetime,
+    as_decimal,
+    as_object,
+    as_str,
+    as_uuid,
+    as_value,
+)
 
 
 class OutputDebtSerializer(serializers.ModelSerializer):
     debtor = OutputAccountShortSerializer()
     creditor = OutputAccountShortSerializer()
+    remaining_money = serializers.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        help_text="Money left after payments.",
+    )
 
     class Meta:
         model = Debt
         fields = [
-            'id', 'money', 'creditor',
+            'id', 'money', 'remaining_money', 'creditor',
             'debtor', 'description', 'created',
+            'status', 'closed_at',
         ]
+
+
+def as_account(field: str):
+    """`OutputAccountShortSerializer` of account joined by `field`."""
+    return as_object({
+        'id': as_uuid(f'{field}_id'),
+        'username': as_str(f'{field}__username'),
+    })
+
+
+class OutputDebtValuesSerializer(ValuesSerializer):
+    """`OutputDebtSerializer` for `values()` of debts annotated with remaining money."""
+    values = (
+        'id', 'money', 'remaining_money', 'creditor_id', 'creditor__username',
+        'debtor_id', 'debtor__username', 'description', 'created',
+        'status', 'closed_at',
+    )
+
+    def get_fields(self):
+        return {
+            'id': as_uuid('id'),
+            'money': as_decimal('money', max_digits=12, decimal_places=2),
+            'remaining_money': as_decimal('remaining_money', max_digits=12, decimal_places=2),
+            'creditor': as_account('creditor'),
+            'debtor': as_account('debtor'),
+            'description': as_str('description'),
+            'created': as_datetime('created'),
+            'status': as_value('status'),
+            'closed_at': as_datetime('closed_at'),
+        }
+
+
+class InputDebtPaymentSerializer(serializers.Serializer):
+    money = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=constants.CENTS)
+
+
+class OutputDebtPaymentSerializer(serializers.ModelSerializer):
+    creator = OutputAccountShortSerializer()
+
+    class Meta:
+        model = DebtPayment
+        fields = ['id', 'money', 'creator', 'created']
+
+
+class OutputCreatedDebtPaymentSerializer(OutputDebtPaymentSerializer):
+    debt = OutputDebtSerializer()
+
+    class Meta(OutputDebtPaymentSerializer.Meta):
+        fields = [*OutputDebtPaymentSerializer.Meta.fields, 'debt']
+
+
+class InputDebtListFilterSerializer(serializers.Serializer):
+    active = serializers.BooleanField(default=False)
+
+
+class InputDebtsExportSerializer(serializers.Serializer):
+    # not `format`, it is reserved by DRF for renderer selection
+    export_format = serializers.ChoiceField(
+        constants.EXPORT_FORMATS,
+        default=constants.EXPORT_FORMAT_CSV,
+    )
+
+
+class InputDebtsSearchSerializer(serializers.Serializer):
+    q = serializers.CharField(min_length=constants.SEARCH_MIN_LENGTH, max_length=100)
+    limit = serializers.IntegerField(
+        default=constants.SEARCH_LIMIT,
+        min_value=1,
+        max_value=constants.SEARCH_MAX_LIMIT,
+    )
+
+
+class OutputDebtsSearchResultSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField((constants.KIND_DEBT, constants.KIND_DEBT_REQUEST))
+    id = serializers.UUIDField()
+    money = serializers.DecimalField(max_digits=12, decimal_places=2)
+    creditor = OutputAccountShortSerializer()
+    debtor = OutputAccountShortSerializer()
+    description = serializers.CharField()
+    created = serializers.DateTimeField()
+    status = serializers.CharField()
+    rank = serializers.FloatField(help_text="Similarity to query from 0 to 1.")
+
+
+class OutputDebtsSearchResultValuesSerializer(ValuesSerializer):
+    """`OutputDebtsSearchResultSerializer` for rows of `selectors.search_debts`."""
+
+    def get_fields(self):
+        return {
+            'kind': as_value('kind'),
+            'id': as_uuid('id'),
+            'money': as_decimal('money', max_digits=12, decimal_places=2),
+            'creditor': as_account('creditor'),
+            'debtor': as_account('debtor'),
+            'description': as_str('description'),
+            'created': as_datetime('created'),
+            'status': as_value('status'),
+            'rank': as_value('rank'),
+        }
+
+
+class OutputClosedCommonDebtsSerializer(serializers.Serializer):
+    money = serializers.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        help_text="Settled amount, positive if friend owed you, negative if you owed friend.",
+    )
+    debts_count = serializers.IntegerField()
+
+
+class OutputFriendDebtsSummarySerializer(serializers.Serializer):
+    friend = OutputAccountShortSerializer()
+    owed = serializers.DecimalField(max_digits=14, decimal_places=2, help_text="Friend owes you.")
+    owing = serializers.DecimalField(max_digits=14, decimal_places=2, help_text="You owe friend.")
+    balance = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class OutputDebtsSummarySerializer(serializers.Serializer):
+    owed = serializers.DecimalField(max_digits=14, decimal_places=2, help_text="Friends owe you.")
+    owing = serializers.DecimalField(max_digits=14, decimal_places=2, help_text="You owe friends.")
+    balance = serializers.DecimalField(max_digits=14, decimal_places=2)
+    friends = OutputFriendDebtsSummarySerializer(many=True)
@@ -0,0 +1,9 @@
+from rest_framework import serializers
+
+from accounts.serializers import OutputAccountShortSerializer
+
+
+class OutputTransferSerializer(serializers.Serializer):
+    debtor = OutputAccountShortSerializer()
+    creditor = OutputAccountShortSerializer()
+    money = serializers.DecimalField(max_digits=14, decimal_places=2)
@@ -1,7 +1,23 @@
 from debts.services.debt_requests import (
     CreateDebtRequestService,
     DebtRequestUpdateStatusService,
+    BulkDebtRequestUpdateStatusService,
 )
 from debts.services.closed_debt_requests import (
     CreateClosedDebtRequestService,
-)
\ No newline at end of file
+    CloseCommonDebtsService,
+    ClosedCommonDebts,
+)
+from debts.services.settle_up import (
+    SettleUpService,
+    Transfer,
+    minimize_transfers,
+)
+from debts.services.split_debt_requests import (
+    SplitDebtRequestService,
+    split_money,
+)
+from debts.services.debt_payments import CreateDebtPaymentService
+from debts.services.archive import ArchiveDebtsService
+from debts.services.export import ExportDebtsService
+from debts.services.import_debts import ImportDebtsService, ImportResult, ImportRowError
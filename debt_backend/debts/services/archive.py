@@ -0,0 +1,95 @@
+import uuid
+from datetime import timedelta
+from typing import List, Tuple
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from debts import constants
+from debts.models import ArchivedDebt, Debt, DebtPayment
+from redis_utils import COLLECTION_DEBTS, CollectionVersion
+
+
+class ArchiveDebtsService:
+    """
+    Move debts closed more than `older_than_days` ago with their payments
+    from `Debt` to `ArchivedDebt`.
+
+    Every batch is moved by a single statement and committed on its own,
+    so debts are never locked for the whole run and the job can be stopped at any time.
+    """
+    def __init__(
+            self,
+            older_than_days: int = constants.DEBTS_ARCHIVE_AFTER_DAYS,
+            batch_size: int = constants.DEBTS_ARCHIVE_BATCH_SIZE,
+    ):
+        self.closed_before = timezone.now() - timedelta(days=older_than_days)
+        self.batch_size = batch_size
+
+    def archive_debts(self) -> int:
+        archived = 0
+        while True:
+            with transaction.atomic():
+                participants = self._archive_batch()
+                CollectionVersion.bump(COLLECTION_DEBTS, list({
+                    account_id for pair in participants for account_id in pair
+                }))
+            if not participants:
+                return archived
+            archived += len(participants)
+
+    def _archive_batch(self) -> List[Tuple[uuid.UUID, uuid.UUID]]:
+        """
+        Move one batch, return (creditor_id, debtor_id) of every moved debt.
+        """
+        debts = Debt._meta.db_table
+        payments = DebtPayment._meta.db_table
+        archive = ArchivedDebt._meta.db_table
+        with connection.cursor() as cursor:
+            # served by partial index on closed_at of closed debts;
+            # debts locked by running transactions are left for next run
+            cursor.execute(f"""
+                WITH batch AS (
+                    SELECT id FROM {debts}
+                    WHERE status = %(closed)s AND closed_at < %(closed_before)s
+                    ORDER BY closed_at
+                    LIMIT %(batch_size)s
+                    FOR UPDATE SKIP LOCKED
+                ), moved_payments AS (
+                    DELETE FROM {payments} AS payment USING batch
+                    WHERE payment.debt_id = batch.id
+                    RETURNING payment.*
+                ), moved AS (
+                    DELETE FROM {debts} AS debt USING batch
+                    WHERE debt.id = batch.id
+                    RETURNING debt.*
+                )
+                INSERT INTO {archive} (
+                    id, money, creditor_id, debtor_id, description, status, closed_at, created,
+                    from_request_id, closed_request_id, payments, archived_at
+                )
+                SELECT
+                    id, money, creditor_id, debtor_id, description, status, closed_at, created,
+                    from_request_id, closed_request_id,
+                    COALESCE(
+                        (
+                            SELECT jsonb_agg(jsonb_build_object(
+                                'id', payment.id,
+                                'money', payment.money::text,
+                                'creator_id', payment.creator_id,
+                                'created', payment.created
+                            ) ORDER BY payment.created)
+                            FROM moved_payments AS payment
+                            WHERE payment.debt_id = moved.id
+                        ),
+                        '[]'::jsonb
+                    ),
+                    now()
+                FROM moved
+                RETURNING creditor_id, debtor_id
+            """, {
+                'closed': constants.DEBT_STATUS_CLOSED,
+                'closed_before': self.closed_before,
+                'batch_size': self.batch_size,
+            })
+            return cursor.fetchall()
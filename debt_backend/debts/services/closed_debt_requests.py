@@ -1,9 +1,15 @@
 import uuid
+from decimal import Decimal
+from typing import NamedTuple
 
+from django.db import transaction
+from django.db.models import Case, F, Sum, When
+from django.utils import timezone
 from rest_framework.exceptions import ValidationError
 
 from accounts.models import Account
-from debts.models import Debt, ClosedDebtRequest
+from debts import constants, selectors
+from debts.models import Debt, ClosedDebtRequest, DebtBalance
 
 
 class CreateClosedDebtRequestService:
@@ -25,5 +31,73 @@ class CreateClosedDebtRequestService:
     def close_as_debtor(self):
         closed_request = ClosedDebtRequest.objects.create(from_debt=self.debt)
         self.debt.closed_request = closed_request
+        self.debt.status = constants.DEBT_STATUS_CLOSING
         self.debt.save()
         return closed_request
+
+
+class ClosedCommonDebts(NamedTuple):
+    # positive if friend owed user, negative if user owed friend
+    money: Decimal
+    debts_count: int
+
+
+class CloseCommonDebtsService:
+    """
+    Close every active debt between `user` and `friend` in one transaction.
+    """
+    def __init__(self, user: Account, friend_id: uuid.UUID):
+        self.user = user
+        self.friend = Account.objects.get(pk=friend_id)
+
+    def close_common_debts(self) -> ClosedCommonDebts:
+        if self.friend == self.user:
+            raise ValidationError("Cannot close debts with self.")
+
+        with transaction.atomic():
+            debts = list(
+                selectors.get_active_common_debts(self.user, self.friend)
+                .select_related(None)
+                .select_for_update(of=('self',))
+                .only('id', 'closed_request_id')
+            )
+            if not debts:
+                return ClosedCommonDebts(money=Decimal('0'), debts_count=0)
+
+            money = self._get_net_money(debts)
+            self._close(debts)
+            DebtBalance.objects.shift([
+                (self.user.id, self.friend.id, -money),
+            ])
+            selectors.invalidate_debts_summary([self.user.id, self.friend.id])
+        return ClosedCommonDebts(money=money, debts_count=len(debts))
+
+    def _get_net_money(self, debts) -> Decimal:
+        return Debt.objects \
+            .filter(pk__in=[debt.id for debt in debts]) \
+            .with_remaining_money() \
+            .aggregate(money=Sum(Case(
+                When(creditor=self.user, then=F('remaining_money')),
+                default=-F('remaining_money'),
+            )))['money']
+
+    @staticmethod
+    def _close(debts) -> None:
+        closed = timezone.now()
+
+        # close requests already opened by debtors
+        ClosedDebtRequest.objects \
+            .filter(pk__in=[debt.closed_request_id for debt in debts if debt.closed_request_id]) \
+            .update(is_closed=True, closed=closed)
+
+        not_requested = [debt for debt in debts if debt.closed_request_id is None]
+        closed_requests = ClosedDebtRequest.objects.bulk_create([
+            ClosedDebtRequest(is_closed=True, closed=closed)
+            for _ in not_requested
+        ])
+        for debt, closed_request in zip(not_requested, closed_requests):
+            debt.closed_request = closed_request
+        for debt in debts:
+            debt.status = constants.DEBT_STATUS_CLOSED
+            debt.closed_at = closed
+        Debt.objects.bulk_update(debts, ['closed_request', 'status', 'closed_at'])
@@ -0,0 +1,61 @@
+import uuid
+from decimal import Decimal
+
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from accounts.models import Account
+from debts import selectors
+from debts.models import Debt, DebtPayment, DebtBalance
+
+
+class CreateDebtPaymentService:
+    """
+    Register money paid back by debtor. Only creditor can confirm that money
+    is received. Debt is closed when remaining money reaches zero.
+    """
+    def __init__(self, debt_id: uuid.UUID, creator: Account, money: Decimal):
+        self.debt_id = debt_id
+        self.creator = creator
+        self.money = money
+
+    def create_payment(self) -> DebtPayment:
+        with transaction.atomic():
+            # lock debt, so concurrent payments can't exceed it
+            debt = Debt.objects \
+                .select_for_update() \
+                .with_remaining_money() \
+                .get(pk=self.debt_id)
+            self._validate_creator_is_creditor(debt)
+            self._validate_is_active(debt)
+            self._validate_money(debt)
+
+            payment = DebtPayment.objects.create(
+                debt=debt,
+                money=self.money,
+                creator=self.creator,
+            )
+            DebtBalance.objects.shift([
+                (debt.creditor_id, debt.debtor_id, -self.money),
+            ])
+            if self.money == debt.remaining_money:
+                # closing invalidates summary by itself
+                debt.close_debt()
+            else:
+                selectors.invalidate_debts_summary([debt.creditor_id, debt.debtor_id])
+            debt.remaining_money -= self.money
+        return payment
+
+    def _validate_creator_is_creditor(self, debt: Debt):
+        if self.creator.id == debt.debtor_id:
+            raise ValidationError("Only creditor can register payment.")
+        if self.creator.id != debt.creditor_id:
+            raise Debt.DoesNotExist
+
+    def _validate_is_active(self, debt: Debt):
+        if not debt.is_active:
+            raise ValidationError("Debt is not active.")
+
+    def _validate_money(self, debt: Debt):
+        if self.money > debt.remaining_money:
+            raise ValidationError("Payment is greater than remaining money.")
@@ -1,24 +1,32 @@
 import uuid
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
+from django.db import transaction
 from rest_framework.exceptions import ValidationError, PermissionDenied
 
+from accounts import selectors as accounts_selectors
 from accounts.models import Account
 from debts import constants
-from debts.models import DebtRequest, Debt
-from debts.signals import debt_request_done
+from debts.models import DebtRequest, Debt, DebtBalance
+from debts.signals import debt_request_done, debt_requests_done
+from redis_utils import COLLECTION_DEBT_REQUESTS, CollectionVersion
 
 
 class CreateDebtRequestService:
+    """
+    Creator is one of participants and is already loaded, friendship is
+    checked by cached friend ids, so only the other participant is queried,
+    and loaded accounts are reused by `post_save` notification.
+    """
     def __init__(
         self,
-        creditor_id: int,
-        debtor_id: int,
+        creditor_id: uuid.UUID,
+        debtor_id: uuid.UUID,
         request_creator: Account,
         **debt_request_data,
     ):
-        self.creditor = Account.objects.get(pk=creditor_id)
-        self.debtor = Account.objects.get(pk=debtor_id)
+        self.creditor_id = creditor_id
+        self.debtor_id = debtor_id
         self.creator = request_creator
         self.debt_request_data = debt_request_data
 
@@ -26,26 +34,51 @@ class CreateDebtRequestService:
         self._validate_creator()
         self._validate_send_to_itself()
         self._validate_in_friends()
+        counterparty = self._get_counterparty()
 
-        return DebtRequest.objects.create(
-            creditor=self.creditor,
-            debtor=self.debtor,
+        if self.creator.id == self.creditor_id:
+            creditor, debtor = self.creator, counterparty
+        else:
+            creditor, debtor = counterparty, self.creator
+        debt_request = DebtRequest(
+            creditor=creditor,
+            debtor=debtor,
             creator=self.creator,
             **self.debt_request_data,
         )
+        # new request has no debt, don't look it up on serialization
+        debt_request.connected_debt = None
+        debt_request.save()
+        CollectionVersion.bump(COLLECTION_DEBT_REQUESTS, [creditor.id, debtor.id])
+        return debt_request
+
+    def _get_counterparty_id(self) -> uuid.UUID:
+        return self.debtor_id if self.creator.id == self.creditor_id else self.creditor_id
+
+    def _get_counterparty(self) -> Account:
+        counterparty = Account.objects.filter(pk=self._get_counterparty_id()).first()
+        if counterparty is None:
+            # deleted after friend ids were cached
+            self._raise_not_friends()
+        return counterparty
 
     def _validate_creator(self):
-        if self.creator not in (self.creditor, self.debtor):
+        if self.creator.id not in (self.creditor_id, self.debtor_id):
             raise ValidationError('Current user should be debtor or creditor.')
 
     def _validate_in_friends(self):
-        if not self.creditor.friends.filter(pk=self.debtor.id).exists():
-            raise ValidationError(
-                "You're not a friend with your debtor/creditor."
-            )
+        # not existing account is not a friend either, so it isn't told apart
+        if not accounts_selectors.are_friends(self.creator, self._get_counterparty_id()):
+            self._raise_not_friends()
+
+    @staticmethod
+    def _raise_not_friends():
+        raise ValidationError(
+            "You're not a friend with your debtor/creditor."
+        )
 
     def _validate_send_to_itself(self):
-        if self.creditor == self.debtor:
+        if self.creditor_id == self.debtor_id:
             raise ValidationError(
                 "Cannot send debt to self."
             )
@@ -99,12 +132,148 @@ class DebtRequestUpdateStatusService:
             raise PermissionDenied
 
     def _validate_is_not_active(self):
+        # status can be changed by concurrent request after this check, so
+        # transitions below re-check it and the loser gets the same error
         if not self.debt_request.is_active:
             raise ValidationError("Debt request is not active.")
 
     def _accept_debt_request(self) -> Debt:
-        return Debt.create_from_request(debt_request=self.debt_request)
+        debt = Debt.create_from_request(debt_request=self.debt_request)
+        if debt is None:
+            raise ValidationError("Debt request is not active.")
+        # debts version is bumped by `post_save` of the new debt
+        self._bump_versions(COLLECTION_DEBT_REQUESTS)
+        return debt
 
     def _decline_debt_request(self) -> None:
-        self.debt_request.declined = True
-        self.debt_request.save()
+        declined_status = constants.DEBT_REQUEST_STATUS_DECLINED
+        debt_requests = DebtRequest.objects.filter(pk=self.debt_request.pk)
+        if not debt_requests.transition_pending(declined_status):
+            raise ValidationError("Debt request is not active.")
+        self.debt_request.status = declined_status
+        self._bump_versions(COLLECTION_DEBT_REQUESTS)
+
+    def _bump_versions(self, *collections: str) -> None:
+        for collection in collections:
+            CollectionVersion.bump(
+                collection,
+                [self.debt_request.creditor_id, self.debt_request.debtor_id],
+            )
+
+
+class BulkDebtRequestUpdateStatusService:
+    """
+    Accept or decline many debt requests of `creator` at once.
+    Requests that can't be updated are skipped and reported by id,
+    the rest are updated in one transaction.
+    """
+    def __init__(
+            self,
+            debt_request_ids: List[uuid.UUID],
+            status: str,
+            creator: Account,
+    ) -> None:
+        self.debt_request_ids = list(dict.fromkeys(debt_request_ids))
+        self.status = status
+        self.creator = creator
+
+    def update_debt_requests(self) -> Tuple[List[Debt], Dict[uuid.UUID, str]]:
+        if self.status not in (constants.STATUS_ACCEPT, constants.STATUS_DECLINE):
+            raise ValidationError("Status is not correct")
+
+        with transaction.atomic():
+            debt_requests, errors = self._get_debt_requests()
+            debt_requests = self._transition(debt_requests, errors)
+            if self.status == constants.STATUS_ACCEPT:
+                debts = self._accept_debt_requests(debt_requests)
+            else:
+                debts = []
+
+        participants_ids = [
+            account_id
+            for debt_request in debt_requests
+            for account_id in (debt_request.creditor_id, debt_request.debtor_id)
+        ]
+        # debts version is bumped by `debt_requests_done` receiver
+        CollectionVersion.bump(COLLECTION_DEBT_REQUESTS, participants_ids)
+
+        if debt_requests:
+            debt_requests_done.send(
+                sender=DebtRequest,
+                debt_requests=debt_requests,
+                status=self.status,
+            )
+        return debts, errors
+
+    def _get_debt_requests(self) -> Tuple[List[DebtRequest], Dict[uuid.UUID, str]]:
+        found = DebtRequest.objects.select_related(
+            'creditor', 'debtor', 'creator',
+        ).in_bulk(self.debt_request_ids)
+
+        debt_requests = []
+        errors = {}
+        for debt_request_id in self.debt_request_ids:
+            debt_request = found.get(debt_request_id)
+            error = self._get_error(debt_request)
+            if error:
+                errors[debt_request_id] = error
+            else:
+                debt_requests.append(debt_request)
+        return debt_requests, errors
+
+    def _get_error(self, debt_request: Optional[DebtRequest]) -> Optional[str]:
+        if debt_request is None or self.creator.id not in (
+                debt_request.debtor_id, debt_request.creditor_id):
+            return "Debt request is not found."
+        if debt_request.creator_id == self.creator.id:
+            return "Cannot change status of request from creator."
+        if not debt_request.is_active:
+            return "Debt request is not active."
+        return None
+
+    def _transition(
+            self,
+            debt_requests: List[DebtRequest],
+            errors: Dict[uuid.UUID, str],
+    ) -> List[DebtRequest]:
+        """
+        Move valid requests by one conditional update, requests resolved
+        by concurrent calls since they were read are reported as not active.
+        """
+        if self.status == constants.STATUS_ACCEPT:
+            status = constants.DEBT_REQUEST_STATUS_ACCEPTED
+        else:
+            status = constants.DEBT_REQUEST_STATUS_DECLINED
+        moved = set(DebtRequest.objects.filter(
+            pk__in=[debt_request.id for debt_request in debt_requests],
+        ).transition_pending(status))
+
+        transitioned = []
+        for debt_request in debt_requests:
+            if debt_request.id in moved:
+                debt_request.status = status
+                transitioned.append(debt_request)
+            else:
+                errors[debt_request.id] = "Debt request is not active."
+        return transitioned
+
+    @staticmethod
+    def _accept_debt_requests(debt_requests: List[DebtRequest]) -> List[Debt]:
+        debts = Debt.objects.bulk_create([
+            Debt(
+                money=debt_request.money,
+                creditor=debt_request.creditor,
+                debtor=debt_request.debtor,
+                description=debt_request.description,
+                from_request=debt_request,
+            )
+            for debt_request in debt_requests
+        ])
+        DebtBalance.objects.shift([
+            (debt.creditor_id, debt.debtor_id, debt.money)
+            for debt in debts
+        ])
+        for debt_request, debt in zip(debt_requests, debts):
+            debt_request.connected_debt = debt
+            debt.remaining_money = debt.money
+        return debts
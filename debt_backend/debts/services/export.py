@@ -0,0 +1,113 @@
+import csv
+import json
+from typing import Iterator, Tuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, QuerySet, Value
+from django.db.models.fields import CharField, DateTimeField
+
+from accounts.models import Account
+from debts import constants
+from debts.models import ArchivedDebt, Debt, DebtRequest
+
+
+class Echo:
+    """File-like object that returns what is written, for `csv.writer`."""
+    def write(self, value: str) -> str:
+        return value
+
+
+class ExportDebtsService:
+    """
+    Full history of debts (archived ones included) and debt requests of account, oldest first.
+    Rows are read from server-side cursor in chunks and written one by one,
+    so memory doesn't depend on history size.
+    """
+    columns = (
+        'kind', 'id', 'created', 'money',
+        'creditor_id', 'creditor_username', 'debtor_id', 'debtor_username',
+        'description', 'status', 'closed_at',
+    )
+
+    content_types = {
+        constants.EXPORT_FORMAT_CSV: 'text/csv',
+        constants.EXPORT_FORMAT_JSONL: 'application/jsonl',
+    }
+
+    def __init__(
+            self,
+            user: Account,
+            export_format: str = constants.EXPORT_FORMAT_CSV,
+            chunk_size: int = constants.EXPORT_CHUNK_SIZE,
+    ):
+        self.user = user
+        self.export_format = export_format
+        self.chunk_size = chunk_size
+
+    @property
+    def content_type(self) -> str:
+        return self.content_types[self.export_format]
+
+    @property
+    def filename(self) -> str:
+        return f'debts-{self.user.username}.{self.export_format}'
+
+    def iter_lines(self) -> Iterator[str]:
+        if self.export_format == constants.EXPORT_FORMAT_CSV:
+            return self._iter_csv_lines()
+        if self.export_format == constants.EXPORT_FORMAT_JSONL:
+            return self._iter_jsonl_lines()
+        raise ValueError(f"Unknown export format {self.export_format}")
+
+    def iter_rows(self) -> Iterator[dict]:
+        for queryset in (self._get_debts(), self._get_debt_requests()):
+            yield from queryset.iterator(chunk_size=self.chunk_size)
+
+    def _iter_csv_lines(self) -> Iterator[str]:
+        writer = csv.writer(Echo())
+        yield writer.writerow(self.columns)
+        for row in self.iter_rows():
+            yield writer.writerow([
+                '' if row[column] is None else row[column]
+                for column in self.columns
+            ])
+
+    def _iter_jsonl_lines(self) -> Iterator[str]:
+        for row in self.iter_rows():
+            yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+    def _get_debts(self) -> QuerySet:
+        return self._union(
+            *self._get_parts(Debt.objects.all(), 'closed_at', kind=constants.KIND_DEBT),
+            *self._get_parts(ArchivedDebt.objects.all(), 'closed_at', kind=constants.KIND_DEBT),
+        )
+
+    def _get_debt_requests(self) -> QuerySet:
+        return self._union(*self._get_parts(
+            DebtRequest.objects.all(),
+            kind=constants.KIND_DEBT_REQUEST,
+            closed_at=Value(None, output_field=DateTimeField()),
+        ))
+
+    @staticmethod
+    def _union(first: QuerySet, *rest: QuerySet) -> QuerySet:
+        # UNION ALL instead of OR-filter, so every part is an index scan by role
+        return first.union(*rest, all=True).order_by('created', 'id')
+
+    def _get_parts(
+            self,
+            queryset: QuerySet,
+            *fields: str,
+            kind: str,
+            **expressions,
+    ) -> Tuple[QuerySet, QuerySet]:
+        rows = queryset \
+            .values(
+                'id', 'created', 'money', 'creditor_id', 'debtor_id', 'description', 'status',
+                *fields,
+                kind=Value(kind, output_field=CharField()),
+                creditor_username=F('creditor__username'),
+                debtor_username=F('debtor__username'),
+                **expressions,
+            )
+        return rows.filter(creditor_id=self.user.id), rows.filter(debtor_id=self.user.id)
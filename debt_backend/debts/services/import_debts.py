@@ -0,0 +1,405 @@
+import csv
+import io
+import json
+import uuid
+from decimal import Decimal, InvalidOperation
+from typing import IO, Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from accounts.models import Account
+from debts import constants, selectors
+from debts.models import Debt, DebtRequest, ClosedDebtRequest, DebtBalance
+from debts.services.export import Echo
+from redis_utils import COLLECTION_DEBTS, COLLECTION_DEBT_REQUESTS, CollectionVersion
+
+# limit of DecimalField(max_digits=12, decimal_places=2)
+MAX_MONEY = Decimal('1e10')
+
+STAGING_TABLE = 'debts_import_staging'
+
+STAGING_COLUMNS = (
+    'line', 'id', 'closed_request_id', 'kind', 'money',
+    'creditor_username', 'debtor_username', 'creator_username',
+    'description', 'created', 'status', 'closed_at',
+)
+
+# empty values of these columns are empty strings, not NULL
+NOT_NULL_COLUMNS = (
+    'kind', 'creditor_username', 'debtor_username', 'creator_username',
+    'description', 'status',
+)
+# columns copied as they are, JSON values of them should be strings
+TEXT_COLUMNS = NOT_NULL_COLUMNS
+
+ALLOWED_STATUSES = {
+    constants.KIND_DEBT: (
+        constants.DEBT_STATUS_ACTIVE,
+        constants.DEBT_STATUS_CLOSING,
+        constants.DEBT_STATUS_CLOSED,
+    ),
+    constants.KIND_DEBT_REQUEST: (
+        constants.DEBT_REQUEST_STATUS_PENDING,
+        constants.DEBT_REQUEST_STATUS_DECLINED,
+        constants.DEBT_REQUEST_STATUS_EXPIRED,
+    ),
+}
+
+
+class ImportRowError(NamedTuple):
+    line: int
+    message: str
+
+
+class ImportResult(NamedTuple):
+    debts: int
+    debt_requests: int
+    errors: List[ImportRowError]
+
+
+class _CopyReader(io.TextIOBase):
+    """
+    Lazy file-like object over lines, so COPY reads rows as they are parsed.
+
+    psycopg2 hides exceptions raised inside `read()` behind `QueryCanceled`,
+    so any error of reading ends the input and is kept in `error` to be raised after COPY.
+    """
+    def __init__(self, lines: Iterator[str]):
+        self._lines = lines
+        self._buffer = ''
+        self.error: Optional[Exception] = None
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: Optional[int] = -1) -> str:
+        while size is None or size < 0 or len(self._buffer) < size:
+            try:
+                line = next(self._lines, None)
+            except Exception as exc:  # pylint: disable=broad-except
+                self.error = exc
+                line = None
+            if line is None:
+                break
+            self._buffer += line
+
+        if size is None or size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class ImportDebtsService:
+    """
+    Load debts and debt requests exported by `export_debts` (or made by hand
+    with the same columns) in one transaction.
+
+    Rows are streamed with `COPY FROM STDIN` into a temporary staging table,
+    checked with set-based queries and moved to debts tables by `INSERT ... SELECT`.
+    Usernames of all rows are resolved by one update against accounts table.
+    Values that can't be parsed are copied as NULL and their lines are reported
+    as invalid, like lines failed by checks.
+    No notifications are sent for imported rows.
+    """
+    def __init__(
+            self,
+            rows_file: IO[str],
+            import_format: str = constants.EXPORT_FORMAT_CSV,
+            skip_invalid: bool = False,
+    ):
+        self.rows_file = rows_file
+        self.import_format = import_format
+        self.skip_invalid = skip_invalid
+        # first parsing error by line
+        self._parse_errors: Dict[int, str] = {}
+
+    def import_debts(self) -> ImportResult:
+        with transaction.atomic(), connection.cursor() as cursor:
+            self._create_staging_table(cursor)
+            self._copy(cursor)
+
+            errors = self._validate(cursor)
+            if errors and not self.skip_invalid:
+                transaction.set_rollback(True)
+                return ImportResult(debts=0, debt_requests=0, errors=errors)
+            self._delete_lines(cursor, [error.line for error in errors])
+
+            debts = self._insert_debts(cursor)
+            debt_requests = self._insert_debt_requests(cursor)
+            self._shift_balances(cursor)
+            self._invalidate(cursor)
+        return ImportResult(debts=debts, debt_requests=debt_requests, errors=errors)
+
+    def _create_staging_table(self, cursor) -> None:
+        cursor.execute(f"""
+            CREATE TEMPORARY TABLE {STAGING_TABLE} (
+                line integer PRIMARY KEY,
+                id uuid NOT NULL,
+                closed_request_id uuid NOT NULL,
+                kind text,
+                money numeric(12, 2),
+                creditor_username text,
+                debtor_username text,
+                creator_username text,
+                description text NOT NULL,
+                created timestamp with time zone,
+                status text,
+                closed_at timestamp with time zone,
+                creditor_id uuid,
+                debtor_id uuid,
+                creator_id uuid
+            ) ON COMMIT DROP
+        """)
+
+    def _copy(self, cursor) -> None:
+        reader = _CopyReader(self._iter_copy_lines())
+        cursor.copy_expert(
+            f"COPY {STAGING_TABLE} ({', '.join(STAGING_COLUMNS)}) FROM STDIN "
+            f"WITH (FORMAT csv, FORCE_NOT_NULL ({', '.join(NOT_NULL_COLUMNS)}))",
+            reader,
+        )
+        if reader.error is not None:
+            raise reader.error
+        cursor.execute(f"ANALYZE {STAGING_TABLE}")
+
+    def _iter_copy_lines(self) -> Iterator[str]:
+        writer = csv.writer(Echo())
+        now = timezone.now()
+        for line, row, error in self._iter_rows():
+            values, errors = self._parse_row(row, now)
+            if error is not None or errors:
+                self._parse_errors[line] = error or errors[0]
+            # None is written as empty value, copied as NULL
+            yield writer.writerow([line, uuid.uuid4(), uuid.uuid4(), *values])
+
+    def _iter_rows(self) -> Iterator[Tuple[int, Any, Optional[str]]]:
+        """
+        Line number, row and error of the line, if row can't be read.
+        """
+        if self.import_format == constants.EXPORT_FORMAT_CSV:
+            rows = csv.DictReader(self.rows_file)
+            try:
+                # header is line 1
+                for line, row in enumerate(rows, start=2):
+                    yield line, row, None
+            except csv.Error as exc:
+                raise ValidationError(f"Line {rows.line_num}: CSV is not correct.") from exc
+        elif self.import_format == constants.EXPORT_FORMAT_JSONL:
+            for line, data in enumerate(self.rows_file, start=1):
+                if not data.strip():
+                    continue
+                try:
+                    yield line, json.loads(data), None
+                except ValueError:
+                    yield line, None, "JSON is not correct."
+        else:
+            raise ValueError(f"Unknown import format {self.import_format}")
+
+    def _parse_row(self, row: Any, now) -> Tuple[list, List[str]]:
+        """
+        Values of staging columns after line and ids, with None
+        for values that can't be parsed, and errors of the row.
+        """
+        errors = []
+        if not isinstance(row, dict):
+            errors.append("row should be an object.")
+            row = {}
+
+        text = {}
+        for column in TEXT_COLUMNS:
+            value = row.get(column)
+            if value is not None and not isinstance(value, str):
+                errors.append(f"{column} should be a string.")
+                value = None
+            text[column] = value or ''
+
+        money = self._parse_money(row.get('money'))
+        if money is None:
+            errors.append("money is not correct.")
+        try:
+            created = self._parse_datetime(row.get('created')) or now
+            closed_at = self._parse_datetime(row.get('closed_at'))
+        except ValueError:
+            errors.append("date is not correct.")
+            created = closed_at = None
+
+        kind = text['kind'] or constants.KIND_DEBT
+        default_status = (
+            constants.DEBT_STATUS_ACTIVE if kind == constants.KIND_DEBT
+            else constants.DEBT_REQUEST_STATUS_PENDING
+        )
+        values = [
+            kind,
+            money,
+            text['creditor_username'],
+            text['debtor_username'],
+            text['creator_username'] or text['creditor_username'],
+            text['description'],
+            created,
+            text['status'] or default_status,
+            closed_at,
+        ]
+        return values, errors
+
+    @staticmethod
+    def _parse_money(value) -> Optional[Decimal]:
+        if isinstance(value, bool):
+            return None
+        try:
+            money = Decimal(str(value))
+            is_correct = money.is_finite() and 0 < money < MAX_MONEY \
+                and money == money.quantize(constants.CENTS)
+        except (InvalidOperation, ValueError):
+            return None
+        return money if is_correct else None
+
+    @staticmethod
+    def _parse_datetime(value):
+        """
+        Parsed `value`, None for empty one, raise ValueError for incorrect one.
+        """
+        if value is None or value == '':
+            return None
+        if not isinstance(value, str):
+            raise ValueError(f"Date should be a string, not {type(value).__name__}")
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise ValueError(f"Date is not correct: {value}")
+        return parsed
+
+    def _validate(self, cursor) -> List[ImportRowError]:
+        accounts = Account._meta.db_table
+        friends_field = Account._meta.get_field('friends')
+        friends = friends_field.remote_field.through._meta.db_table
+
+        cursor.execute(f"""
+            UPDATE {STAGING_TABLE} SET
+                creditor_id = (SELECT id FROM {accounts} WHERE username = creditor_username),
+                debtor_id = (SELECT id FROM {accounts} WHERE username = debtor_username),
+                creator_id = (SELECT id FROM {accounts} WHERE username = creator_username)
+        """)
+
+        checks = [
+            (
+                "kind should be debt or debt_request.",
+                "kind NOT IN %s",
+                [(constants.KIND_DEBT, constants.KIND_DEBT_REQUEST)],
+            ),
+            *(
+                (
+                    f"status of {kind} should be one of {', '.join(statuses)}.",
+                    "kind = %s AND status NOT IN %s",
+                    [kind, statuses],
+                )
+                for kind, statuses in ALLOWED_STATUSES.items()
+            ),
+            ("creditor does not exist.", "creditor_id IS NULL", []),
+            ("debtor does not exist.", "debtor_id IS NULL", []),
+            ("creator does not exist.", "creator_id IS NULL", []),
+            (
+                "creator should be debtor or creditor.",
+                "creator_id NOT IN (creditor_id, debtor_id)",
+                [],
+            ),
+            ("cannot send debt to self.", "creditor_id = debtor_id", []),
+            (
+                "creditor and debtor are not friends.",
+                f"""
+                NOT EXISTS (
+                    SELECT 1 FROM {friends} AS friends
+                    WHERE friends.{friends_field.m2m_column_name()} = creditor_id
+                      AND friends.{friends_field.m2m_reverse_name()} = debtor_id
+                )
+                """,
+                [],
+            ),
+        ]
+
+        # first parsing error or failed check of every line
+        errors = dict(self._parse_errors)
+        for message, condition, params in checks:
+            cursor.execute(f"SELECT line FROM {STAGING_TABLE} WHERE {condition}", params)
+            for line, in cursor.fetchall():
+                errors.setdefault(line, message)
+        return [
+            ImportRowError(line=line, message=message)
+            for line, message in sorted(errors.items())
+        ]
+
+    @staticmethod
+    def _delete_lines(cursor, lines: List[int]) -> None:
+        if lines:
+            cursor.execute(f"DELETE FROM {STAGING_TABLE} WHERE line = ANY(%s)", [lines])
+
+    @staticmethod
+    def _insert_debts(cursor) -> int:
+        cursor.execute(f"""
+            INSERT INTO {ClosedDebtRequest._meta.db_table} (id, is_closed, created, closed)
+            SELECT closed_request_id, status = %(closed)s, created, closed_at
+            FROM {STAGING_TABLE}
+            WHERE kind = %(kind)s AND status IN (%(closing)s, %(closed)s)
+        """, {
+            'kind': constants.KIND_DEBT,
+            'closing': constants.DEBT_STATUS_CLOSING,
+            'closed': constants.DEBT_STATUS_CLOSED,
+        })
+        cursor.execute(f"""
+            INSERT INTO {Debt._meta.db_table} (
+                id, money, creditor_id, debtor_id, description,
+                status, closed_at, created, closed_request_id
+            )
+            SELECT
+                id, money, creditor_id, debtor_id, description,
+                status, closed_at, created,
+                CASE WHEN status = %(active)s THEN NULL ELSE closed_request_id END
+            FROM {STAGING_TABLE}
+            WHERE kind = %(kind)s
+            ORDER BY line
+        """, {'kind': constants.KIND_DEBT, 'active': constants.DEBT_STATUS_ACTIVE})
+        return cursor.rowcount
+
+    @staticmethod
+    def _insert_debt_requests(cursor) -> int:
+        cursor.execute(f"""
+            INSERT INTO {DebtRequest._meta.db_table} (
+                id, money, creditor_id, debtor_id, creator_id,
+                description, status, created
+            )
+            SELECT
+                id, money, creditor_id, debtor_id, creator_id,
+                description, status, created
+            FROM {STAGING_TABLE}
+            WHERE kind = %s
+            ORDER BY line
+        """, [constants.KIND_DEBT_REQUEST])
+        return cursor.rowcount
+
+    @staticmethod
+    def _shift_balances(cursor) -> None:
+        cursor.execute(f"""
+            SELECT creditor_id, debtor_id, SUM(money)
+            FROM {STAGING_TABLE}
+            WHERE kind = %s AND status != %s
+            GROUP BY creditor_id, debtor_id
+        """, [constants.KIND_DEBT, constants.DEBT_STATUS_CLOSED])
+        DebtBalance.objects.shift(cursor.fetchall())
+
+    @staticmethod
+    def _invalidate(cursor) -> None:
+        for kind, collection in (
+                (constants.KIND_DEBT, COLLECTION_DEBTS),
+                (constants.KIND_DEBT_REQUEST, COLLECTION_DEBT_REQUESTS),
+        ):
+            cursor.execute(f"""
+                SELECT creditor_id FROM {STAGING_TABLE} WHERE kind = %(kind)s
+                UNION
+                SELECT debtor_id FROM {STAGING_TABLE} WHERE kind = %(kind)s
+            """, {'kind': kind})
+            account_ids = [account_id for account_id, in cursor.fetchall()]
+            if kind == constants.KIND_DEBT:
+                selectors.invalidate_debts_summary(account_ids)
+            else:
+                CollectionVersion.bump(collection, account_ids)
@@ -0,0 +1,110 @@
+import heapq
+import uuid
+from decimal import Decimal
+from typing import Dict, List, NamedTuple, Set
+
+from django.db.models import Sum
+
+from accounts.models import Account
+from debts.constants import CENTS
+from debts.models import DebtBalance
+
+
+class Transfer(NamedTuple):
+    debtor_id: uuid.UUID
+    creditor_id: uuid.UUID
+    money: Decimal
+
+
+def minimize_transfers(positions: Dict[uuid.UUID, Decimal]) -> List[Transfer]:
+    """
+    Turn net positions (positive - account should receive money, negative - pay)
+    into transfers that clear them.
+
+    Positions that exactly cancel each other are paired first, the rest are
+    settled greedily by always matching the biggest debtor with the biggest
+    creditor, so there are never more than `len(positions) - 1` transfers.
+    """
+    creditors = []
+    debtors = []
+    for account_id, money in positions.items():
+        cents = int(money / CENTS)
+        if cents > 0:
+            creditors.append((-cents, account_id))
+        elif cents < 0:
+            debtors.append((cents, account_id))
+
+    transfers = []
+
+    waiting_creditors: Dict[int, List[uuid.UUID]] = {}
+    for cents, account_id in creditors:
+        waiting_creditors.setdefault(-cents, []).append(account_id)
+    unmatched_debtors = []
+    for cents, account_id in debtors:
+        same_amount = waiting_creditors.get(-cents)
+        if same_amount:
+            transfers.append(Transfer(account_id, same_amount.pop(), -cents * CENTS))
+        else:
+            unmatched_debtors.append((cents, account_id))
+
+    creditors = [
+        (-cents, account_id)
+        for cents, account_ids in waiting_creditors.items()
+        for account_id in account_ids
+    ]
+    debtors = unmatched_debtors
+    heapq.heapify(creditors)
+    heapq.heapify(debtors)
+
+    while creditors and debtors:
+        credit, creditor_id = heapq.heappop(creditors)
+        debt, debtor_id = heapq.heappop(debtors)
+        cents = min(-credit, -debt)
+        transfers.append(Transfer(debtor_id, creditor_id, cents * CENTS))
+
+        if credit + cents:
+            heapq.heappush(creditors, (credit + cents, creditor_id))
+        if debt + cents:
+            heapq.heappush(debtors, (debt + cents, debtor_id))
+
+    return transfers
+
+
+class SettleUpService:
+    def __init__(self, user: Account):
+        self.user = user
+
+    def get_transfers(self) -> List[Transfer]:
+        component = self._get_component()
+        positions = self._get_positions(component)
+        return minimize_transfers(positions)
+
+    def get_own_transfers(self) -> List[Transfer]:
+        return [
+            transfer for transfer in self.get_transfers()
+            if self.user.id in (transfer.debtor_id, transfer.creditor_id)
+        ]
+
+    def _get_component(self) -> Set[uuid.UUID]:
+        friendship = Account.friends.through
+        component = {self.user.id}
+        frontier = {self.user.id}
+        while frontier:
+            neighbours = friendship.objects \
+                .filter(from_account_id__in=frontier) \
+                .values_list('to_account_id', flat=True)
+            frontier = set(neighbours) - component
+            component |= frontier
+        return component
+
+    @staticmethod
+    def _get_positions(component: Set[uuid.UUID]) -> Dict[uuid.UUID, Decimal]:
+        # debts with accounts outside of component (e.g. ex-friends)
+        # are left out, so positions always sum up to zero
+        positions = DebtBalance.objects \
+            .filter(account_id__in=component, counterparty_id__in=component) \
+            .values('account_id') \
+            .annotate(position=Sum('balance')) \
+            .values_list('account_id', 'position') \
+            .order_by()
+        return dict(positions)
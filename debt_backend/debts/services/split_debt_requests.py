@@ -0,0 +1,127 @@
+import uuid
+from decimal import Decimal
+from typing import List, Optional, TypedDict
+
+from rest_framework.exceptions import ValidationError
+
+from accounts import selectors as accounts_selectors
+from accounts.models import Account
+from debts import constants
+from debts.constants import CENTS
+from debts.models import DebtRequest
+from debts.signals import debt_requests_created
+from redis_utils import COLLECTION_DEBT_REQUESTS, CollectionVersion
+
+
+class SplitParticipant(TypedDict, total=False):
+    account_id: uuid.UUID
+    share: Decimal
+
+
+def split_money(money: Decimal, weights: List[Decimal]) -> List[Decimal]:
+    """
+    Split `money` proportionally to `weights` into whole cents.
+    Cents left after rounding down go one by one to parts with the biggest
+    rounded off fraction, ties go to the earlier part.
+    """
+    total_weight = sum(weights)
+    cents = int(money / CENTS)
+
+    exact_parts = [cents * weight / total_weight for weight in weights]
+    parts = [int(exact_part) for exact_part in exact_parts]
+
+    left = cents - sum(parts)
+    by_fraction = sorted(
+        range(len(parts)),
+        key=lambda i: (parts[i] - exact_parts[i], i),
+    )
+    for i in by_fraction[:left]:
+        parts[i] += 1
+
+    return [part * CENTS for part in parts]
+
+
+class SplitDebtRequestService:
+    """
+    Split shared expense paid by `payer` between `participants`
+    and create debt requests for everyone except payer in one go.
+    """
+    def __init__(
+            self,
+            payer: Account,
+            money: Decimal,
+            split: str,
+            participants: List[SplitParticipant],
+            description: str = '',
+    ):
+        self.payer = payer
+        self.money = money
+        self.split = split
+        self.participants = participants
+        self.description = description
+
+    def create_debt_requests(self) -> List[DebtRequest]:
+        self._validate_unique_participants()
+        parts = self._split()
+        debtors = self._get_debtors()
+
+        debt_requests = [
+            DebtRequest(
+                creditor=self.payer,
+                debtor=debtors[participant['account_id']],
+                creator=self.payer,
+                money=part,
+                description=self.description,
+            )
+            for participant, part in zip(self.participants, parts)
+            if participant['account_id'] != self.payer.id and part
+        ]
+        debt_requests = DebtRequest.objects.bulk_create(debt_requests)
+        for debt_request in debt_requests:
+            debt_request.connected_debt = None
+        CollectionVersion.bump(
+            COLLECTION_DEBT_REQUESTS,
+            [self.payer.id, *(debt_request.debtor_id for debt_request in debt_requests)],
+        )
+
+        debt_requests_created.send(
+            sender=DebtRequest,
+            debt_requests=debt_requests,
+        )
+        return debt_requests
+
+    def _split(self) -> List[Decimal]:
+        if self.split == constants.SPLIT_EQUAL:
+            return split_money(self.money, [Decimal(1)] * len(self.participants))
+
+        shares = [self._get_share(participant) for participant in self.participants]
+        if self.split == constants.SPLIT_SHARES:
+            return split_money(self.money, shares)
+        if self.split == constants.SPLIT_EXACT:
+            if sum(shares) != self.money:
+                raise ValidationError("Sum of exact amounts should be equal to money.")
+            return shares
+        raise ValidationError("Split rule is not correct")
+
+    @staticmethod
+    def _get_share(participant: SplitParticipant) -> Decimal:
+        share: Optional[Decimal] = participant.get('share')
+        if share is None or share <= 0:
+            raise ValidationError("Every participant should have positive share.")
+        return share
+
+    def _validate_unique_participants(self):
+        account_ids = [participant['account_id'] for participant in self.participants]
+        if len(set(account_ids)) != len(account_ids):
+            raise ValidationError("Participants should be unique.")
+
+    def _get_debtors(self) -> dict:
+        debtor_ids = {
+            participant['account_id'] for participant in self.participants
+        } - {self.payer.id}
+        if not debtor_ids:
+            raise ValidationError("There should be at least one participant except payer.")
+
+        if not debtor_ids <= accounts_selectors.get_friend_ids(self.payer):
+            raise ValidationError("You're not a friend with some of participants.")
+        return Account.objects.in_bulk(debtor_ids)
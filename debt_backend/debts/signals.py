@@ -1,8 +1,11 @@
+from typing import List
+
 from django.db.models.signals import post_save
 from django.dispatch import receiver, Signal
 
-from debts import constants
-from debts.models import DebtRequest
+from accounts.models import Account
+from debts import constants, selectors
+from debts.models import Debt, DebtRequest
 
 from notifications.constants import EVENT_CREATED, EVENT_STATUS_UPDATED
 from notifications.models import Notification
@@ -13,6 +16,16 @@ from notifications.serializers.debts import (
 
 
 debt_request_done = Signal()
+# sent with `debt_requests` created in bulk, bypassing `post_save`
+debt_requests_created = Signal()
+# sent with `debt_requests` accepted/declined in bulk
+debt_requests_done = Signal()
+
+
+def _get_debt_request_receiver(debt_request: DebtRequest) -> Account:
+    if debt_request.creator_id == debt_request.debtor_id:
+        return debt_request.creditor
+    return debt_request.debtor
 
 
 @receiver(post_save, sender=DebtRequest)
@@ -20,11 +33,6 @@ def notify_request_created(sender, instance: DebtRequest, created: bool, **kwarg
     if not created:
         return
 
-    if instance.creator == instance.debtor:
-        to_user = instance.creditor
-    else:
-        to_user = instance.debtor
-
     event_data = DebtRequestEventCreatedSerializer({
         'object': instance,
     }).data
@@ -32,11 +40,27 @@ def notify_request_created(sender, instance: DebtRequest, created: bool, **kwarg
     notification = Notification.objects.create(
         event_type=EVENT_CREATED,
         event_data=event_data,
-        to_user=to_user,
+        to_user=_get_debt_request_receiver(instance),
     )
     notification.send()
 
 
+@receiver(debt_requests_created, sender=DebtRequest)
+def notify_requests_created(sender, debt_requests: List[DebtRequest], **kwargs):
+    notifications = Notification.objects.bulk_create([
+        Notification(
+            event_type=EVENT_CREATED,
+            event_data=DebtRequestEventCreatedSerializer({
+                'object': debt_request,
+            }).data,
+            to_user=_get_debt_request_receiver(debt_request),
+        )
+        for debt_request in debt_requests
+    ])
+    if notifications:
+        Notification.multiple_send(notifications)
+
+
 @receiver(debt_request_done)
 def notify_debt_request_creator(sender: DebtRequest, status: str, **kwargs):
     if status not in (constants.STATUS_ACCEPT, constants.STATUS_DECLINE):
@@ -52,3 +76,43 @@ def notify_debt_request_creator(sender: DebtRequest, status: str, **kwargs):
         to_user=sender.creator,
     )
     notification.send()
+
+
+@receiver(debt_requests_done, sender=DebtRequest)
+def notify_debt_requests_creators(sender, debt_requests: List[DebtRequest], status: str, **kwargs):
+    if status not in (constants.STATUS_ACCEPT, constants.STATUS_DECLINE):
+        raise Exception("Status is incorrect!")
+
+    notifications = Notification.objects.bulk_create([
+        Notification(
+            event_type=EVENT_STATUS_UPDATED,
+            event_data=DebtRequestEventStatusUpdatedSerializer({
+                'object': debt_request,
+                'status': status,
+            }).data,
+            to_user=debt_request.creator,
+        )
+        for debt_request in debt_requests
+    ])
+    if notifications:
+        Notification.multiple_send(notifications)
+
+
+@receiver(post_save, sender=Debt)
+def invalidate_summary_on_debt_saved(sender, instance: Debt, **kwargs):
+    selectors.invalidate_debts_summary([instance.creditor_id, instance.debtor_id])
+
+
+@receiver(debt_requests_done, sender=DebtRequest)
+def invalidate_summary_on_debt_requests_done(
+        sender,
+        debt_requests: List[DebtRequest],
+        status: str,
+        **kwargs,
+):
+    if status == constants.STATUS_ACCEPT:
+        selectors.invalidate_debts_summary({
+            account_id
+            for debt_request in debt_requests
+            for account_id in (debt_request.creditor_id, debt_request.debtor_id)
+        })
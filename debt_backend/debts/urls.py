@@ -1,9 +1,34 @@
 from django.urls import path
 
-from debts.api import DebtAPIView, DebtRequestAPIView
+from debts.api import (
+    DebtAPIView,
+    CloseCommonDebtsAPIView,
+    DebtRequestAPIView,
+    DebtRequestBulkAPIView,
+    DebtBalanceAPIView,
+    DebtPaymentAPIView,
+    DebtsExportAPIView,
+    DebtsSearchAPIView,
+    DebtsSummaryAPIView,
+    SettleUpAPIView,
+    SplitDebtRequestAPIView,
+)
 
 app_name = 'debts'
 urlpatterns = [
     path('', DebtAPIView.as_view(), name='debts'),
+    path('<uuid:debt_id>/payments/', DebtPaymentAPIView.as_view(), name='debts_payments'),
     path('requests/', DebtRequestAPIView.as_view(), name='debts_requests'),
+    path('requests/bulk/', DebtRequestBulkAPIView.as_view(), name='debts_requests_bulk'),
+    path('requests/split/', SplitDebtRequestAPIView.as_view(), name='debts_requests_split'),
+    path(
+        'friends/<uuid:friend_id>/close/',
+        CloseCommonDebtsAPIView.as_view(),
+        name='debts_close_common',
+    ),
+    path('summary/', DebtsSummaryAPIView.as_view(), name='debts_summary'),
+    path('export/', DebtsExportAPIView.as_view(), name='debts_export'),
+    path('search/', DebtsSearchAPIView.as_view(), name='debts_search'),
+    path('balances/', DebtBalanceAPIView.as_view(), name='debts_balances'),
+    path('settle-up/', SettleUpAPIView.as_view(), name='debts_settle_up'),
 ]
@@ -0,0 +1,43 @@
+import functools
+import hashlib
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from redis_utils import CollectionVersion
+
+
+def get_etag(request, collection: str) -> str:
+    version = CollectionVersion(collection, request.user.id).get()
+    key = f'{collection}:{request.user.id}:{version}:{request.get_full_path()}'
+    return f'W/"{hashlib.md5(key.encode()).hexdigest()}"'
+
+
+def _is_matched(request, etag: str) -> bool:
+    if_none_match = request.headers.get('If-None-Match')
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == '*' or etag in (
+        tag.strip() for tag in if_none_match.split(',')
+    )
+
+
+def conditional_by_version(collection: str):
+    """
+    Answer `GET` with `304 Not Modified` if `If-None-Match` matches
+    current version of user's `collection`, before any query to database
+    is made by view. Version is bumped by services changing the collection.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            etag = get_etag(request, collection)
+            if _is_matched(request, etag):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+            response = method(self, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                response['ETag'] = etag
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,138 @@
+import contextlib
+import functools
+import hashlib
+import json
+from typing import List, Optional
+
+from django_redis import get_redis_connection
+from drf_yasg import openapi
+from redis.exceptions import LockNotOwnedError
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+IDEMPOTENCY_KEY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+# retries of flaky clients come within minutes, a day is a safe margin
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+# longer than any request is expected to run, so a lock of crashed worker expires
+IDEMPOTENCY_LOCK_TIMEOUT = 30
+# how long a duplicate waits for the first request to finish
+IDEMPOTENCY_LOCK_WAIT = 5
+
+
+class IdempotencyKeyInProgressError(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Request with this Idempotency-Key is in progress, retry later."
+    default_code = 'idempotency_key_in_progress'
+
+
+class IdempotencyKeyReusedError(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = "Idempotency-Key is already used for another request."
+    default_code = 'idempotency_key_reused'
+
+
+class IdempotentResponse:
+    """
+    Response to request with `Idempotency-Key` header stored in Redis,
+    with fingerprint of the request, so that a key can't be reused for another request.
+    Keys are scoped by user, keys of different users never collide.
+    """
+    connection = get_redis_connection("default")
+
+    def __init__(self, request, scope: str, key: str):
+        self.key = f'idempotency:{scope}:{request.user.id}:{key}'
+        self.fingerprint = self._get_fingerprint(request)
+
+    @staticmethod
+    def _get_fingerprint(request) -> str:
+        body = json.dumps(request.data, sort_keys=True, default=str)
+        return hashlib.sha256(f'{request.method}:{request.path}:{body}'.encode()).hexdigest()
+
+    def lock(self):
+        return self.connection.lock(
+            f'{self.key}:lock',
+            timeout=IDEMPOTENCY_LOCK_TIMEOUT,
+            blocking_timeout=IDEMPOTENCY_LOCK_WAIT,
+        )
+
+    def get(self) -> Optional[Response]:
+        stored = self.connection.get(self.key)
+        if stored is None:
+            return None
+
+        stored = json.loads(stored)
+        if stored['fingerprint'] != self.fingerprint:
+            raise IdempotencyKeyReusedError
+        return Response(
+            data=stored['data'],
+            status=stored['status'],
+            headers={'Idempotent-Replayed': 'true'},
+        )
+
+    def set(self, response: Response) -> None:
+        payload = JSONRenderer().render({
+            'fingerprint': self.fingerprint,
+            'status': response.status_code,
+            'data': response.data,
+        })
+        self.connection.set(self.key, payload, ex=IDEMPOTENCY_KEY_TTL)
+
+    @staticmethod
+    def get_swagger_parameters() -> List[openapi.Parameter]:
+        return [
+            openapi.Parameter(
+                IDEMPOTENCY_KEY_HEADER, openapi.IN_HEADER,
+                description="Unique key of request (e.g. UUID), retries with the same key "
+                            "get response of the first request instead of repeating it",
+                type=openapi.TYPE_STRING,
+            ),
+        ]
+
+
+def idempotent(scope: str):
+    """
+    Answer retry of `POST` with the same `Idempotency-Key` header with stored
+    response of the first request, before view is called again.
+    Concurrent duplicates wait for the first request under a Redis lock.
+    Only successful responses are stored, failed requests change nothing
+    and can be retried with the same key.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+            if key is None:
+                return method(self, request, *args, **kwargs)
+            if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+                raise ValidationError(
+                    f"{IDEMPOTENCY_KEY_HEADER} should be from 1 "
+                    f"to {IDEMPOTENCY_KEY_MAX_LENGTH} characters."
+                )
+
+            idempotent_response = IdempotentResponse(request, scope, key)
+            response = idempotent_response.get()
+            if response is not None:
+                return response
+
+            lock = idempotent_response.lock()
+            if not lock.acquire():
+                raise IdempotencyKeyInProgressError
+            try:
+                # the first request could finish while this one was waiting
+                response = idempotent_response.get()
+                if response is not None:
+                    return response
+
+                response = method(self, request, *args, **kwargs)
+                if status.is_success(response.status_code):
+                    idempotent_response.set(response)
+                return response
+            finally:
+                # lock of request running longer than timeout is already expired
+                with contextlib.suppress(LockNotOwnedError):
+                    lock.release()
+        return wrapper
+    return decorator
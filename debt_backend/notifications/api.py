@@ -8,8 +8,11 @@ from notifications import selectors
 from notifications.serializers import (
     InputNotificationUpdateReadStatusSerializer,
     OutputNotificationSerializer,
+    OutputNotificationValuesSerializer,
 )
 from notifications.services import mark_as_read
+from etags import conditional_by_version
+from redis_utils import COLLECTION_NOTIFICATIONS
 
 
 class NotificationAPIView(APIView):
@@ -20,13 +23,16 @@ class NotificationAPIView(APIView):
         tags=["notifications"],
         responses={
             200: OutputNotificationSerializer(many=True),
+            304: "Not modified, if `If-None-Match` matches `ETag` of previous response.",
         }
     )
+    @conditional_by_version(COLLECTION_NOTIFICATIONS)
     def get(self, request):
         user = request.user
-        notifications = selectors.get_all_notifications(user=user)
+        notifications = selectors.get_all_notifications(user=user) \
+            .values(*OutputNotificationValuesSerializer.values)
 
-        serializer = OutputNotificationSerializer(notifications, many=True)
+        serializer = OutputNotificationValuesSerializer(notifications)
         return Response(data=serializer.data)
 
 
@@ -38,13 +44,16 @@ class UnreadNotificationAPIView(APIView):
         tags=["notifications"],
         responses={
             200: OutputNotificationSerializer(many=True),
+            304: "Not modified, if `If-None-Match` matches `ETag` of previous response.",
         }
     )
+    @conditional_by_version(COLLECTION_NOTIFICATIONS)
     def get(self, request):
         user = request.user
-        notifications = selectors.get_all_unread_notifications(user=user)
+        notifications = selectors.get_all_unread_notifications(user=user) \
+            .values(*OutputNotificationValuesSerializer.values)
 
-        serializer = OutputNotificationSerializer(notifications, many=True)
+        serializer = OutputNotificationValuesSerializer(notifications)
         return Response(data=serializer.data)
 
     @swagger_auto_schema(
@@ -5,3 +5,6 @@ EVENTS_TYPE = (
     (EVENT_CREATED, 'Object created'),
     (EVENT_STATUS_UPDATED, 'Object status updated'),
 )
+
+# notifications table is partitioned by month of `created_at`
+NOTIFICATION_PARTITION_MONTHS_AHEAD = 3
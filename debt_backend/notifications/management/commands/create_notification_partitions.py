@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from notifications import constants
+from notifications.services import create_notification_partitions
+
+
+class Command(BaseCommand):
+    help = "Create monthly partitions of notifications ahead of time, run it at least monthly"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=constants.NOTIFICATION_PARTITION_MONTHS_AHEAD,
+        )
+
+    def handle(self, *args, **options):
+        for partition in create_notification_partitions(options['months_ahead']):
+            self.stdout.write(f"Created {partition}")
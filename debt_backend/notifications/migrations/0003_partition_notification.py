@@ -0,0 +1,68 @@
+# Generated by Django 4.0 on 2026-10-18 16:02
+
+from datetime import datetime, timezone
+
+from django.db import migrations
+
+TABLE = 'notifications_notification'
+LEGACY = 'notifications_notification_legacy'
+MONTHS_AHEAD = 3
+
+
+def add_month(month: datetime) -> datetime:
+    return month.replace(year=month.year + month.month // 12, month=month.month % 12 + 1)
+
+
+def partition_notifications(apps, schema_editor):
+    """
+    Turn table into one partitioned by month of `created_at`.
+    Existing table is attached as partition for everything before next month,
+    so rows are not copied.
+    """
+    now = datetime.now(timezone.utc)
+    next_month = add_month(now.replace(day=1, hour=0, minute=0, second=0, microsecond=0))
+
+    schema_editor.execute(f"ALTER TABLE {TABLE} RENAME TO {LEGACY}")
+    # primary key of partitioned table has to include partition key, same for partitions
+    schema_editor.execute(f"ALTER TABLE {LEGACY} DROP CONSTRAINT {TABLE}_pkey")
+    schema_editor.execute(f"ALTER TABLE {LEGACY} ADD CONSTRAINT {LEGACY}_pkey PRIMARY KEY (id, created_at)")
+    schema_editor.execute(
+        f"ALTER INDEX {TABLE}_to_user_id_17192cb7 RENAME TO {LEGACY}_to_user_id"
+    )
+
+    schema_editor.execute(f"""
+        CREATE TABLE {TABLE} (
+            LIKE {LEGACY} INCLUDING DEFAULTS,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    schema_editor.execute(f"CREATE INDEX {TABLE}_to_user_id_17192cb7 ON {TABLE} (to_user_id)")
+    schema_editor.execute(f"""
+        ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_to_user_id_fk_accounts_account_id
+        FOREIGN KEY (to_user_id) REFERENCES accounts_account (id) DEFERRABLE INITIALLY DEFERRED
+    """)
+
+    schema_editor.execute(
+        f"ALTER TABLE {TABLE} ATTACH PARTITION {LEGACY} FOR VALUES FROM (MINVALUE) TO (%s)",
+        [next_month],
+    )
+    month = next_month
+    for _ in range(MONTHS_AHEAD):
+        schema_editor.execute(
+            f"CREATE TABLE {TABLE}_p{month:%Y%m} PARTITION OF {TABLE} FOR VALUES FROM (%s) TO (%s)",
+            [month, add_month(month)],
+        )
+        month = add_month(month)
+    # rows after last created partition are not lost if partitions are not created in time
+    schema_editor.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_alter_notification_event_data'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_notifications, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 import uuid
+from typing import Iterable
 
 from django.contrib.auth import get_user_model
 from django.db import models
@@ -11,8 +12,8 @@ User = get_user_model()
 
 
 class NotificationQueryset(models.QuerySet):
-    def mark_as_read(self):
-        self.update(is_read=True)
+    def mark_as_read(self) -> int:
+        return self.update(is_read=True)
 
 
 class Notification(models.Model):
@@ -24,9 +25,15 @@ class Notification(models.Model):
 
     to_user = models.ForeignKey(User, on_delete=models.CASCADE)
 
-    objects = Manager.from_queryset(NotificationQueryset)
+    objects = Manager.from_queryset(NotificationQueryset)()
 
     def send(self):
         from notifications.services import SendNotificationService
 
         SendNotificationService([self]).send()
+
+    @classmethod
+    def multiple_send(cls, notifications: Iterable['Notification']):
+        from notifications.services import SendNotificationService
+
+        SendNotificationService(notifications).send()
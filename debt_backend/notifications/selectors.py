@@ -12,5 +12,5 @@ def get_all_unread_notifications(user: Account) -> QuerySet[Notification]:
     return (
         Notification.objects
             .filter(to_user=user, is_read=False)
-            .order_by('-created_by')
+            .order_by('-created_at')
     )
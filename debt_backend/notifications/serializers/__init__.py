@@ -1,4 +1,5 @@
 from notifications.serializers.notifications import (
     OutputNotificationSerializer,
+    OutputNotificationValuesSerializer,
     InputNotificationUpdateReadStatusSerializer,
 )
\ No newline at end of file
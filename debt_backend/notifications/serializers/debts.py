@@ -3,6 +3,16 @@ from rest_framework import serializers
 
 from debts.models import DebtRequest, Debt
 from debts import constants as debts_constants
+from fast_serializers import (
+    as_bool,
+    as_datetime,
+    as_decimal,
+    as_default,
+    as_object,
+    as_str,
+    as_uuid,
+    as_value,
+)
 
 
 User = get_user_model()
@@ -53,3 +63,39 @@ class DebtRequestEventCreatedSerializer(serializers.Serializer):
 class DebtRequestEventStatusUpdatedSerializer(serializers.Serializer):
     object = NotificationDebtRequestSerializer()
     status = serializers.ChoiceField(debts_constants.DEBT_REQUEST_STATUS)
+
+
+# the same as serializers above for `event_data` stored as JSON
+
+def as_notification_account(source: str):
+    return as_object({
+        'id': as_uuid('id'),
+        'type': as_default('type', User.__name__),
+        'username': as_str('username'),
+    }, source=source)
+
+
+as_notification_debt_request = as_object({
+    'id': as_uuid('id'),
+    'money': as_decimal('money', max_digits=12, decimal_places=2),
+    'creditor': as_notification_account('creditor'),
+    'type': as_default('type', DebtRequest.__name__),
+    'debtor': as_notification_account('debtor'),
+    'description': as_str('description'),
+    'created': as_datetime('created'),
+    'is_active': as_bool('is_active'),
+    'connected_debt': as_object({
+        'id': as_uuid('id'),
+        'type': as_default('type', Debt.__name__),
+        'is_active': as_value('is_active'),
+    }, source='connected_debt'),
+}, source='object')
+
+as_debt_request_event_created = as_object({
+    'object': as_notification_debt_request,
+})
+
+as_debt_request_event_status_updated = as_object({
+    'object': as_notification_debt_request,
+    'status': as_value('status'),
+})
@@ -1,7 +1,6 @@
-from typing import Iterable
-
 from rest_framework import serializers
 
+from fast_serializers import ValuesSerializer, as_bool, as_datetime, as_uuid, as_value
 from notifications import constants
 from notifications.models import Notification
 from notifications.serializers import debts as debts_serializers
@@ -12,21 +11,15 @@ class EventDataSerializer(serializers.Serializer):
         constants.EVENT_CREATED: debts_serializers.DebtRequestEventCreatedSerializer(),
         constants.EVENT_STATUS_UPDATED: debts_serializers.DebtRequestEventStatusUpdatedSerializer(),
     }
-    def to_representation(self, instance):
-        self.parent: OutputNotificationSerializer
-        notification = self.parent.instance
-
-        # in case if parent serializer uses .many_init()
-        # (for e.x. serializer initialized with many=True)
-        if isinstance(notification, Iterable):
-            notification = notification[0]
 
-        serializer = self.EVENT_TYPES[notification.event_type]
-        return serializer.to_representation(instance)
+    def to_representation(self, instance):
+        # whole notification (`source='*'`), so event type is taken from every notification of list
+        serializer = self.EVENT_TYPES[instance.event_type]
+        return serializer.to_representation(instance.event_data)
 
 
 class OutputNotificationSerializer(serializers.ModelSerializer):
-    event_data = EventDataSerializer()
+    event_data = EventDataSerializer(source='*')
 
     class Meta:
         model = Notification
@@ -36,5 +29,25 @@ class OutputNotificationSerializer(serializers.ModelSerializer):
         ]
 
 
+class OutputNotificationValuesSerializer(ValuesSerializer):
+    """`OutputNotificationSerializer` for `values()` of notifications."""
+    EVENT_TYPES = {
+        constants.EVENT_CREATED: debts_serializers.as_debt_request_event_created,
+        constants.EVENT_STATUS_UPDATED: debts_serializers.as_debt_request_event_status_updated,
+    }
+
+    values = ('id', 'event_type', 'event_data', 'is_read', 'to_user_id', 'created_at')
+
+    def get_fields(self):
+        return {
+            'id': as_uuid('id'),
+            'event_type': as_value('event_type'),
+            'event_data': lambda row: self.EVENT_TYPES[row['event_type']](row['event_data']),
+            'is_read': as_bool('is_read'),
+            'to_user': as_uuid('to_user_id'),
+            'created_at': as_datetime('created_at'),
+        }
+
+
 class InputNotificationUpdateReadStatusSerializer(serializers.Serializer):
     notifications_ids = serializers.ListField(child=serializers.UUIDField())
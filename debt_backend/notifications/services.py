@@ -1,7 +1,10 @@
+from datetime import datetime, timezone
 from typing import List, Iterable
 
 from uuid import UUID
 
+from django.db import IntegrityError, ProgrammingError, connection, transaction
+from psycopg2.errorcodes import CHECK_VIOLATION, INVALID_OBJECT_DEFINITION
 from django_redis import get_redis_connection
 from rest_framework.renderers import JSONRenderer
 
@@ -9,6 +12,7 @@ from accounts.models import Account
 
 from notifications.models import Notification
 from notifications.serializers.notifications import OutputNotificationSerializer
+from redis_utils import COLLECTION_NOTIFICATIONS, CollectionVersion
 
 
 class SendNotificationService:
@@ -22,6 +26,100 @@ class SendNotificationService:
         payload = JSONRenderer().render(data)
         self.connection.publish("events", payload)
 
+        CollectionVersion.bump(
+            COLLECTION_NOTIFICATIONS,
+            [notification.to_user_id for notification in self._notifications],
+        )
+
 
 def mark_as_read(notifications_ids: List[UUID], user: Account):
-    Notification.objects.filter(to_user=user, id__in=notifications_ids).mark_as_read()
+    updated = Notification.objects \
+        .filter(to_user=user, id__in=notifications_ids, is_read=False) \
+        .mark_as_read()
+    if updated:
+        CollectionVersion.bump(COLLECTION_NOTIFICATIONS, [user.id])
+
+
+def _add_month(month: datetime) -> datetime:
+    return month.replace(year=month.year + month.month // 12, month=month.month % 12 + 1)
+
+
+def create_notification_partitions(months_ahead: int) -> List[str]:
+    """
+    Create monthly partitions of notifications table from current month
+    up to `months_ahead` months ahead. Returns names of created partitions.
+    """
+    table = Notification._meta.db_table
+    month = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    created = []
+    with connection.cursor() as cursor:
+        for _ in range(months_ahead + 1):
+            next_month = _add_month(month)
+            partition = f'{table}_p{month:%Y%m}'
+
+            cursor.execute("SELECT to_regclass(%s)", [partition])
+            exists, = cursor.fetchone()
+            if exists is None and _create_partition(cursor, table, partition, month, next_month):
+                created.append(partition)
+            month = next_month
+    return created
+
+
+def _create_partition(
+        cursor,
+        table: str,
+        partition: str,
+        month: datetime,
+        next_month: datetime,
+) -> bool:
+    """
+    Create partition of month, return whether it is created.
+    """
+    try:
+        with transaction.atomic():
+            cursor.execute(
+                f"CREATE TABLE {partition} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)",
+                [month, next_month],
+            )
+    except ProgrammingError as exc:
+        # month is already covered, e.g. by legacy partition of rows before partitioning
+        if getattr(exc.__cause__, 'pgcode', None) != INVALID_OBJECT_DEFINITION:
+            raise
+        return False
+    except IntegrityError as exc:
+        # month was missed, and its rows are already in default partition
+        if getattr(exc.__cause__, 'pgcode', None) != CHECK_VIOLATION:
+            raise
+        _create_partition_from_default(cursor, table, partition, month, next_month)
+    return True
+
+
+def _create_partition_from_default(
+        cursor,
+        table: str,
+        partition: str,
+        month: datetime,
+        next_month: datetime,
+) -> None:
+    """
+    Move rows of month from default partition to new partition of month.
+    Notifications table is locked until rows are moved.
+    """
+    default = f'{table}_default'
+    columns = ', '.join(field.column for field in Notification._meta.concrete_fields)
+    with transaction.atomic():
+        cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {default}")
+        cursor.execute(
+            f"CREATE TABLE {partition} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)",
+            [month, next_month],
+        )
+        cursor.execute(f"""
+            WITH moved AS (
+                DELETE FROM {default}
+                WHERE created_at >= %s AND created_at < %s
+                RETURNING {columns}
+            )
+            INSERT INTO {partition} ({columns}) SELECT {columns} FROM moved
+        """, [month, next_month])
+        cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT")
@@ -0,0 +1,164 @@
+import base64
+import binascii
+import json
+from operator import attrgetter
+from typing import List, Optional, Sequence
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q, QuerySet
+from drf_yasg import openapi
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Seek pagination over `ordering` = (field, unique tiebreaker field).
+
+    Unlike offset pagination every page is a single index range scan,
+    so deep pages cost the same as the first one. Body stays a plain list,
+    next page is advertised with `Link: <...>; rel="next"` header.
+    """
+    ordering: Sequence[str] = ('-created', '-id')
+
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self) -> None:
+        self.request = None
+        self.next_position: Optional[List[str]] = None
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> list:
+        return self.paginate_union([queryset], request, view=view)
+
+    def paginate_union(self, querysets: Sequence[QuerySet], request, view=None) -> list:
+        """
+        Paginate over UNION ALL of `querysets` (e.g. rows where user is debtor
+        and rows where user is creditor). Seek filter and LIMIT are pushed down
+        to every part, so each part is served by its own index instead
+        of a single OR-filter that can't use index order.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        position = self.decode_cursor(request)
+        try:
+            rows = list(self.get_page_queryset(querysets, position, page_size))
+        except DjangoValidationError as exc:
+            raise NotFound(self.invalid_cursor_message) from exc
+        page = rows[:page_size]
+
+        if len(rows) > page_size:
+            self.next_position = self.get_position(page[-1])
+        return page
+
+    def get_page_queryset(
+            self,
+            querysets: Sequence[QuerySet],
+            position: Optional[List[str]],
+            page_size: int,
+    ) -> QuerySet:
+        parts = []
+        for queryset in querysets:
+            if position is not None:
+                queryset = queryset.filter(self.get_seek_filter(position))
+            parts.append(queryset.order_by(*self.ordering)[:page_size + 1])
+
+        first, *rest = parts
+        if not rest:
+            return first
+        return first.union(*rest, all=True).order_by(*self.ordering)[:page_size + 1]
+
+    def get_paginated_response(self, data) -> Response:
+        headers = {}
+        next_link = self.get_next_link()
+        if next_link:
+            headers['Link'] = f'<{next_link}>; rel="next"'
+        return Response(data=data, headers=headers)
+
+    def get_next_link(self) -> Optional[str]:
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        cursor = self.encode_cursor(self.next_position)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_seek_filter(self, position: List[str]) -> Q:
+        (field, field_value), (tiebreaker, tiebreaker_value) = zip(self.ordering, position)
+        name = field.lstrip('-')
+        # redundant non-strict bound lets the database start index scan right
+        # at the cursor instead of filtering out all previous pages' rows
+        return Q(**{self._get_lookup(field, strict=False): field_value}) & (
+            Q(**{self._get_lookup(field): field_value})
+            | Q(**{name: field_value, self._get_lookup(tiebreaker): tiebreaker_value})
+        )
+
+    def get_position(self, row) -> List[str]:
+        # model instance or `values()` row
+        if isinstance(row, dict):
+            return [self._to_cursor_value(row[field.lstrip('-')]) for field in self.ordering]
+        return [
+            self._to_cursor_value(attrgetter(field.lstrip('-').replace('__', '.'))(row))
+            for field in self.ordering
+        ]
+
+    def encode_cursor(self, position: List[str]) -> str:
+        data = json.dumps(position, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(data).decode()
+
+    def decode_cursor(self, request) -> Optional[List[str]]:
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+            raise NotFound(self.invalid_cursor_message) from exc
+
+        if not isinstance(position, list) or len(position) != len(self.ordering) \
+                or not all(isinstance(value, str) for value in position):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    @classmethod
+    def get_swagger_parameters(cls) -> List[openapi.Parameter]:
+        return [
+            openapi.Parameter(
+                cls.cursor_query_param, openapi.IN_QUERY,
+                description="Opaque cursor taken from `Link` header of previous page",
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                cls.page_size_query_param, openapi.IN_QUERY,
+                description=f"Page size, {cls.page_size} by default, {cls.max_page_size} at most",
+                type=openapi.TYPE_INTEGER,
+            ),
+        ]
+
+    @staticmethod
+    def _get_lookup(field: str, strict: bool = True) -> str:
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        if not strict:
+            lookup += 'e'
+        return f"{field.lstrip('-')}__{lookup}"
+
+    @staticmethod
+    def _to_cursor_value(value) -> str:
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return str(value)
@@ -1,5 +1,8 @@
+import time
+import uuid
 from typing import NamedTuple, Iterable
 
+from django.db import transaction
 from django_redis import get_redis_connection
 from rest_framework.renderers import JSONRenderer
 
@@ -31,3 +34,50 @@ class SendEventService:
     def send(self):
         payload = JSONRenderer().render([event.to_dict() for event in self._events])
         self.connection.publish("events", payload)
+
+
+COLLECTION_DEBTS = 'debts'
+COLLECTION_DEBT_REQUESTS = 'debt_requests'
+COLLECTION_FRIENDS = 'friends'
+COLLECTION_NOTIFICATIONS = 'notifications'
+
+
+class CollectionVersion:
+    """
+    Per-user version of collection (debts, friends, ...) for conditional requests.
+    Version is changed by `bump` on every change of collection, so
+    unchanged collection can be detected without querying database.
+    """
+    connection = get_redis_connection("default")
+
+    def __init__(self, collection: str, user_id: uuid.UUID):
+        self.key = f'versions:{collection}:{user_id}'
+
+    def get(self) -> str:
+        pipeline = self.connection.pipeline()
+        self._init(pipeline)
+        pipeline.get(self.key)
+        return pipeline.execute()[-1].decode()
+
+    def _init(self, pipeline) -> None:
+        # lost counter is started from current time, not from zero,
+        # so old versions clients still have can't match it again
+        pipeline.set(self.key, time.time_ns(), nx=True)
+
+    @classmethod
+    def bump(cls, collection: str, user_ids: Iterable[uuid.UUID]) -> None:
+        """
+        Bump versions after commit, so that a version is never
+        paired with data of not yet committed transaction.
+        """
+        versions = [cls(collection, user_id) for user_id in set(user_ids)]
+        if versions:
+            transaction.on_commit(lambda: cls._bump(versions))
+
+    @classmethod
+    def _bump(cls, versions: Iterable['CollectionVersion']) -> None:
+        pipeline = cls.connection.pipeline()
+        for version in versions:
+            version._init(pipeline)
+            pipeline.incr(version.key)
+        pipeline.execute()
@@ -0,0 +1,32 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    `JSONRenderer` with orjson, output is byte to byte the same except floats:
+    compact, not ASCII-escaped, datetimes with `Z` and \\u2028/\\u2029 escaped.
+    Types orjson doesn't know are converted by DRF encoder.
+
+    Floats in exponent form are written as `1e16`, not `1e+16`, and NaN/Infinity
+    as `null` instead of failing under `STRICT_JSON`. Money is Decimal, the only
+    float is search rank in [0.6, 1], finding such floats would cost a walk over all data.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        # pretty printed output, e.g. for browsable API
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=JSONEncoder().default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # e.g. integers out of 64 bits
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
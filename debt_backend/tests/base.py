@@ -1,4 +1,6 @@
 import contextlib
+import re
+from typing import Iterator, List
 from unittest import mock
 
 from django.db.models.signals import post_save
@@ -9,7 +11,11 @@ from debts.models import DebtRequest
 from debts.signals import (
     notify_debt_request_creator,
     notify_request_created,
+    notify_requests_created,
+    notify_debt_requests_creators,
     debt_request_done,
+    debt_requests_created,
+    debt_requests_done,
 )
 
 
@@ -44,11 +50,15 @@ class DefaultAPITestCase(APITestCase):
     def _disconnect_signals():
         Signal.disconnect(debt_request_done, notify_debt_request_creator, sender=DebtRequest)
         Signal.disconnect(post_save, notify_request_created, sender=DebtRequest)
+        Signal.disconnect(debt_requests_created, notify_requests_created, sender=DebtRequest)
+        Signal.disconnect(debt_requests_done, notify_debt_requests_creators, sender=DebtRequest)
 
     @staticmethod
     def _connect_signals():
         Signal.connect(debt_request_done, notify_debt_request_creator, sender=DebtRequest)
         Signal.connect(post_save, notify_request_created, sender=DebtRequest)
+        Signal.connect(debt_requests_created, notify_requests_created, sender=DebtRequest)
+        Signal.connect(debt_requests_done, notify_debt_requests_creators, sender=DebtRequest)
 
     @contextlib.contextmanager
     def restore_signals(self):
@@ -60,3 +70,12 @@ class DefaultAPITestCase(APITestCase):
 
     def patch_send_notifications_service(self):
         return MockedSendNotificationService()
+
+    def iterate_pages(self, url: str) -> Iterator[List[dict]]:
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            yield response.data
+
+            next_link = re.match(r'<(.+)>; rel="next"', response.get('Link', ''))
+            url = next_link.group(1) if next_link else None
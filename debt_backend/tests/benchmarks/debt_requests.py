@@ -0,0 +1,58 @@
+"""
+Not collected by default test discovery, run explicitly:
+    python manage.py test tests.benchmarks.debt_requests
+"""
+import time
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import Account
+from debts.models import DebtRequest
+from tests.factories import AccountFactory
+
+
+class CreateDebtRequestBenchmark(TestCase):
+    REQUESTS = 500
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, *friends = Account.objects.bulk_create(
+            AccountFactory.build(username=f'bench_{i}')
+            for i in range(20)
+        )
+        cls.user.friends.set(friends)
+        cls.friends = friends
+
+    def test_create_debt_request(self):
+        client = APIClient()
+        access_token = RefreshToken.for_user(self.user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+        url = reverse('debts:debts_requests')
+        payloads = [
+            {
+                'money': '12.50',
+                'creditor_id': self.user.id,
+                'debtor_id': self.friends[i % len(self.friends)].id,
+                'description': f'bench {i}',
+            }
+            for i in range(self.REQUESTS)
+        ]
+
+        # notifications are created by `post_save` receiver and included
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for payload in payloads:
+                client.post(url, data=payload)
+            elapsed = time.perf_counter() - started
+
+        print(
+            f"\nPOST debt request: {self.REQUESTS} requests in {elapsed:.3f}s, "
+            f"{self.REQUESTS / elapsed:,.0f} requests/s, "
+            f"{len(queries) / self.REQUESTS:.1f} queries per request"
+        )
+        self.assertEqual(DebtRequest.objects.count(), self.REQUESTS)
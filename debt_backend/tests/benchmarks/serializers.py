@@ -0,0 +1,110 @@
+"""
+Not collected by default test discovery, run explicitly:
+    python manage.py test tests.benchmarks.serializers
+"""
+import time
+from typing import Callable
+
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+
+from accounts.models import Account
+from debts import selectors as debts_selectors
+from debts.models import Debt, DebtRequest
+from debts.serializers import (
+    OutputDebtSerializer,
+    OutputDebtValuesSerializer,
+    OutputDebtRequestSerializer,
+    OutputDebtRequestValuesSerializer,
+)
+from notifications import selectors as notifications_selectors
+from notifications.models import Notification
+from notifications.serializers import (
+    OutputNotificationSerializer,
+    OutputNotificationValuesSerializer,
+)
+from renderers import ORJSONRenderer
+from tests.factories import AccountFactory, DebtFactory, DebtRequestFactory, NotificationFactory
+
+
+class SerializersBenchmark(TestCase):
+    ROWS = 5_000
+    REPEAT = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, *friends = Account.objects.bulk_create(
+            AccountFactory.build(username=f'bench_{i}')
+            for i in range(20)
+        )
+        Debt.objects.bulk_create(
+            DebtFactory.build(creditor=cls.user, debtor=friends[i % len(friends)])
+            for i in range(cls.ROWS)
+        )
+        DebtRequest.objects.bulk_create(
+            DebtRequestFactory.build(
+                creditor=cls.user,
+                debtor=friends[i % len(friends)],
+                creator=cls.user,
+            )
+            for i in range(cls.ROWS)
+        )
+        Notification.objects.bulk_create(
+            NotificationFactory.build(to_user=cls.user)
+            for _ in range(cls.ROWS)
+        )
+
+    def _measure(self, name: str, render: Callable[[], bytes]) -> float:
+        elapsed = min(self._time(render) for _ in range(self.REPEAT))
+        rows_per_second = self.ROWS / elapsed
+        print(f"\n{name}: {self.ROWS} rows in {elapsed:.3f}s, {rows_per_second:,.0f} rows/s")
+        return rows_per_second
+
+    @staticmethod
+    def _time(render: Callable[[], bytes]) -> float:
+        started = time.perf_counter()
+        render()
+        return time.perf_counter() - started
+
+    def _compare(self, name: str, before: Callable[[], bytes], after: Callable[[], bytes]) -> None:
+        self.assertEqual(before(), after())
+        before_rate = self._measure(f"{name}, ModelSerializer + JSONRenderer", before)
+        after_rate = self._measure(f"{name}, ValuesSerializer + ORJSONRenderer", after)
+        print(f"{name}: x{after_rate / before_rate:.1f}")
+        self.assertGreater(after_rate, before_rate)
+
+    def test_debts(self):
+        debts = debts_selectors.get_related_debts(self.user)
+        self._compare(
+            "debts",
+            lambda: JSONRenderer().render(OutputDebtSerializer(debts.all(), many=True).data),
+            lambda: ORJSONRenderer().render(OutputDebtValuesSerializer(
+                debts.values(*OutputDebtValuesSerializer.values),
+            ).data),
+        )
+
+    def test_debt_requests(self):
+        debt_requests = debts_selectors.get_active_debt_requests(self.user)
+        context = {'user': self.user}
+        self._compare(
+            "debt requests",
+            lambda: JSONRenderer().render(
+                OutputDebtRequestSerializer(debt_requests.all(), many=True, context=context).data,
+            ),
+            lambda: ORJSONRenderer().render(OutputDebtRequestValuesSerializer(
+                debt_requests.values(*OutputDebtRequestValuesSerializer.values),
+                context=context,
+            ).data),
+        )
+
+    def test_notifications(self):
+        notifications = notifications_selectors.get_all_notifications(self.user)
+        self._compare(
+            "notifications",
+            lambda: JSONRenderer().render(
+                OutputNotificationSerializer(notifications.all(), many=True).data,
+            ),
+            lambda: ORJSONRenderer().render(OutputNotificationValuesSerializer(
+                notifications.values(*OutputNotificationValuesSerializer.values),
+            ).data),
+        )
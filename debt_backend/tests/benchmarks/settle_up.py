@@ -0,0 +1,86 @@
+"""
+Not collected by default test discovery, run explicitly:
+    python manage.py test tests.benchmarks.settle_up
+"""
+import random
+import time
+from decimal import Decimal
+
+from django.test import TestCase
+
+from accounts.models import Account
+from debts.models import Debt, DebtBalance
+from debts.services import SettleUpService, minimize_transfers
+from tests.factories import AccountFactory, DebtFactory
+
+
+class SettleUpBenchmark(TestCase):
+    ACCOUNTS = 20_000
+    DEBTS = 100_000
+
+    DB_ACCOUNTS = 2_000
+    DB_DEBTS = 10_000
+
+    def test_minimize_transfers(self):
+        rnd = random.Random(42)
+        accounts = AccountFactory.build_batch(size=self.ACCOUNTS, username='bench')
+        positions = {account.id: Decimal('0') for account in accounts}
+        for debt in DebtFactory.build_batch(size=self.DEBTS, creditor=None, debtor=None):
+            creditor, debtor = rnd.sample(accounts, 2)
+            positions[creditor.id] += debt.money
+            positions[debtor.id] -= debt.money
+
+        started = time.perf_counter()
+        transfers = minimize_transfers(positions)
+        elapsed = time.perf_counter() - started
+
+        print(
+            f"\nminimize_transfers: {self.ACCOUNTS} accounts, "
+            f"{len(transfers)} transfers in {elapsed:.3f}s"
+        )
+        self.assertLess(elapsed, 1)
+
+    def test_settle_up_service(self):
+        rnd = random.Random(42)
+        accounts = Account.objects.bulk_create(
+            AccountFactory.build(username=f'bench_{i}')
+            for i in range(self.DB_ACCOUNTS)
+        )
+
+        # a connected component: a ring plus random chords
+        friendship = Account.friends.through
+        edges = {
+            (accounts[i].id, accounts[(i + 1) % len(accounts)].id)
+            for i in range(len(accounts))
+        }
+        edges |= {
+            tuple(account.id for account in rnd.sample(accounts, 2))
+            for _ in range(self.DB_ACCOUNTS)
+        }
+        friendship.objects.bulk_create(
+            (
+                friendship(from_account_id=from_id, to_account_id=to_id)
+                for edge in edges
+                for from_id, to_id in (edge, edge[::-1])
+            ),
+            ignore_conflicts=True,
+        )
+
+        debts = []
+        for _ in range(self.DB_DEBTS):
+            creditor, debtor = rnd.sample(accounts, 2)
+            debts.append(DebtFactory.build(creditor=creditor, debtor=debtor))
+        Debt.objects.bulk_create(debts, batch_size=5_000)
+        DebtBalance.objects.shift(
+            (debt.creditor_id, debt.debtor_id, debt.money) for debt in debts
+        )
+
+        started = time.perf_counter()
+        transfers = SettleUpService(accounts[0]).get_transfers()
+        elapsed = time.perf_counter() - started
+
+        print(
+            f"\nSettleUpService: {self.DB_ACCOUNTS} accounts, {self.DB_DEBTS} debts, "
+            f"{len(transfers)} transfers in {elapsed:.3f}s"
+        )
+        self.assertLess(elapsed, 1)
@@ -5,6 +5,9 @@ from django.db.models import Model, ProtectedError
 from factory.django import DjangoModelFactory
 from factory.fuzzy import FuzzyDecimal
 
+from notifications.constants import EVENT_CREATED
+from notifications.serializers.debts import DebtRequestEventCreatedSerializer
+
 
 class AccountFactory(DjangoModelFactory):
     class Meta:
@@ -42,6 +45,19 @@ class DebtRequestFactory(DjangoModelFactory):
     description = factory.Faker('text')
 
 
+class NotificationFactory(DjangoModelFactory):
+    class Meta:
+        model = 'notifications.Notification'
+
+    event_type = EVENT_CREATED
+    event_data = factory.LazyFunction(
+        lambda: DebtRequestEventCreatedSerializer({
+            'object': DebtRequestFactory.build(),
+        }).data
+    )
+    to_user = factory.SubFactory(AccountFactory)
+
+
 @contextlib.contextmanager
 def delete_after(obj: Model) -> Model:
     try:
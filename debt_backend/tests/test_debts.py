@@ -1,13 +1,56 @@
+import contextlib
+import csv
+import io
+import json
+import random
+import tempfile
+import threading
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any, Callable, Iterator, List
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
 from rest_framework.reverse import reverse
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from accounts import selectors as selectors_accounts
 from accounts.models import Account
-from debts.models import DebtRequest, Debt
+from debts import constants, selectors
+from debts.models import (
+    ArchivedDebt,
+    DebtRequest,
+    Debt,
+    ClosedDebtRequest,
+    DebtBalance,
+    DebtPayment,
+)
+from debts.serializers import OutputDebtSerializer, OutputDebtRequestSerializer
+from debts.services import (
+    BulkDebtRequestUpdateStatusService,
+    CloseCommonDebtsService,
+    CreateClosedDebtRequestService,
+    CreateDebtPaymentService,
+    DebtRequestUpdateStatusService,
+    minimize_transfers,
+    split_money,
+)
 from notifications.constants import (
     EVENT_CREATED,
     EVENT_STATUS_UPDATED,
 )
+from pagination import KeysetPagination
+from redis_utils import COLLECTION_DEBTS, CollectionVersion
 from tests.base import DefaultAPITestCase
 from tests.factories import (
     AccountFactory,
@@ -45,6 +88,87 @@ class DebtTestCase(DefaultAPITestCase):
             self.assertEqual(str(debt.creditor_id), debt_data['creditor']['id'])
             self.assertEqual(str(debt.debtor_id), debt_data['debtor']['id'])
 
+    def test_list_of_debts_same_as_model_serializer_success(self):
+        debts = [
+            *DebtFactory.create_batch(
+                debtor=self.user, size=3, description='Caf\u00e9 \u2028 "q" \\',
+            ),
+            *DebtFactory.create_batch(creditor=self.user, size=3),
+        ]
+        DebtPayment.objects.create(debt=debts[0], money=Decimal('0.5'), creator=self.user)
+        debts[1].close_debt()
+
+        response = self.client.get(reverse('debts:debts'))
+        expected = selectors.get_related_debts(self.user)
+        self.assertEqual(
+            response.content,
+            JSONRenderer().render(OutputDebtSerializer(expected, many=True).data),
+        )
+
+    def test_list_of_debts_query_count_success(self):
+        DebtFactory.create_batch(debtor=self.user, size=10)
+        DebtFactory.create_batch(creditor=self.user, size=10)
+
+        # authentication, page of debts with creditors and debtors
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('debts:debts'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 20)
+
+    def test_list_of_debts_pagination_success(self):
+        debts_as_debtor = DebtFactory.create_batch(debtor=self.user, size=13)
+        debts_as_creditor = DebtFactory.create_batch(creditor=self.user, size=12)
+
+        debts = list(sorted(
+            (*debts_as_debtor, *debts_as_creditor),
+            key=lambda debt: (debt.created, debt.id),
+            reverse=True,
+        ))
+
+        pages = list(self.iterate_pages(f"{reverse('debts:debts')}?page_size=10"))
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual(
+            [str(debt.id) for debt in debts],
+            [debt_data['id'] for page in pages for debt_data in page],
+        )
+
+    def test_list_of_debts_invalid_cursor_failure(self):
+        response = self.client.get(reverse('debts:debts'), data={'cursor': 'invalid'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_of_active_debts_success(self):
+        active = DebtFactory.create(debtor=self.user)
+        closing = DebtFactory.create(creditor=self.user)
+        closed = DebtFactory.create(creditor=self.user)
+        CreateClosedDebtRequestService(debt_id=closing.id, creator=self.user).close_as_debtor()
+        closed.close_debt()
+
+        response = self.client.get(reverse('debts:debts'), data={'active': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            {debt_data['id']: debt_data['status'] for debt_data in response.data},
+            {str(active.id): 'active', str(closing.id): 'closing'},
+        )
+
+        response = self.client.get(reverse('debts:debts'))
+        self.assertEqual(len(response.data), 3)
+
+    def test_debt_status_success(self):
+        debt = DebtFactory.create(debtor=self.user)
+        self.assertEqual(debt.status, 'active')
+        self.assertIsNone(debt.closed_at)
+
+        CreateClosedDebtRequestService(debt_id=debt.id, creator=self.user).close_as_debtor()
+        debt.refresh_from_db()
+        self.assertEqual(debt.status, 'closing')
+        self.assertTrue(debt.is_active)
+
+        debt.closed_request.close()
+        debt.refresh_from_db()
+        self.assertEqual(debt.status, 'closed')
+        self.assertEqual(debt.closed_at, debt.closed_request.closed)
+        self.assertFalse(debt.is_active)
+
 
 class DebtRequestTestCase(DefaultAPITestCase):
     def setUp(self) -> None:
@@ -53,6 +177,21 @@ class DebtRequestTestCase(DefaultAPITestCase):
         refresh = RefreshToken.for_user(self.user)
         self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
 
+    def test_list_of_debt_requests_same_as_model_serializer_success(self):
+        DebtRequestFactory.create_batch(
+            debtor=self.user, creator=self.user, size=3, description='\u2029',
+        )
+        DebtRequestFactory.create_batch(creditor=self.user, creator=self.user, size=3)
+
+        response = self.client.get(reverse('debts:debts_requests'))
+        expected = selectors.get_active_debt_requests(self.user)
+        self.assertEqual(
+            response.content,
+            JSONRenderer().render(
+                OutputDebtRequestSerializer(expected, many=True, context={'user': self.user}).data,
+            ),
+        )
+
     def test_create_debt_request_success(self):
         user_1 = AccountFactory.create()
         self.user.friends.add(user_1)
@@ -127,6 +266,44 @@ class DebtRequestTestCase(DefaultAPITestCase):
             )
             self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_create_debt_request_not_existing_account_failure(self):
+        response = self.client.post(
+            reverse('debts:debts_requests'),
+            data={
+                "money": "1200",
+                "creditor_id": self.user.id,
+                "debtor_id": uuid.uuid4(),
+                "description": "description",
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, ["You're not a friend with your debtor/creditor."])
+
+    def test_create_debt_request_num_queries_success(self):
+        user_1 = AccountFactory.create()
+        self.user.friends.add(user_1)
+        # friend ids are loaded once and then cached
+        selectors_accounts.are_friends(self.user, user_1.id)
+
+        with self.restore_signals(), self.patch_send_notifications_service() as mocked_send:
+            # auth, participant, insert of request, insert of notification
+            with self.assertNumQueries(4):
+                response = self.client.post(
+                    reverse('debts:debts_requests'),
+                    data={
+                        "money": "1200",
+                        "creditor_id": user_1.id,
+                        "debtor_id": self.user.id,
+                        "description": "description",
+                    },
+                )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        event_object = mocked_send.get_last_events()[0].event_data['object']
+        self.assertEqual(event_object['creditor']['username'], user_1.username)
+        self.assertEqual(event_object['debtor']['username'], self.user.username)
+        self.assertIsNone(event_object['connected_debt'])
+
     def test_create_debt_request_to_self_failure(self):
         response = self.client.post(
             reverse('debts:debts_requests'),
@@ -169,6 +346,41 @@ class DebtRequestTestCase(DefaultAPITestCase):
             self.assertEqual(str(debt_request.creditor_id), dr_data['creditor']['id'])
             self.assertEqual(str(debt_request.debtor_id), dr_data['debtor']['id'])
 
+    def test_list_debt_requests_query_count_success(self):
+        user_1 = AccountFactory.create()
+        DebtRequestFactory.create_batch(creditor=self.user, creator=self.user, size=10)
+        DebtRequestFactory.create_batch(debtor=self.user, creator=user_1, size=10)
+
+        # authentication, page of debt requests with creditors, debtors and connected debts
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('debts:debts_requests'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 20)
+        self.assertEqual(
+            sum(dr_data['is_yours'] for dr_data in response.data),
+            10,
+        )
+
+    def test_list_debt_requests_pagination_success(self):
+        debt_requests = DebtRequestFactory.create_batch(
+            creditor=self.user,
+            creator=self.user,
+            size=7,
+        )
+        Debt.create_from_request(debt_requests.pop())
+        debt_requests = list(sorted(
+            debt_requests,
+            key=lambda debt_request: (debt_request.created, debt_request.id),
+            reverse=True,
+        ))
+
+        pages = list(self.iterate_pages(f"{reverse('debts:debts_requests')}?page_size=3"))
+        self.assertEqual([len(page) for page in pages], [3, 3])
+        self.assertEqual(
+            [str(debt_request.id) for debt_request in debt_requests],
+            [dr_data['id'] for page in pages for dr_data in page],
+        )
+
     def test_list_debt_requests_with_used_debts_success(self):
         creditor_debt_requests = DebtRequestFactory.create_batch(
             creditor=self.user,
@@ -206,6 +418,11 @@ class DebtRequestTestCase(DefaultAPITestCase):
         for declined_debt_request in declined_debt_requests:
             self.assertFalse(declined_debt_request.is_active)
 
+        for debt_request in DebtRequest.objects.filter(creditor=self.user):
+            # status is stored, no lookup of connected debt
+            with self.assertNumQueries(0):
+                self.assertEqual(debt_request.is_active, debt_request.status == 'pending')
+
         bad_debt_requests = [*used_debt_requests, *declined_debt_requests]
 
         response = self.client.get(reverse('debts:debts_requests'))
@@ -307,6 +524,36 @@ class DebtRequestTestCase(DefaultAPITestCase):
                 DebtRequest.objects.get(pk=debt_request.id).is_active
             )
 
+    def test_declined_column_kept_in_sync_success(self):
+        # `declined` column stays until code reading it is gone, see migration 0013
+        user_1 = AccountFactory.create()
+        with delete_after(user_1):
+            declined_by_status, declined_by_column = DebtRequestFactory.create_batch(
+                creator=user_1,
+                creditor=user_1,
+                debtor=self.user,
+                size=2,
+            )
+            DebtRequest.objects \
+                .filter(pk=declined_by_status.pk) \
+                .transition_pending(constants.DEBT_REQUEST_STATUS_DECLINED)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "UPDATE debts_debtrequest SET declined = true WHERE id = %s",
+                    [declined_by_column.pk],
+                )
+                cursor.execute(
+                    "SELECT id, declined FROM debts_debtrequest WHERE id = ANY(%s)",
+                    [[declined_by_status.pk, declined_by_column.pk]],
+                )
+                declined = dict(cursor.fetchall())
+
+            self.assertEqual(declined, {declined_by_status.pk: True, declined_by_column.pk: True})
+            self.assertEqual(
+                DebtRequest.objects.get(pk=declined_by_column.pk).status,
+                constants.DEBT_REQUEST_STATUS_DECLINED,
+            )
+
     def test_change_debt_request_status_unknown_failure(self):
         user_1 = AccountFactory.create()
         with delete_after(user_1):
@@ -467,3 +714,1468 @@ class DebtRequestTestCase(DefaultAPITestCase):
             self.assertEqual(event_object['id'], str(debt_request.id))
             self.assertEqual(event_object['money'], str(debt_request.money))
             self.assertEqual(event_object['is_active'], debt_request.is_active)
+
+
+class ConditionalListTestCase(DefaultAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = Account.objects.create_user(username='test_user_1', password='test_user_1')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def _get(self, url_name: str, etag: str = None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(reverse(url_name), **headers)
+
+    def test_debt_requests_not_modified_success(self):
+        user_1 = AccountFactory.create()
+        self.user.friends.add(user_1)
+        with delete_after(user_1):
+            etag = self._get('debts:debts_requests')['ETag']
+
+            # only authentication query
+            with self.assertNumQueries(1):
+                response = self._get('debts:debts_requests', etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    reverse('debts:debts_requests'),
+                    data={
+                        'money': '10',
+                        'creditor_id': self.user.id,
+                        'debtor_id': user_1.id,
+                        'description': 'description',
+                    },
+                )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+            response = self._get('debts:debts_requests', etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data), 1)
+
+    def test_debts_modified_on_accept_success(self):
+        user_1 = AccountFactory.create()
+        with delete_after(user_1):
+            debt_request = DebtRequestFactory.create(
+                creator=user_1,
+                creditor=user_1,
+                debtor=self.user,
+            )
+            debts_etag = self._get('debts:debts')['ETag']
+            debt_requests_etag = self._get('debts:debts_requests')['ETag']
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.patch(
+                    reverse('debts:debts_requests'),
+                    data={'debt_request_id': debt_request.id, 'status': 'accept'},
+                )
+
+            response = self._get('debts:debts', debts_etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data), 1)
+            response = self._get('debts:debts_requests', debt_requests_etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data), 0)
+
+    def test_etag_depends_on_page_success(self):
+        etag = self._get('debts:debts')['ETag']
+        response = self.client.get(
+            reverse('debts:debts'),
+            {'page_size': 1},
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class DebtsExportTestCase(DefaultAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = Account.objects.create_user(username='test_user_1', password='test_user_1')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def _create_history(self) -> List[str]:
+        debts = [
+            *DebtFactory.create_batch(debtor=self.user, size=3),
+            *DebtFactory.create_batch(creditor=self.user, size=2),
+        ]
+        debts[0].close_debt()
+        debt_requests = DebtRequestFactory.create_batch(
+            creditor=self.user,
+            creator=self.user,
+            size=2,
+        )
+        DebtFactory.create_batch(size=2)
+        return [
+            *(str(debt.id) for debt in sorted(debts, key=lambda debt: (debt.created, debt.id))),
+            *(str(debt_request.id) for debt_request in sorted(
+                debt_requests, key=lambda debt_request: (debt_request.created, debt_request.id),
+            )),
+        ]
+
+    def test_export_csv_success(self):
+        ids = self._create_history()
+
+        response = self.client.get(reverse('debts:debts_export'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['id'] for row in rows], ids)
+        self.assertEqual([row['kind'] for row in rows], ['debt'] * 5 + ['debt_request'] * 2)
+
+        closed = Debt.objects.get(status='closed')
+        closed_row = next(row for row in rows if row['id'] == str(closed.id))
+        self.assertEqual(closed_row['status'], 'closed')
+        self.assertEqual(closed_row['closed_at'], str(closed.closed_at))
+        self.assertEqual(closed_row['money'], str(closed.money))
+        self.assertEqual(closed_row['creditor_username'], closed.creditor.username)
+        self.assertEqual(rows[-1]['status'], 'pending')
+        self.assertEqual(rows[-1]['closed_at'], '')
+
+    def test_export_jsonl_success(self):
+        ids = self._create_history()
+
+        response = self.client.get(reverse('debts:debts_export'), {'export_format': 'jsonl'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/jsonl')
+
+        content = b''.join(response.streaming_content).decode()
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row['id'] for row in rows], ids)
+        self.assertEqual(rows[-1]['debtor_id'], str(DebtRequest.objects.get(id=ids[-1]).debtor_id))
+
+    def test_export_unknown_format_failure(self):
+        response = self.client.get(reverse('debts:debts_export'), {'export_format': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_command_success(self):
+        ids = self._create_history()
+
+        output = io.StringIO()
+        call_command('export_debts', self.user.username, '--chunk-size=2', stdout=output)
+
+        rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+        self.assertEqual([row['id'] for row in rows], ids)
+
+
+class DebtsSearchTestCase(DefaultAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = Account.objects.create_user(username='test_user_1', password='test_user_1')
+        self.friend = AccountFactory.create(username='margaret')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def _search(self, q: str, **params) -> List[dict]:
+        response = self.client.get(reverse('debts:debts_search'), {'q': q, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_search_by_description_success(self):
+        pizza = DebtFactory.create(creditor=self.user, description='Pizza on friday')
+        DebtFactory.create(debtor=self.user, description='Cinema tickets')
+
+        results = self._search('pizza')
+
+        self.assertEqual([result['id'] for result in results], [str(pizza.id)])
+        self.assertEqual(results[0]['kind'], 'debt')
+        self.assertEqual(
+            results[0]['creditor'],
+            {'id': str(self.user.id), 'username': self.user.username},
+        )
+        self.assertEqual(results[0]['money'], str(pizza.money))
+        self.assertEqual(results[0]['rank'], 1)
+
+    def test_search_with_typo_success(self):
+        debt = DebtFactory.create(debtor=self.user, description='Restaurant bill')
+
+        results = self._search('restaurnt')
+
+        self.assertEqual([result['id'] for result in results], [str(debt.id)])
+        self.assertLess(results[0]['rank'], 1)
+
+    def test_search_by_friend_username_success(self):
+        debt = DebtFactory.create(creditor=self.user, debtor=self.friend, description='Taxi')
+        debt_request = DebtRequestFactory.create(
+            creditor=self.friend, debtor=self.user, creator=self.user, description='Lunch',
+        )
+        DebtFactory.create(creditor=self.user, description='Taxi')
+
+        results = self._search('margaet')
+
+        self.assertEqual(
+            {(result['kind'], result['id']) for result in results},
+            {('debt', str(debt.id)), ('debt_request', str(debt_request.id))},
+        )
+
+    def test_search_only_own_debts_success(self):
+        DebtFactory.create(description='Pizza on friday')
+        DebtRequestFactory.create(creator=self.friend, description='Pizza on friday')
+        DebtFactory.create(
+            debtor=self.friend, description='Pizza', creditor=AccountFactory.create(),
+        )
+
+        self.assertEqual(self._search('pizza'), [])
+
+    def test_search_best_matches_first_success(self):
+        exact = DebtRequestFactory.create(
+            creditor=self.user, creator=self.user, description='Pizza',
+        )
+        typo = DebtFactory.create(debtor=self.user, description='Pizzeria and beer')
+        older_exact = DebtFactory.create(creditor=self.user, description='Pizza')
+        Debt.objects.filter(id=older_exact.id).update(created=timezone.now() - timedelta(days=1))
+
+        results = self._search('pizza', limit=2)
+
+        self.assertEqual([result['id'] for result in results], [str(exact.id), str(older_exact.id)])
+        self.assertEqual(len(self._search('pizza')), 3)
+        self.assertEqual(self._search('pizza')[-1]['id'], str(typo.id))
+
+    def test_search_short_query_failure(self):
+        response = self.client.get(reverse('debts:debts_search'), {'q': 'pi'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(reverse('debts:debts_search'), {'q': 'pizza', 'limit': 1000})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ImportDebtsTestCase(DefaultAPITestCase):
+    header = (
+        'kind,money,creditor_username,debtor_username,creator_username,'
+        'description,status,closed_at\n'
+    )
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = Account.objects.create_user(username='test_user_1', password='test_user_1')
+        self.friend = AccountFactory.create()
+        self.user.friends.add(self.friend)
+
+    def _import(self, content: str, *args) -> str:
+        self.errors_output = io.StringIO()
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8') as rows_file:
+            rows_file.write(content)
+            rows_file.flush()
+            output = io.StringIO()
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command(
+                    'import_debts', rows_file.name, *args,
+                    stdout=output, stderr=self.errors_output,
+                )
+        return output.getvalue()
+
+    def test_import_csv_success(self):
+        user, friend = self.user.username, self.friend.username
+        output = self._import(
+            self.header
+            + f'debt,10.50,{user},{friend},,lunch,,\n'
+            + f'debt,4,{friend},{user},,taxi,closed,2022-01-02T10:00:00+00:00\n'
+            + f'debt,1,{friend},{user},,"bar, pub",closing,\n'
+            + f'debt_request,7,{friend},{user},{user},cinema,,\n'
+        )
+        self.assertIn('Debts: 3', output)
+        self.assertIn('Debt requests: 1', output)
+
+        debts = Debt.objects.filter(creditor=self.user)
+        self.assertEqual(debts.get().money, Decimal('10.50'))
+        self.assertEqual(debts.get().status, 'active')
+
+        closed = Debt.objects.get(description='taxi')
+        self.assertEqual(closed.status, 'closed')
+        self.assertTrue(closed.closed_request.is_closed)
+        self.assertEqual(closed.closed_at, closed.closed_request.closed)
+        closing = Debt.objects.get(description='bar, pub')
+        self.assertFalse(closing.closed_request.is_closed)
+
+        debt_request = DebtRequest.objects.get()
+        self.assertEqual(debt_request.creator, self.user)
+        self.assertEqual(debt_request.status, 'pending')
+
+        # closed debt does not count
+        self.assertEqual(selectors.get_balance(self.user, self.friend), Decimal('9.50'))
+
+    def test_import_invalid_rows_failure(self):
+        stranger = AccountFactory.create()
+        with delete_after(stranger):
+            content = (
+                self.header
+                + f'debt,10,{self.user.username},{self.friend.username},,ok,,\n'
+                + f'debt,10,{self.user.username},{stranger.username},,not a friend,,\n'
+                + f'debt,10,{self.user.username},{self.user.username},,self,,\n'
+                + f'debt,10,{self.user.username},UNKNOWN_USER___,,unknown,,\n'
+            )
+            with self.assertRaises(CommandError):
+                self._import(content)
+            self.assertFalse(Debt.objects.exists())
+
+            output = self._import(content, '--skip-invalid')
+            self.assertIn('Debts: 1', output)
+            self.assertIn('Skipped: 3', output)
+            self.assertEqual(Debt.objects.get().description, 'ok')
+
+    def test_import_incorrect_money_failure(self):
+        with self.assertRaisesMessage(CommandError, 'invalid rows: 1'):
+            self._import(
+                self.header + f'debt,1.001,{self.user.username},{self.friend.username},,,,\n',
+            )
+        self.assertIn('Line 2: money is not correct.', self.errors_output.getvalue())
+        self.assertFalse(Debt.objects.exists())
+
+    def test_import_incorrect_values_skipped_success(self):
+        user, friend = self.user.username, self.friend.username
+        output = self._import(
+            self.header
+            + f'debt,10,{user},{friend},,ok,,\n'
+            + f'debt,1.001,{user},{friend},,money,,\n'
+            + f'debt,10,{user},{friend},,date,closed,yesterday\n',
+            '--skip-invalid',
+        )
+        self.assertIn('Debts: 1', output)
+        self.assertIn('Skipped: 2', output)
+        self.assertIn('Line 3: money is not correct.', self.errors_output.getvalue())
+        self.assertIn('Line 4: date is not correct.', self.errors_output.getvalue())
+        self.assertEqual(Debt.objects.get().description, 'ok')
+
+    def test_import_malformed_jsonl_skipped_success(self):
+        user, friend = self.user.username, self.friend.username
+        row = {'money': '10', 'creditor_username': user, 'debtor_username': friend}
+        lines = [
+            {**row, 'description': 'ok'},
+            [1],
+            {**row, 'created': 5},
+            {**row, 'money': [10]},
+            {**row, 'description': 10},
+        ]
+        content = ''.join(f'{json.dumps(line)}\n' for line in lines) + '{not json\n'
+
+        with self.assertRaisesMessage(CommandError, 'invalid rows: 5'):
+            self._import(content, '--import-format=jsonl')
+        self.assertFalse(Debt.objects.exists())
+
+        output = self._import(content, '--import-format=jsonl', '--skip-invalid')
+        self.assertIn('Debts: 1', output)
+        self.assertEqual(
+            self.errors_output.getvalue().splitlines(),
+            [
+                'Line 2: row should be an object.',
+                'Line 3: date is not correct.',
+                'Line 4: money is not correct.',
+                'Line 5: description should be a string.',
+                'Line 6: JSON is not correct.',
+            ],
+        )
+        self.assertEqual(Debt.objects.get().description, 'ok')
+
+    def test_import_exported_jsonl_success(self):
+        DebtFactory.create_batch(creditor=self.user, debtor=self.friend, size=3)
+        DebtRequestFactory.create(creditor=self.user, debtor=self.friend, creator=self.user)
+        output = io.StringIO()
+        call_command('export_debts', self.user.username, '--export-format=jsonl', stdout=output)
+        Debt.objects.all().delete()
+        DebtRequest.objects.all().delete()
+
+        self._import(output.getvalue(), '--import-format=jsonl')
+        self.assertEqual(Debt.objects.filter(creditor=self.user, debtor=self.friend).count(), 3)
+        self.assertEqual(DebtRequest.objects.filter(creator=self.user).count(), 1)
+
+
+class DebtRequestBulkTestCase(DefaultAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = Account.objects.create_user(username='test_user_1', password='test_user_1')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def _create_incoming_requests(self, friend: Account, size: int) -> List[DebtRequest]:
+        return DebtRequestFactory.create_batch(
+            size=size,
+            creator=friend,
+            creditor=friend,
+            debtor=self.user,
+            money=Decimal('10'),
+        )
+
+    def test_bulk_accept_success(self):
+        user_1 = AccountFactory.create()
+        with delete_after(user_1):
+            debt_requests = self._create_incoming_requests(user_1, size=3)
+
+            response = self.client.patch(
+                reverse('debts:debts_requests_bulk'),
+                data={
+                    'debt_request_ids': [debt_request.id for debt_request in debt_requests],
+                    'status': 'accept',
+                },
+                format='json',
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['errors'], {})
+            self.assertEqual(len(response.data['debts']), 3)
+
+            self.assertEqual(Debt.objects.filter(from_request__in=debt_requests).count(), 3)
+            self.assertFalse(selectors.get_active_debt_requests(self.user).exists())
+            self.assertEqual(selectors.get_balance(user_1, self.user), Decimal('30'))
+
+    def test_bulk_decline_success(self):
+        user_1 = AccountFactory.create()
+        with delete_after(user_1):
+            debt_requests = self._create_incoming_requests(user_1, size=3)
+
+            response = self.client.patch(
+                reverse('debts:debts_requests_bulk'),
+                data={
+                    'debt_request_ids': [debt_request.id for debt_request in debt_requests],
+                    'status': 'decline',
+                },
+                format='json',
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data, {'debts': [], 'errors': {}})
+
+            self.assertEqual(
+                DebtRequest.objects
+                .filter(id__in=[r.id for r in debt_requests], status='declined')
+                .count(),
+                3,
+            )
+            self.assertFalse(Debt.objects.filter(creditor=user_1).exists())
+
+    def test_bulk_accept_reports_errors_per_item_success(self):
+        user_1, user_2 = AccountFactory.create_batch(size=2)
+        with delete_after(user_1), delete_after(user_2):
+            valid, declined = self._create_incoming_requests(user_1, size=2)
+            declined.declined = True
+            declined.save()
+            own = DebtRequestFactory.create(creator=self.user, creditor=self.user, debtor=user_1)
+            strange = DebtRequestFactory.create(creator=user_1, creditor=user_1, debtor=user_2)
+            missing_id = uuid.uuid4()
+
+            response = self.client.patch(
+                reverse('debts:debts_requests_bulk'),
+                data={
+                    'debt_request_ids': [valid.id, declined.id, own.id, strange.id, missing_id],
+                    'status': 'accept',
+                },
+                format='json',
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data['debts']), 1)
+            self.assertEqual(response.data['errors'], {
+                str(declined.id): "Debt request is not active.",
+                str(own.id): "Cannot change status of request from creator.",
+                str(strange.id): "Debt request is not found.",
+                str(missing_id): "Debt request is not found.",
+            })
+            self.assertIsNotNone(DebtRequest.objects.get(id=valid.id).connected_debt)
+            self.assertTrue(DebtRequest.objects.get(id=own.id).is_active)
+            self.assertTrue(DebtRequest.objects.get(id=strange.id).is_active)
+
+    def test_bulk_accept_nothing_valid_success(self):
+        missing_id = uuid.uuid4()
+
+        response = self.client.patch(
+            reverse('debts:debts_requests_bulk'),
+            data={'debt_request_ids': [missing_id], 'status': 'accept'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['debts'], [])
+        self.assertEqual(response.data['errors'], {str(missing_id): "Debt request is not found."})
+
+    def test_bulk_accept_queries_count_not_depends_on_size_success(self):
+        user_1 = AccountFactory.create()
+        with delete_after(user_1):
+            queries_count = []
+            for size in (2, 6):
+                debt_requests = self._create_incoming_requests(user_1, size=size)
+                with self.restore_signals(), self.patch_send_notifications_service(), \
+                        CaptureQueriesContext(connection) as queries:
+                    response = self.client.patch(
+                        reverse('debts:debts_requests_bulk'),
+                        data={
+                            'debt_request_ids': [debt_request.id for debt_request in debt_requests],
+                            'status': 'accept',
+                        },
+                        format='json',
+                    )
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                queries_count.append(len(queries))
+
+            self.assertEqual(queries_count[0], queries_count[1])
+
+    def test_bulk_notifications_sent_once_success(self):
+        user_1, user_2 = AccountFactory.create_batch(size=2)
+        with delete_after(user_1), delete_after(user_2):
+            debt_requests = [
+                *self._create_incoming_requests(user_1, size=2),
+                *self._create_incoming_requests(user_2, size=1),
+            ]
+            with self.restore_signals(), self.patch_send_notifications_service() as mocked_send:
+                response = self.client.patch(
+                    reverse('debts:debts_requests_bulk'),
+                    data={
+                        'debt_request_ids': [debt_request.id for debt_request in debt_requests],
+                        'status': 'decline',
+                    },
+                    format='json',
+                )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            self.assertEqual(mocked_send._mocked.call_count, 1)
+            events = mocked_send.get_last_events()
+            self.assertEqual(len(events), 3)
+            self.assertEqual(
+                sorted(event.to_user_id for event in events),
+                sorted(debt_request.creator_id for debt_request in debt_requests),
+            )
+            for event in events:
+                self.assertEqual(event.event_type, EVENT_STATUS_UPDATED)
+                self.assertEqual(event.event_data['status'], 'decline')
+                self.assertFalse(event.event_data['object']['is_active'])
+
+
+class DebtRequestConcurrencyTestCase(TransactionTestCase):
+    """
+    Every thread has its own database connection, so the same request
+    is updated by really concurrent transactions.
+    """
+    THREADS = 8
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.creditor = AccountFactory.create()
+        self.debtor = AccountFactory.create()
+        self.debt_request = DebtRequestFactory.create(
+            creditor=self.creditor,
+            debtor=self.debtor,
+            creator=self.creditor,
+        )
+
+    def _run_concurrently(self, target: Callable[[int], Any]) -> List[Any]:
+        """Results of `target(thread_number)`, exceptions raised included."""
+        barrier = threading.Barrier(self.THREADS)
+        results = [None] * self.THREADS
+
+        def run(number: int) -> None:
+            try:
+                barrier.wait()
+                results[number] = target(number)
+            except Exception as exc:  # pylint: disable=broad-except
+                results[number] = exc
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run, args=(number,)) for number in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def _update(self, status: str):
+        return DebtRequestUpdateStatusService(
+            debt_request_id=self.debt_request.id,
+            status=status,
+            creator=self.debtor,
+        ).update_debt_request()
+
+    def _assert_one_succeeded(self, results: List[Any]) -> None:
+        failed = [result for result in results if isinstance(result, Exception)]
+        self.assertEqual(len(failed), self.THREADS - 1, failed)
+        for error in failed:
+            self.assertIsInstance(error, ValidationError)
+            self.assertEqual(error.detail, ["Debt request is not active."])
+
+    def _get_balance(self) -> Decimal:
+        balance = DebtBalance.objects \
+            .filter(account=self.creditor, counterparty=self.debtor) \
+            .first()
+        return balance.balance if balance else Decimal('0')
+
+    def test_concurrent_accept_success(self):
+        results = self._run_concurrently(lambda _: self._update(constants.STATUS_ACCEPT))
+
+        self._assert_one_succeeded(results)
+        self.assertEqual(Debt.objects.filter(from_request=self.debt_request).count(), 1)
+        self.assertEqual(self._get_balance(), self.debt_request.money)
+
+    def test_concurrent_accept_and_decline_success(self):
+        results = self._run_concurrently(lambda number: self._update(
+            constants.STATUS_ACCEPT if number % 2 else constants.STATUS_DECLINE,
+        ))
+
+        self._assert_one_succeeded(results)
+        self.debt_request.refresh_from_db()
+        accepted = self.debt_request.status == constants.DEBT_REQUEST_STATUS_ACCEPTED
+        self.assertEqual(Debt.objects.filter(from_request=self.debt_request).exists(), accepted)
+        self.assertEqual(self._get_balance(), self.debt_request.money if accepted else Decimal('0'))
+
+    def test_concurrent_bulk_accept_success(self):
+        results = self._run_concurrently(lambda _: BulkDebtRequestUpdateStatusService(
+            debt_request_ids=[self.debt_request.id],
+            status=constants.STATUS_ACCEPT,
+            creator=self.debtor,
+        ).update_debt_requests())
+
+        self.assertEqual(sum(len(debts) for debts, _ in results), 1)
+        not_active = {self.debt_request.id: "Debt request is not active."}
+        self.assertEqual(
+            [errors for _, errors in results].count(not_active),
+            self.THREADS - 1,
+        )
+        self.assertEqual(Debt.objects.filter(from_request=self.debt_request).count(), 1)
+        self.assertEqual(self._get_balance(), self.debt_request.money)
+
+    def test_concurrent_close_success(self):
+        debt = Debt.create_from_request(self.debt_request)
+
+        results = self._run_concurrently(lambda _: CreateClosedDebtRequestService(
+            debt_id=debt.id,
+            creator=self.creditor,
+        ).create_close_debt_request())
+
+        self.assertFalse([result for result in results if isinstance(result, Exception)])
+        debt.refresh_from_db()
+        self.assertEqual(debt.status, constants.DEBT_STATUS_CLOSED)
+        self.assertEqual(self._get_balance(), Decimal('0'))
+        closed_request = ClosedDebtRequest.objects.get()
+        self.assertEqual(debt.closed_request_id, closed_request.id)
+        self.assertEqual({result.id for result in results}, {closed_request.id})
+
+
+class DebtPaymentTestCase(DefaultAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = Account.objects.create_user(username='test_user_1', password='test_user_1')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def _create_debt(self, debtor: Account, money: str) -> Debt:
+        debt = DebtFactory.create(creditor=self.user, debtor=debtor, money=Decimal(money))
+        DebtBalance.objects.shift([(self.user.id, debtor.id, debt.money)])
+        return debt
+
+    def _pay(self, debt: Debt, money: str):
+        return self.client.post(
+            reverse('debts:debts_payments', args=(debt.id,)),
+            data={'money': money},
+        )
+
+    def test_partial_payment_success(self):
+        user_1 = AccountFactory.create()
+        with delete_after(user_1):
+            debt = self._create_debt(user_1, '100')
+
+            response = self._pay(debt, '30.50')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(response.data['debt']['remaining_money'], '69.50')
+            self.assertEqual(response.data['debt']['status'], 'active')
+            self._pay(debt, '9.50')
+
+            response = self.client.get(reverse('debts:debts'))
+            self.assertEqual(response.data[0]['money'], '100.00')
+            self.assertEqual(response.data[0]['remaining_money'], '60.00')
+            self.assertEqual(selectors.get_balance(self.user, user_1), Decimal('60'))
+            self.assertEqual(selectors.get_debts_summary(self.user)['owed'], Decimal('60'))
+
+            response = self.client.get(reverse('debts:debts_payments', args=(debt.id,)))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual([payment['money'] for payment in response.data], ['9.50', '30.50'])
+
+    def test_full_payment_closes_debt_success(self):
+        user_1 = AccountFactory.create()
+        with delete_after(user_1):
+            debt = self._create_debt(user_1, '100')
+            self._pay(debt, '40')
+
+            response = self._pay(debt, '60')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(response.data['debt']['remaining_money'], '0.00')
+
+            debt.refresh_from_db()
+            self.assertEqual(debt.status, 'closed')
+            self.assertTrue(debt.closed_request.is_closed)
+            self.assertEqual(selectors.get_balance(self.user, user_1), Decimal('0'))
+
+            response = self._pay(debt, '1')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_close_partially_paid_debts_success(self):
+        user_1 = AccountFactory.create()
+        with delete_after(user_1):
+            debt = self._create_debt(user_1, '100')
+            self._create_debt(user_1, '20')
+            self._pay(debt, '70')
+
+            response = self.client.post(reverse('debts:debts_close_common', args=(user_1.id,)))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['money'], '50.00')
+            self.assertEqual(selectors.get_balance(self.user, user_1), Decimal('0'))
+
+    def test_payment_greater_than_remaining_failure(self):
+        user_1 = AccountFactory.create()
+        with delete_after(user_1):
+            debt = self._create_debt(user_1, '100')
+            self._pay(debt, '50')
+
+            response = self._pay(debt, '50.01')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(selectors.get_balance(self.user, user_1), Decimal('50'))
+
+    def test_payment_from_debtor_failure(self):
+        debt = DebtFactory.create(debtor=self.user)
+
+        response = self._pay(debt, '1')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(debt.payments.exists())
+
+    def test_payment_of_not_related_debt_failure(self):
+        debt = DebtFactory.create()
+
+        response = self._pay(debt, '1')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse('debts:debts_payments', args=(debt.id,)))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_of_debts_with_payments_query_count_success(self):
+        for debt in DebtFactory.create_batch(creditor=self.user, size=10):
+            DebtPayment.objects.create(debt=debt, money=Decimal('0.01'), creator=self.user)
+
+        # authentication, page of debts with remaining money
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('debts:debts'))
+        self.assertEqual(len(response.data), 10)
+
+
+class ArchiveDebtsTestCase(DefaultAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = Account.objects.create_user(username='test_user_1', password='test_user_1')
+
+    def _close(self, debt: Debt, days_ago: int) -> None:
+        debt.close_debt()
+        Debt.objects.filter(pk=debt.pk).update(closed_at=timezone.now() - timedelta(days=days_ago))
+
+    def test_admin_links_archived_debt_of_request_success(self):
+        admin_user = Account.objects.create_superuser(username='admin', password='admin')
+        friend = AccountFactory.create()
+        debt_request = DebtRequestFactory.create(creator=friend, creditor=friend, debtor=self.user)
+        debt = Debt.create_from_request(debt_request)
+        self._close(debt, days_ago=400)
+        call_command('archive_debts', '--older-than-days=365', stdout=io.StringIO())
+        self.client.force_login(admin_user)
+
+        change_url = reverse('admin:debts_debtrequest_change', args=(debt_request.id,))
+        response = self.client.get(change_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotContains(response, 'connected_debt')
+
+        response = self.client.get(
+            reverse('admin:debts_debtrequest_actions', args=(debt_request.id, 'archived_debt')),
+        )
+        self.assertRedirects(
+            response,
+            reverse('admin:debts_archiveddebt_change', args=(debt.id,)),
+            fetch_redirect_response=False,
+        )
+
+    def test_archive_debts_success(self):
+        old, recent, active = DebtFactory.create_batch(creditor=self.user, size=3)
+        DebtPayment.objects.create(debt=old, money=Decimal('0.01'), creator=self.user)
+        self._close(old, days_ago=400)
+        self._close(recent, days_ago=10)
+
+        output = io.StringIO()
+        call_command('archive_debts', '--older-than-days=365', '--batch-size=1', stdout=output)
+        self.assertIn('Archived debts: 1', output.getvalue())
+
+        self.assertEqual(set(Debt.objects.values_list('id', flat=True)), {recent.id, active.id})
+        self.assertFalse(DebtPayment.objects.exists())
+
+        archived = ArchivedDebt.objects.get()
+        self.assertEqual(archived.id, old.id)
+        self.assertEqual(archived.money, old.money)
+        self.assertEqual(archived.status, 'closed')
+        self.assertEqual(archived.closed_request_id, old.closed_request_id)
+        self.assertEqual([payment['money'] for payment in archived.payments], ['0.01'])
+
+        # archived debts stay in history
+        output = io.StringIO()
+        call_command('export_debts', self.user.username, stdout=output)
+        rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+        self.assertEqual({row['id'] for row in rows}, {str(old.id), str(recent.id), str(active.id)})
+
+
+class CloseCommonDebtsTestCase(DefaultAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = Account.objects.create_user(username='test_user_1', password='test_user_1')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def _create_debt(self, creditor: Account, debtor: Account, money: str) -> Debt:
+        return Debt.create_from_request(DebtRequestFactory.create(
+            creator=creditor,
+            creditor=creditor,
+            debtor=debtor,
+            money=Decimal(money),
+        ))
+
+    def test_close_common_debts_success(self):
+        user_1, user_2 = AccountFactory.create_batch(size=2)
+        with delete_after(user_1), delete_after(user_2):
+            self._create_debt(self.user, user_1, '100')
+            self._create_debt(user_1, self.user, '30.50')
+            requested = self._create_debt(self.user, user_1, '20')
+            # already closed debts and debts with other friends stay untouched
+            self._create_debt(self.user, user_1, '1000').close_debt()
+            other = self._create_debt(self.user, user_2, '5')
+
+            closed_request = ClosedDebtRequest.objects.create()
+            requested.closed_request = closed_request
+            requested.save()
+
+            response = self.client.post(
+                reverse('debts:debts_close_common', kwargs={'friend_id': user_1.id}),
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data, {'money': '89.50', 'debts_count': 3})
+
+            self.assertFalse(selectors.get_active_common_debts(self.user, user_1).exists())
+            self.assertFalse(
+                Debt.objects
+                .filter(creditor=self.user, debtor=user_1, closed_at__isnull=True)
+                .exists()
+            )
+            self.assertTrue(Debt.objects.get(pk=other.pk).is_active)
+            closed_request.refresh_from_db()
+            self.assertTrue(closed_request.is_closed)
+
+            self.assertEqual(selectors.get_balance(self.user, user_1), Decimal('0'))
+            self.assertEqual(selectors.get_balance(user_1, self.user), Decimal('0'))
+            self.assertEqual(selectors.get_balance(self.user, user_2), Decimal('5'))
+
+    def test_close_common_debts_without_debts_success(self):
+        user_1 = AccountFactory.create()
+        with delete_after(user_1):
+            response = self.client.post(
+                reverse('debts:debts_close_common', kwargs={'friend_id': user_1.id}),
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data, {'money': '0.00', 'debts_count': 0})
+
+    def test_close_common_debts_queries_count_not_depends_on_size_success(self):
+        user_1 = AccountFactory.create()
+        with delete_after(user_1):
+            queries_count = []
+            for size in (2, 6):
+                for _ in range(size):
+                    self._create_debt(self.user, user_1, '10')
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.post(
+                        reverse('debts:debts_close_common', kwargs={'friend_id': user_1.id}),
+                    )
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.data['debts_count'], size)
+                queries_count.append(len(queries))
+
+            self.assertEqual(queries_count[0], queries_count[1])
+
+    def test_close_common_debts_with_self_failed(self):
+        response = self.client.post(
+            reverse('debts:debts_close_common', kwargs={'friend_id': self.user.id}),
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_close_common_debts_unknown_account_failed(self):
+        response = self.client.post(
+            reverse('debts:debts_close_common', kwargs={'friend_id': uuid.uuid4()}),
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class DebtsSummaryTestCase(DefaultAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = Account.objects.create_user(username='test_user_1', password='test_user_1')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def _create_debt(self, creditor: Account, debtor: Account, money: str) -> Debt:
+        return Debt.create_from_request(DebtRequestFactory.create(
+            creator=creditor,
+            creditor=creditor,
+            debtor=debtor,
+            money=Decimal(money),
+        ))
+
+    def test_summary_success(self):
+        user_1 = AccountFactory.create(username='summary_friend_1')
+        user_2 = AccountFactory.create(username='summary_friend_2')
+        with delete_after(user_1), delete_after(user_2):
+            self._create_debt(self.user, user_1, '100')
+            self._create_debt(user_1, self.user, '30.50')
+            self._create_debt(user_2, self.user, '15')
+            self._create_debt(user_2, self.user, '1000').close_debt()
+
+            response = self.client.get(reverse('debts:debts_summary'))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data, {
+                'owed': '100.00',
+                'owing': '45.50',
+                'balance': '54.50',
+                'friends': [
+                    {
+                        'friend': {'id': str(user_1.id), 'username': user_1.username},
+                        'owed': '100.00',
+                        'owing': '30.50',
+                        'balance': '69.50',
+                    },
+                    {
+                        'friend': {'id': str(user_2.id), 'username': user_2.username},
+                        'owed': '0.00',
+                        'owing': '15.00',
+                        'balance': '-15.00',
+                    },
+                ],
+            })
+
+    def test_summary_cached_success(self):
+        user_1 = AccountFactory.create()
+        with delete_after(user_1):
+            with self.captureOnCommitCallbacks(execute=True):
+                self._create_debt(self.user, user_1, '10')
+            response = self.client.get(reverse('debts:debts_summary'))
+
+            # only authentication query
+            with self.assertNumQueries(1):
+                cached_response = self.client.get(reverse('debts:debts_summary'))
+            self.assertEqual(cached_response.data, response.data)
+
+    def test_summary_computed_before_change_is_not_cached_success(self):
+        user_1 = AccountFactory.create()
+        with delete_after(user_1):
+            get_summary = selectors._get_debts_summary
+
+            def get_summary_before_change(user: Account) -> dict:
+                summary = get_summary(user)
+                # debt is created and committed while summary is computed
+                with self.captureOnCommitCallbacks(execute=True):
+                    self._create_debt(self.user, user_1, '10')
+                return summary
+
+            with mock.patch('debts.selectors._get_debts_summary', get_summary_before_change):
+                self.assertEqual(selectors.get_debts_summary(self.user)['balance'], Decimal('0'))
+
+            self.assertEqual(selectors.get_debts_summary(self.user)['balance'], Decimal('10'))
+
+    def test_summary_invalidated_success(self):
+        user_1 = AccountFactory.create()
+        with delete_after(user_1):
+            debt_requests = DebtRequestFactory.create_batch(
+                size=2,
+                creator=user_1,
+                creditor=user_1,
+                debtor=self.user,
+                money=Decimal('10'),
+            )
+            with self.captureOnCommitCallbacks(execute=True):
+                debt = self._create_debt(self.user, user_1, '10')
+
+            def get_balance() -> str:
+                return self.client.get(reverse('debts:debts_summary')).data['balance']
+
+            self.assertEqual(get_balance(), '10.00')
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.patch(
+                    reverse('debts:debts_requests'),
+                    data={'debt_request_id': debt_requests[0].id, 'status': 'accept'},
+                )
+            self.assertEqual(get_balance(), '0.00')
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.patch(
+                    reverse('debts:debts_requests_bulk'),
+                    data={'debt_request_ids': [debt_requests[1].id], 'status': 'accept'},
+                    format='json',
+                )
+            self.assertEqual(get_balance(), '-10.00')
+
+            with self.captureOnCommitCallbacks(execute=True):
+                debt.close_debt()
+            self.assertEqual(get_balance(), '-20.00')
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(
+                    reverse('debts:debts_close_common', kwargs={'friend_id': user_1.id}),
+                )
+            self.assertEqual(get_balance(), '0.00')
+
+    def test_summary_invalidated_on_closing_request_closed_success(self):
+        user_1 = AccountFactory.create()
+        with delete_after(user_1):
+            with self.captureOnCommitCallbacks(execute=True):
+                debt = self._create_debt(self.user, user_1, '10')
+                CreateClosedDebtRequestService(debt_id=debt.id, creator=user_1).close_as_debtor()
+            self.assertEqual(selectors.get_debts_summary(self.user)['balance'], Decimal('10'))
+            version = CollectionVersion(COLLECTION_DEBTS, self.user.id).get()
+            debt.refresh_from_db()
+
+            # as admin `close_debt` action does
+            with self.captureOnCommitCallbacks(execute=True):
+                ClosedDebtRequest.objects.get(pk=debt.closed_request_id).close()
+
+            self.assertEqual(selectors.get_debts_summary(self.user)['balance'], Decimal('0'))
+            self.assertNotEqual(CollectionVersion(COLLECTION_DEBTS, self.user.id).get(), version)
+
+    def test_summary_invalidated_once_per_change_success(self):
+        user_1 = AccountFactory.create()
+        with delete_after(user_1):
+            debts = [self._create_debt(self.user, user_1, '10') for _ in range(4)]
+            debt_requests = DebtRequestFactory.create_batch(
+                size=2,
+                creator=user_1,
+                creditor=user_1,
+                debtor=self.user,
+            )
+            def pay(money: str) -> None:
+                CreateDebtPaymentService(debts[0].id, self.user, Decimal(money)).create_payment()
+
+            changes = [
+                lambda: pay('1'),
+                lambda: pay('9'),
+                lambda: CreateClosedDebtRequestService(debts[1].id, user_1).close_as_debtor(),
+                lambda: CreateClosedDebtRequestService(debts[2].id, self.user).close_as_creditor(),
+                lambda: DebtRequestUpdateStatusService(
+                    debt_request_id=debt_requests[0].id,
+                    status=constants.STATUS_ACCEPT,
+                    creator=self.user,
+                ).update_debt_request(),
+                lambda: BulkDebtRequestUpdateStatusService(
+                    debt_request_ids=[debt_requests[1].id],
+                    status=constants.STATUS_ACCEPT,
+                    creator=self.user,
+                ).update_debt_requests(),
+                lambda: CloseCommonDebtsService(self.user, user_1.id).close_common_debts(),
+            ]
+
+            for change in changes:
+                patched = mock.patch.object(CollectionVersion, 'bump', wraps=CollectionVersion.bump)
+                with patched as bump, self.captureOnCommitCallbacks(execute=True):
+                    change()
+                collections = [call.args[0] for call in bump.call_args_list]
+                self.assertEqual(collections.count(COLLECTION_DEBTS), 1)
+
+
+class SplitDebtRequestTestCase(DefaultAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = Account.objects.create_user(username='test_user_1', password='test_user_1')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def test_split_money_remainder_success(self):
+        self.assertEqual(
+            split_money(Decimal('100'), [Decimal(1)] * 3),
+            [Decimal('33.34'), Decimal('33.33'), Decimal('33.33')],
+        )
+        self.assertEqual(
+            split_money(Decimal('10'), [Decimal(1), Decimal(2)]),
+            [Decimal('3.33'), Decimal('6.67')],
+        )
+        self.assertEqual(
+            split_money(Decimal('0.02'), [Decimal(1)] * 3),
+            [Decimal('0.01'), Decimal('0.01'), Decimal('0')],
+        )
+
+    def test_split_equal_success(self):
+        user_1, user_2 = AccountFactory.create_batch(size=2)
+        self.user.friends.add(user_1, user_2)
+
+        with delete_after(user_1), delete_after(user_2):
+            response = self.client.post(
+                reverse('debts:debts_requests_split'),
+                data={
+                    'money': '100',
+                    'description': 'dinner',
+                    'split': 'equal',
+                    'participants': [
+                        {'account_id': user_1.id},
+                        {'account_id': self.user.id},
+                        {'account_id': user_2.id},
+                    ],
+                },
+                format='json',
+            )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(len(response.data), 2)
+
+            debt_requests = DebtRequest.objects.filter(creditor=self.user)
+            self.assertEqual(
+                {(debt_request.debtor_id, debt_request.money) for debt_request in debt_requests},
+                {(user_1.id, Decimal('33.34')), (user_2.id, Decimal('33.33'))},
+            )
+            for debt_request in debt_requests:
+                self.assertEqual(debt_request.creator, self.user)
+                self.assertEqual(debt_request.description, 'dinner')
+                self.assertTrue(debt_request.is_active)
+
+    def test_split_shares_success(self):
+        user_1, user_2 = AccountFactory.create_batch(size=2)
+        self.user.friends.add(user_1, user_2)
+
+        with delete_after(user_1), delete_after(user_2):
+            response = self.client.post(
+                reverse('debts:debts_requests_split'),
+                data={
+                    'money': '60',
+                    'split': 'shares',
+                    'participants': [
+                        {'account_id': user_1.id, 'share': '1'},
+                        {'account_id': user_2.id, 'share': '2'},
+                    ],
+                },
+                format='json',
+            )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(
+                DebtRequest.objects.get(debtor=user_1).money,
+                Decimal('20'),
+            )
+            self.assertEqual(
+                DebtRequest.objects.get(debtor=user_2).money,
+                Decimal('40'),
+            )
+
+    def test_split_exact_wrong_sum_failed(self):
+        user_1, user_2 = AccountFactory.create_batch(size=2)
+        self.user.friends.add(user_1, user_2)
+
+        with delete_after(user_1), delete_after(user_2):
+            response = self.client.post(
+                reverse('debts:debts_requests_split'),
+                data={
+                    'money': '60',
+                    'split': 'exact',
+                    'participants': [
+                        {'account_id': user_1.id, 'share': '10'},
+                        {'account_id': user_2.id, 'share': '20'},
+                    ],
+                },
+                format='json',
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertFalse(DebtRequest.objects.filter(creditor=self.user).exists())
+
+    def test_split_with_not_friend_failed(self):
+        user_1, user_2 = AccountFactory.create_batch(size=2)
+        self.user.friends.add(user_1)
+
+        with delete_after(user_1), delete_after(user_2):
+            response = self.client.post(
+                reverse('debts:debts_requests_split'),
+                data={
+                    'money': '60',
+                    'split': 'equal',
+                    'participants': [
+                        {'account_id': user_1.id},
+                        {'account_id': user_2.id},
+                    ],
+                },
+                format='json',
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertFalse(DebtRequest.objects.filter(creditor=self.user).exists())
+
+    def test_split_notifications_sent_once_success(self):
+        users = AccountFactory.create_batch(size=3)
+        self.user.friends.add(*users)
+
+        with contextlib.ExitStack() as stack:
+            for user in users:
+                stack.enter_context(delete_after(user))
+
+            with self.restore_signals(), self.patch_send_notifications_service() as mocked_send:
+                response = self.client.post(
+                    reverse('debts:debts_requests_split'),
+                    data={
+                        'money': '90',
+                        'split': 'equal',
+                        'participants': [{'account_id': user.id} for user in users],
+                    },
+                    format='json',
+                )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+            self.assertEqual(mocked_send._mocked.call_count, 1)
+            events = mocked_send.get_last_events()
+            self.assertEqual(len(events), 3)
+            self.assertEqual({event.to_user_id for event in events}, {user.id for user in users})
+            for event in events:
+                self.assertEqual(event.event_type, EVENT_CREATED)
+                self.assertEqual(event.event_data['object']['money'], '30.00')
+
+
+class DebtBalanceTestCase(DefaultAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = Account.objects.create_user(username='test_user_1', password='test_user_1')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def test_balance_updated_on_debt_create_and_close_success(self):
+        user_1 = AccountFactory.create()
+        with delete_after(user_1):
+            lent = Debt.create_from_request(DebtRequestFactory.create(
+                creator=self.user,
+                creditor=self.user,
+                debtor=user_1,
+                money=Decimal('100.50'),
+            ))
+            Debt.create_from_request(DebtRequestFactory.create(
+                creator=self.user,
+                creditor=user_1,
+                debtor=self.user,
+                money=Decimal('30.25'),
+            ))
+
+            self.assertEqual(selectors.get_balance(self.user, user_1), Decimal('70.25'))
+            self.assertEqual(selectors.get_balance(user_1, self.user), Decimal('-70.25'))
+
+            lent.close_debt()
+            # closing already closed debt must not change balance twice
+            lent.closed_request.close()
+
+            self.assertEqual(selectors.get_balance(self.user, user_1), Decimal('-30.25'))
+            self.assertEqual(selectors.get_balance(user_1, self.user), Decimal('30.25'))
+
+    def test_admin_cant_bypass_balance_failure(self):
+        admin_user = Account.objects.create_superuser(username='admin', password='admin')
+        debt = DebtFactory.create(creditor=self.user)
+        self.client.force_login(admin_user)
+
+        response = self.client.get(reverse('admin:debts_debt_add'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        response = self.client.get(reverse('admin:debts_debt_change', args=(debt.id,)))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotContains(response, 'name="money"')
+        self.assertContains(response, 'name="description"')
+
+    def test_balance_without_debts_success(self):
+        user_1 = AccountFactory.create()
+        with delete_after(user_1):
+            self.assertEqual(selectors.get_balance(self.user, user_1), Decimal('0'))
+
+    def test_list_of_balances_success(self):
+        user_1 = AccountFactory.create()
+        user_2 = AccountFactory.create()
+        with delete_after(user_1), delete_after(user_2):
+            Debt.create_from_request(DebtRequestFactory.create(
+                creator=self.user,
+                creditor=self.user,
+                debtor=user_1,
+                money=Decimal('10'),
+            ))
+            Debt.create_from_request(DebtRequestFactory.create(
+                creator=self.user,
+                creditor=user_2,
+                debtor=self.user,
+                money=Decimal('5'),
+            ))
+
+            response = self.client.get(reverse('debts:debts_balances'))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            self.assertEqual(len(response.data), 2)
+            self.assertEqual(response.data[0]['counterparty']['id'], str(user_1.id))
+            self.assertEqual(response.data[0]['balance'], '10.00')
+            self.assertEqual(response.data[1]['counterparty']['id'], str(user_2.id))
+            self.assertEqual(response.data[1]['balance'], '-5.00')
+
+
+class SettleUpTestCase(DefaultAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = Account.objects.create_user(username='test_user_1', password='test_user_1')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def test_minimize_transfers_chain_success(self):
+        user_1, user_2, user_3 = AccountFactory.build_batch(size=3)
+        # user_1 owes user_2 10, user_2 owes user_3 10
+        transfers = minimize_transfers({
+            user_1.id: Decimal('-10'),
+            user_2.id: Decimal('0'),
+            user_3.id: Decimal('10'),
+        })
+
+        self.assertEqual(len(transfers), 1)
+        self.assertEqual(transfers[0].debtor_id, user_1.id)
+        self.assertEqual(transfers[0].creditor_id, user_3.id)
+        self.assertEqual(transfers[0].money, Decimal('10'))
+
+    def test_minimize_transfers_clears_positions_success(self):
+        rnd = random.Random(42)
+        accounts = AccountFactory.build_batch(size=50)
+        positions = {account.id: Decimal('0') for account in accounts}
+        for _ in range(200):
+            creditor, debtor = rnd.sample(accounts, 2)
+            debt = DebtFactory.build(creditor=creditor, debtor=debtor)
+            positions[creditor.id] += debt.money
+            positions[debtor.id] -= debt.money
+
+        transfers = minimize_transfers(positions)
+
+        self.assertLess(len(transfers), len(positions))
+        for transfer in transfers:
+            self.assertGreater(transfer.money, 0)
+            positions[transfer.debtor_id] += transfer.money
+            positions[transfer.creditor_id] -= transfer.money
+        self.assertTrue(all(position == 0 for position in positions.values()))
+
+    def test_settle_up_through_friends_network_success(self):
+        user_1 = AccountFactory.create()
+        user_2 = AccountFactory.create()
+        stranger = AccountFactory.create()
+        self.user.friends.add(user_1)
+        user_1.friends.add(user_2)
+
+        with delete_after(user_1), delete_after(user_2), delete_after(stranger):
+            Debt.create_from_request(DebtRequestFactory.create(
+                creator=self.user, creditor=user_1, debtor=self.user, money=Decimal('10'),
+            ))
+            Debt.create_from_request(DebtRequestFactory.create(
+                creator=user_1, creditor=user_2, debtor=user_1, money=Decimal('10'),
+            ))
+            Debt.create_from_request(DebtRequestFactory.create(
+                creator=stranger, creditor=stranger, debtor=self.user, money=Decimal('5'),
+            ))
+
+            response = self.client.get(reverse('debts:debts_settle_up'))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            self.assertEqual(len(response.data), 1)
+            transfer = response.data[0]
+            self.assertEqual(transfer['debtor']['id'], str(self.user.id))
+            self.assertEqual(transfer['creditor']['id'], str(user_2.id))
+            self.assertEqual(transfer['money'], '10.00')
+
+
+class DebtQueryPlanTestCase(TestCase):
+    """
+    Tiny test tables are always cheaper to scan sequentially,
+    so seq/bitmap scans are disabled to see whether indexes are usable at all.
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = AccountFactory.create()
+        DebtFactory.create_batch(debtor=self.user, size=5)
+        DebtFactory.create_batch(creditor=self.user, size=5)
+        DebtRequestFactory.create_batch(debtor=self.user, creator=self.user, size=5)
+        DebtRequestFactory.create_batch(creditor=self.user, creator=self.user, size=5)
+        self.position = [
+            '2100-01-01T00:00:00+00:00',
+            '00000000-0000-0000-0000-000000000000',
+        ]
+
+    def test_related_debts_page_uses_indexes_success(self):
+        page = KeysetPagination().get_page_queryset(
+            selectors.get_related_debts_by_role(self.user),
+            self.position,
+            page_size=10,
+        )
+        scans = self.get_plan_scans(page)
+
+        self.assertEqual(
+            {
+                (scan['Node Type'], scan.get('Index Name'))
+                for scan in scans if scan['Relation Name'] == 'debts_debt'
+            },
+            {
+                ('Index Scan', 'debt_debtor_created_idx'),
+                ('Index Scan', 'debt_creditor_created_idx'),
+            },
+        )
+        self.assertNotIn('Seq Scan', [scan['Node Type'] for scan in scans])
+
+    def test_active_debts_page_uses_indexes_success(self):
+        page = KeysetPagination().get_page_queryset(
+            selectors.get_related_debts_by_role(self.user, only_active=True),
+            self.position,
+            page_size=10,
+        )
+        scans = self.get_plan_scans(page)
+
+        self.assertEqual(
+            {
+                (scan['Node Type'], scan.get('Index Name'))
+                for scan in scans if scan['Relation Name'] == 'debts_debt'
+            },
+            {
+                ('Index Scan', 'debt_active_debtor'),
+                ('Index Scan', 'debt_active_creditor'),
+            },
+        )
+        self.assertNotIn('Seq Scan', [scan['Node Type'] for scan in scans])
+
+    def test_active_debt_requests_page_uses_indexes_success(self):
+        page = KeysetPagination().get_page_queryset(
+            selectors.get_active_debt_requests_by_role(self.user),
+            self.position,
+            page_size=10,
+        )
+        scans = self.get_plan_scans(page)
+
+        self.assertEqual(
+            {
+                (scan['Node Type'], scan.get('Index Name'))
+                for scan in scans if scan['Relation Name'] == 'debts_debtrequest'
+            },
+            {
+                ('Index Scan', 'debtrequest_pending_debtor'),
+                ('Index Scan', 'debtrequest_pending_creditor'),
+            },
+        )
+        self.assertNotIn('Seq Scan', [scan['Node Type'] for scan in scans])
+
+    def test_search_uses_indexes_success(self):
+        search = selectors.search_debts(self.user, 'pizza', limit=10)
+        with connection.cursor() as cursor:
+            # trigram indexes are read by bitmap scans, so only seq scans are disabled
+            cursor.execute("SET enable_seqscan = off")
+            try:
+                plan = json.loads(search.explain(format='json'))[0]['Plan']
+            finally:
+                cursor.execute("RESET enable_seqscan")
+
+        self.assertNotIn('Seq Scan', [node['Node Type'] for node in self._walk(plan)])
+
+    def get_plan_scans(self, queryset: QuerySet) -> List[dict]:
+        with self.scans_only_by_index():
+            plan = json.loads(queryset.explain(format='json'))[0]['Plan']
+
+        nodes = list(self._walk(plan))
+        # parts are merged in index order, no sort of the whole user's history
+        self.assertNotIn('Sort', [node['Node Type'] for node in nodes])
+        return [node for node in nodes if 'Relation Name' in node]
+
+    @staticmethod
+    @contextlib.contextmanager
+    def scans_only_by_index():
+        with connection.cursor() as cursor:
+            cursor.execute("SET enable_seqscan = off; SET enable_bitmapscan = off")
+            try:
+                yield
+            finally:
+                cursor.execute("RESET enable_seqscan; RESET enable_bitmapscan")
+
+    def _walk(self, node: dict) -> Iterator[dict]:
+        yield node
+        for child in node.get('Plans', []):
+            yield from self._walk(child)
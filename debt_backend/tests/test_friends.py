@@ -1,8 +1,17 @@
+import datetime
+import io
+from unittest import mock
+
+from django.core.management import call_command
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from accounts.models import Account, FriendRequest
+from accounts import selectors
+from accounts.friend_ids import FriendIds
+from accounts.friend_suggestions import FriendSuggestions
+from accounts.models import Account, FriendRequest, Friendship
 from tests.base import DefaultAPITestCase
 from tests.factories import delete_after, FriendRequestFactory, AccountFactory
 
@@ -48,6 +57,15 @@ class FriendRequestTestCase(DefaultAPITestCase):
             self.assertEqual(str(fr.from_user_id), data_fr['from_user']['id'])
             self.assertEqual(str(fr.to_user_id), data_fr['to_user']['id'])
 
+    def test_request_list_query_count_success(self):
+        FriendRequestFactory.create_batch(to_user=self.user, size=10)
+
+        # authentication, friend requests with both users
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('accounts:friend_requests'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 10)
+
     def test_request_create_second_time_pseudo_success(self):
         user_1 = Account.objects.create_user(username='test_user_2', password='test_user_2')
         with delete_after(user_1):
@@ -134,6 +152,53 @@ class FriendRequestTestCase(DefaultAPITestCase):
                 FriendRequest.objects.filter(pk=friend_request.id).exists()
             )
 
+    def test_request_bulk_send_success(self):
+        new_users = AccountFactory.create_batch(size=3)
+        friend, requested = AccountFactory.create_batch(size=2)
+        self.user.friends.add(friend)
+        FriendRequestFactory.create(from_user=self.user, to_user=requested)
+
+        # authentication, users to send requests to, requests
+        with self.assertNumQueries(3):
+            response = self.client.post(
+                reverse('accounts:friend_requests_bulk'),
+                data={'usernames': [
+                    *(user.username for user in new_users),
+                    friend.username,
+                    requested.username,
+                    self.user.username,
+                    'UNKNOWN_USER___',
+                ]},
+                format='json',
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(
+            set(
+                FriendRequest.objects
+                .filter(from_user=self.user)
+                .values_list('to_user', flat=True)
+            ),
+            {*(user.id for user in new_users), requested.id},
+        )
+
+    def test_request_bulk_send_unknown_users_pseudo_success(self):
+        response = self.client.post(
+            reverse('accounts:friend_requests_bulk'),
+            data={'usernames': ['UNKNOWN_USER___', 'UNKNOWN_USER___2']},
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(FriendRequest.objects.filter(from_user=self.user).exists())
+
+    def test_request_bulk_send_empty_failure(self):
+        response = self.client.post(
+            reverse('accounts:friend_requests_bulk'),
+            data={'usernames': []},
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class FriendTestCase(DefaultAPITestCase):
     def setUp(self) -> None:
@@ -156,3 +221,265 @@ class FriendTestCase(DefaultAPITestCase):
         self.assertEqual(len(friends), len(friends_data))
         for friend, friend_data in zip(friends, friends_data):
             self.assertEqual(str(friend.id), friend_data['id'])
+
+    def test_friend_list_query_count_success(self):
+        self.user.friends.set(AccountFactory.create_batch(size=10))
+
+        # authentication, friends
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('accounts:friends'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 10)
+
+    def test_friend_list_not_modified_success(self):
+        user_1 = AccountFactory.create()
+        with delete_after(user_1):
+            response = self.client.get(reverse('accounts:friends'))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            etag = response['ETag']
+
+            # only authentication query
+            with self.assertNumQueries(1):
+                response = self.client.get(reverse('accounts:friends'), HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+            friend_request = FriendRequestFactory.create(from_user=user_1, to_user=self.user)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.patch(
+                    reverse('accounts:friend_requests'),
+                    data={'status': 'accept', 'friend_request_id': friend_request.id},
+                )
+
+            response = self.client.get(reverse('accounts:friends'), HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(response['ETag'], etag)
+            self.assertEqual(len(response.data), 1)
+
+    def test_friend_list_pagination_success(self):
+        friends = AccountFactory.create_batch(size=7)
+        self.user.friends.set(friends)
+        now = timezone.now()
+        for i, friend in enumerate(friends):
+            Friendship.objects.filter(from_account=self.user, to_account=friend).update(
+                created_at=now + datetime.timedelta(minutes=i),
+            )
+
+        pages = list(self.iterate_pages(f"{reverse('accounts:friends')}?page_size=3"))
+
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(
+            [friend['id'] for page in pages for friend in page],
+            [str(friend.id) for friend in reversed(friends)],
+        )
+
+    def test_friend_list_username_prefix_success(self):
+        matched = [AccountFactory.create(username=f'alice_{i}') for i in range(3)]
+        self.user.friends.set([*matched, AccountFactory.create(username='bob_alice')])
+        AccountFactory.create(username='alice_stranger')
+
+        response = self.client.get(reverse('accounts:friends'), data={'username': 'alice_'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            {friend['id'] for friend in response.data},
+            {str(friend.id) for friend in matched},
+        )
+
+
+class FriendIdsTestCase(DefaultAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = Account.objects.create_user(username='test_user_1', password='test_user_1')
+        self.friend = AccountFactory.create()
+        self.user.friends.add(self.friend)
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def test_are_friends_loaded_once_success(self):
+        stranger = AccountFactory.create()
+
+        with self.assertNumQueries(1):
+            self.assertTrue(selectors.are_friends(self.user, self.friend.id))
+        with self.assertNumQueries(0):
+            self.assertTrue(selectors.are_friends(self.user, self.friend.id))
+            self.assertFalse(selectors.are_friends(self.user, stranger.id))
+            self.assertEqual(selectors.get_friend_ids(self.user), {self.friend.id})
+
+    def test_are_friends_without_friends_success(self):
+        lonely = AccountFactory.create()
+        with self.assertNumQueries(1):
+            self.assertEqual(selectors.get_friend_ids(lonely), set())
+        with self.assertNumQueries(0):
+            self.assertFalse(selectors.are_friends(lonely, self.user.id))
+
+    def test_accepted_friend_is_added_success(self):
+        user_1 = AccountFactory.create()
+        self.assertFalse(selectors.are_friends(self.user, user_1.id))
+        self.assertFalse(selectors.are_friends(user_1, self.user.id))
+
+        friend_request = FriendRequestFactory.create(from_user=user_1, to_user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                reverse('accounts:friend_requests'),
+                data={'status': 'accept', 'friend_request_id': friend_request.id},
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            self.assertTrue(selectors.are_friends(self.user, user_1.id))
+            self.assertTrue(selectors.are_friends(user_1, self.user.id))
+
+    def test_remove_friend_success(self):
+        self.assertTrue(selectors.are_friends(self.user, self.friend.id))
+        self.assertTrue(selectors.are_friends(self.friend, self.user.id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(
+                reverse('accounts:friend_detail', kwargs={'friend_id': self.friend.id}),
+            )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.assertFalse(self.user.friends.filter(pk=self.friend.id).exists())
+        self.assertFalse(selectors.are_friends(self.user, self.friend.id))
+        self.assertFalse(selectors.are_friends(self.friend, self.user.id))
+
+    def test_remove_not_friend_failure(self):
+        stranger = AccountFactory.create()
+
+        response = self.client.delete(
+            reverse('accounts:friend_detail', kwargs={'friend_id': stranger.id}),
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_load_racing_with_remove_is_not_cached_success(self):
+        get_from_database = FriendIds._get_from_database
+
+        def get_before_remove(friend_ids: FriendIds):
+            friends = get_from_database(friend_ids)
+            # friend is removed and sets are dropped after commit while load is running
+            Account.friends.through.objects \
+                .filter(from_account=self.user, to_account=self.friend) \
+                .delete()
+            FriendIds._drop([FriendIds(self.user.id)])
+            return friends
+
+        with mock.patch.object(FriendIds, '_get_from_database', get_before_remove):
+            self.assertTrue(selectors.are_friends(self.user, self.friend.id))
+
+        self.assertFalse(selectors.are_friends(self.user, self.friend.id))
+
+    def test_repair_friend_ids_command_success(self):
+        stranger = AccountFactory.create()
+        selectors.are_friends(self.user, self.friend.id)
+        selectors.are_friends(stranger, self.user.id)
+        # friendship changed bypassing `m2m_changed`
+        Account.friends.through.objects.filter(from_account=self.user).delete()
+        Account.friends.through.objects.create(from_account=stranger, to_account=self.user)
+
+        output = io.StringIO()
+        call_command('repair_friend_ids', stdout=output)
+
+        self.assertIn(f"Repaired: {self.user.id}", output.getvalue())
+        self.assertIn(f"Repaired: {stranger.id}", output.getvalue())
+        with self.assertNumQueries(0):
+            self.assertFalse(selectors.are_friends(self.user, self.friend.id))
+            self.assertTrue(selectors.are_friends(stranger, self.user.id))
+        self.assertFalse(FriendIds(self.user.id).repair())
+
+        output = io.StringIO()
+        call_command('repair_friend_ids', stdout=output)
+        self.assertIn("repaired: 0", output.getvalue())
+
+
+class FriendSuggestionsTestCase(DefaultAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = Account.objects.create_user(username='test_user_1', password='test_user_1')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+        # user - friend_1 - (candidate_1, candidate_2), user - friend_2 - candidate_1
+        (
+            self.friend_1, self.friend_2, self.candidate_1, self.candidate_2,
+        ) = AccountFactory.create_batch(size=4)
+        self.user.friends.add(self.friend_1, self.friend_2)
+        self.friend_1.friends.add(self.candidate_1, self.candidate_2)
+        self.friend_2.friends.add(self.candidate_1)
+
+    def _accept(self, from_user: Account, to_user: Account) -> None:
+        friend_request = FriendRequestFactory.create(from_user=from_user, to_user=to_user)
+        refresh = RefreshToken.for_user(to_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                reverse('accounts:friend_requests'),
+                data={'status': 'accept', 'friend_request_id': friend_request.id},
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_refresh_command_success(self):
+        output = io.StringIO()
+        call_command('refresh_friend_suggestions', stdout=output)
+        self.assertIn(f"Refreshed: {Account.objects.count()}", output.getvalue())
+
+        self.assertEqual(
+            FriendSuggestions(self.user.id).get(),
+            [(self.candidate_1.id, 2), (self.candidate_2.id, 1)],
+        )
+        self.assertEqual(
+            set(FriendSuggestions(self.candidate_2.id).get()),
+            {(self.user.id, 1), (self.candidate_1.id, 1)},
+        )
+
+    def test_suggestion_list_success(self):
+        FriendSuggestions.refresh()
+
+        # authentication, suggested accounts
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('accounts:friend_suggestions'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                (friend['id'], friend['username'], friend['mutual_friends'])
+                for friend in response.data
+            ],
+            [
+                (str(self.candidate_1.id), self.candidate_1.username, 2),
+                (str(self.candidate_2.id), self.candidate_2.username, 1),
+            ],
+        )
+
+    def test_suggestion_list_without_suggestions_success(self):
+        response = self.client.get(reverse('accounts:friend_suggestions'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
+
+    def test_accepted_request_updates_suggestions_success(self):
+        newcomer = AccountFactory.create()
+        self.candidate_1.friends.add(newcomer)
+        FriendSuggestions.refresh()
+
+        self._accept(self.candidate_1, self.user)
+        self._accept(newcomer, self.friend_2)
+
+        accounts = [
+            self.user, self.friend_1, self.friend_2, self.candidate_1, self.candidate_2, newcomer,
+        ]
+        incremental = {account.id: FriendSuggestions(account.id).get() for account in accounts}
+        self.assertEqual(incremental[self.user.id], [(newcomer.id, 2), (self.candidate_2.id, 1)])
+
+        FriendSuggestions.refresh()
+        self.assertEqual(
+            incremental,
+            {account.id: FriendSuggestions(account.id).get() for account in accounts},
+        )
+
+    def test_suggestions_are_trimmed_success(self):
+        candidates = AccountFactory.create_batch(size=3)
+        with mock.patch('accounts.constants.FRIEND_SUGGESTIONS_SIZE', 2):
+            self.friend_1.friends.add(*candidates)
+            self.friend_2.friends.add(candidates[0])
+            FriendSuggestions.refresh()
+            self.assertEqual(len(FriendSuggestions(self.user.id).get()), 2)
+
+            self._accept(AccountFactory.create(), self.friend_1)
+            self.assertEqual(len(FriendSuggestions(self.user.id).get()), 2)
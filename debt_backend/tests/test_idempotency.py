@@ -0,0 +1,141 @@
+import uuid
+from unittest import mock
+
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import Account, FriendRequest
+from debts.models import DebtRequest
+from idempotency import IdempotentResponse
+from tests.base import DefaultAPITestCase
+from tests.factories import AccountFactory
+
+
+class IdempotencyKeyTestCase(DefaultAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = Account.objects.create_user(username='test_user_1', password='test_user_1')
+        self.friend = AccountFactory.create()
+        self.user.friends.add(self.friend)
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.key = str(uuid.uuid4())
+        self.debt_request = {
+            'money': '1200',
+            'creditor_id': str(self.user.id),
+            'debtor_id': str(self.friend.id),
+            'description': 'description',
+        }
+
+    def _post_debt_request(self, data: dict, key: str = None):
+        headers = {} if key is None else {'HTTP_IDEMPOTENCY_KEY': key}
+        return self.client.post(reverse('debts:debts_requests'), data=data, **headers)
+
+    def test_debt_request_retry_success(self):
+        response = self._post_debt_request(self.debt_request, self.key)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('Idempotent-Replayed', response)
+
+        with mock.patch('debts.api.debt_requests.CreateDebtRequestService') as service:
+            response = self._post_debt_request(self.debt_request, self.key)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response['Idempotent-Replayed'], 'true')
+        self.assertFalse(service.called)
+        self.assertEqual(DebtRequest.objects.filter(creditor=self.user).count(), 1)
+
+    def test_debt_request_without_key_success(self):
+        self._post_debt_request(self.debt_request)
+        self._post_debt_request(self.debt_request)
+
+        self.assertEqual(DebtRequest.objects.filter(creditor=self.user).count(), 2)
+
+    def test_debt_request_new_key_success(self):
+        self._post_debt_request(self.debt_request, self.key)
+        self._post_debt_request(self.debt_request, str(uuid.uuid4()))
+
+        self.assertEqual(DebtRequest.objects.filter(creditor=self.user).count(), 2)
+
+    def test_key_of_another_user_success(self):
+        self._post_debt_request(self.debt_request, self.key)
+
+        refresh = RefreshToken.for_user(self.friend)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        response = self._post_debt_request(self.debt_request, self.key)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('Idempotent-Replayed', response)
+
+        self.assertEqual(DebtRequest.objects.filter(creditor=self.user).count(), 2)
+
+    def test_key_reused_for_another_request_failure(self):
+        self._post_debt_request(self.debt_request, self.key)
+
+        response = self._post_debt_request({**self.debt_request, 'money': '1300'}, self.key)
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(DebtRequest.objects.filter(creditor=self.user).count(), 1)
+
+    def test_failed_request_is_not_stored_success(self):
+        stranger = AccountFactory.create()
+        data = {**self.debt_request, 'debtor_id': str(stranger.id)}
+
+        response = self._post_debt_request(data, self.key)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.friends.add(stranger)
+        response = self._post_debt_request(data, self.key)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(DebtRequest.objects.filter(debtor=stranger).exists())
+
+    def test_key_too_long_failure(self):
+        response = self._post_debt_request(self.debt_request, 'k' * 256)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(DebtRequest.objects.exists())
+
+    def test_request_in_progress_failure(self):
+        request = mock.Mock(user=self.user, method='POST', path='', data={})
+        lock = IdempotentResponse(request, 'debt_requests', self.key).lock()
+        self.assertTrue(lock.acquire())
+        try:
+            with mock.patch('idempotency.IDEMPOTENCY_LOCK_WAIT', 0.1):
+                response = self._post_debt_request(self.debt_request, self.key)
+        finally:
+            lock.release()
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(DebtRequest.objects.exists())
+
+    def test_duplicate_waited_for_first_request_success(self):
+        self._post_debt_request(self.debt_request, self.key)
+
+        get = IdempotentResponse.get
+        calls = []
+
+        def get_after_first_request(idempotent_response):
+            # response isn't stored yet when duplicate comes, but is stored under lock
+            calls.append(idempotent_response)
+            return None if len(calls) == 1 else get(idempotent_response)
+
+        with mock.patch.object(IdempotentResponse, 'get', get_after_first_request):
+            response = self._post_debt_request(self.debt_request, self.key)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response['Idempotent-Replayed'], 'true')
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(DebtRequest.objects.filter(creditor=self.user).count(), 1)
+
+    def test_friend_request_retry_success(self):
+        to_user = AccountFactory.create()
+
+        for _ in range(2):
+            response = self.client.post(
+                reverse('accounts:friend_requests'),
+                data={'username': to_user.username},
+                HTTP_IDEMPOTENCY_KEY=self.key,
+            )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(response['Idempotent-Replayed'], 'true')
+        self.assertEqual(
+            FriendRequest.objects.filter(from_user=self.user, to_user=to_user).count(), 1,
+        )
@@ -0,0 +1,174 @@
+import datetime
+import io
+
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.reverse import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import Account
+from notifications import selectors
+from notifications.constants import EVENT_STATUS_UPDATED
+from notifications.models import Notification
+from notifications.serializers import OutputNotificationSerializer
+from notifications.serializers.debts import DebtRequestEventStatusUpdatedSerializer
+from tests.base import DefaultAPITestCase
+from tests.factories import DebtRequestFactory, NotificationFactory
+
+
+class NotificationTestCase(DefaultAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = Account.objects.create_user(username='test_user_1', password='test_user_1')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def test_list_of_notifications_query_count_success(self):
+        NotificationFactory.create_batch(to_user=self.user, size=10)
+
+        # authentication, notifications
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('notifications:notifications'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 10)
+
+    def test_list_of_unread_notifications_query_count_success(self):
+        NotificationFactory.create_batch(to_user=self.user, size=5)
+        NotificationFactory.create_batch(to_user=self.user, is_read=True, size=5)
+
+        # authentication, notifications
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('notifications:notifications_unread'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 5)
+
+    def test_list_of_notifications_same_as_model_serializer_success(self):
+        NotificationFactory.create_batch(to_user=self.user, size=2)
+        debt_request = DebtRequestFactory.create(
+            creditor=self.user, creator=self.user, description='\u00e9\u2028',
+        )
+        NotificationFactory.create(
+            to_user=self.user,
+            event_type=EVENT_STATUS_UPDATED,
+            event_data=DebtRequestEventStatusUpdatedSerializer({
+                'object': debt_request,
+                'status': 'decline',
+            }).data,
+        )
+
+        for url_name, notifications in (
+                ('notifications:notifications', selectors.get_all_notifications(self.user)),
+                (
+                    'notifications:notifications_unread',
+                    selectors.get_all_unread_notifications(self.user),
+                ),
+        ):
+            response = self.client.get(reverse(url_name))
+            self.assertEqual(
+                response.content,
+                JSONRenderer().render(OutputNotificationSerializer(notifications, many=True).data),
+            )
+
+    def test_mark_as_read_success(self):
+        unread = NotificationFactory.create_batch(to_user=self.user, size=3)
+
+        response = self.client.patch(
+            reverse('notifications:notifications_unread'),
+            data={'notifications_ids': [notification.id for notification in unread[:2]]},
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            Notification.objects.filter(to_user=self.user, is_read=False).count(),
+            1,
+        )
+
+    def test_list_of_notifications_not_modified_success(self):
+        notifications = NotificationFactory.create_batch(to_user=self.user, size=2)
+
+        for url_name in ('notifications:notifications', 'notifications:notifications_unread'):
+            response = self.client.get(reverse(url_name))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            etag = response['ETag']
+
+            # only authentication query
+            with self.assertNumQueries(1):
+                response = self.client.get(reverse(url_name), HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(response['ETag'], etag)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.patch(
+                    reverse('notifications:notifications_unread'),
+                    data={'notifications_ids': [notifications.pop().id]},
+                    format='json',
+                )
+            response = self.client.get(reverse(url_name), HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class NotificationPartitionTestCase(DefaultAPITestCase):
+    def _get_partitions(self) -> list:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = %s::regclass",
+                [Notification._meta.db_table],
+            )
+            return sorted(partition for partition, in cursor.fetchall())
+
+    def _get_partition(self, notification: Notification) -> str:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT tableoid::regclass::text FROM {Notification._meta.db_table} WHERE id = %s",
+                [notification.id],
+            )
+            partition, = cursor.fetchone()
+        return partition
+
+    def test_create_partitions_success(self):
+        partitions = self._get_partitions()
+
+        output = io.StringIO()
+        call_command('create_notification_partitions', '--months-ahead=5', stdout=output)
+        created = self._get_partitions()
+        # 3 months ahead are created by migration, current month is in legacy partition
+        self.assertEqual(len(created), len(partitions) + 2)
+        self.assertEqual(output.getvalue().count('Created'), 2)
+
+        output = io.StringIO()
+        call_command('create_notification_partitions', '--months-ahead=5', stdout=output)
+        self.assertEqual(self._get_partitions(), created)
+        self.assertEqual(output.getvalue(), '')
+
+    def test_create_partition_of_missed_month_success(self):
+        user = Account.objects.create_user(username='test_user_1', password='test_user_1')
+        notification = NotificationFactory.create(to_user=user)
+        # month after all partitions, as if job missed it
+        missed_month = timezone.now().replace(day=15) + datetime.timedelta(days=31 * 8)
+        Notification.objects.filter(pk=notification.pk).update(created_at=missed_month)
+        default = f'{Notification._meta.db_table}_default'
+        self.assertEqual(self._get_partition(notification), default)
+
+        output = io.StringIO()
+        call_command('create_notification_partitions', '--months-ahead=9', stdout=output)
+
+        partition = f'{Notification._meta.db_table}_p{missed_month:%Y%m}'
+        self.assertIn(f"Created {partition}", output.getvalue())
+        self.assertEqual(self._get_partition(notification), partition)
+        self.assertIn(default, self._get_partitions())
+        self.assertEqual(Notification.objects.get(pk=notification.pk).to_user, user)
+
+    def test_notification_is_routed_to_partition_success(self):
+        user = Account.objects.create_user(username='test_user_1', password='test_user_1')
+        notification = NotificationFactory.create(to_user=user)
+
+        partition = self._get_partition(notification)
+        self.assertIn(partition, self._get_partitions())
+        self.assertNotEqual(partition, f'{Notification._meta.db_table}_default')
+
+        notification.is_read = True
+        notification.save()
+        self.assertTrue(Notification.objects.get(pk=notification.pk).is_read)
@@ -0,0 +1,60 @@
+import datetime
+import json
+import uuid
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
+
+from renderers import ORJSONRenderer
+
+
+class ORJSONRendererTestCase(SimpleTestCase):
+    def assertSameAsJSONRenderer(self, data, accepted_media_type=None):
+        self.assertEqual(
+            ORJSONRenderer().render(data, accepted_media_type),
+            JSONRenderer().render(data, accepted_media_type),
+        )
+
+    def test_render_same_as_json_renderer_success(self):
+        self.assertSameAsJSONRenderer({
+            'id': uuid.uuid4(),
+            'text': 'Café \U0001F4B8 \u2028 \u2029 "quoted" \\ \x00 \x1f \n \t \x7f </script>',
+            'money': '10.00',
+            'decimal': Decimal('10.5'),
+            'utc': datetime.datetime(2022, 1, 2, 3, 4, 5, 123456, tzinfo=datetime.timezone.utc),
+            'offset': datetime.datetime(
+                2022, 1, 2, 3, 4, 5, tzinfo=datetime.timezone(datetime.timedelta(hours=3)),
+            ),
+            'naive': datetime.datetime(2022, 1, 2, 3, 4, 5),
+            'date': datetime.date(2022, 1, 2),
+            'lazy': gettext_lazy("Not found."),
+            'error': [ErrorDetail("Debt request is not active.", code='invalid')],
+            'nested': [{'is_active': True, 'value': None, 'count': 0, 'ratio': 0.5}],
+            'empty': {},
+        })
+
+    def test_render_non_str_keys_success(self):
+        self.assertSameAsJSONRenderer({1: 'one', 2.5: 'half', False: 'no', None: 'none'})
+
+    def test_render_indent_success(self):
+        self.assertSameAsJSONRenderer({'id': 1, 'items': [1, 2]}, 'application/json; indent=4')
+
+    def test_render_none_success(self):
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_render_exponent_float_success(self):
+        data = {'big': 1e16, 'small': 1e-7}
+        rendered = ORJSONRenderer().render(data)
+        # differs from `JSONRenderer` (`1e+16`), but is the same number
+        self.assertEqual(rendered, b'{"big":1e16,"small":1e-7}')
+        self.assertEqual(json.loads(rendered), data)
+
+    def test_render_not_finite_float_success(self):
+        # `JSONRenderer` fails on them under `STRICT_JSON`
+        self.assertEqual(
+            ORJSONRenderer().render({'items': [float('nan'), float('inf'), float('-inf')]}),
+            b'{"items":[null,null,null]}',
+        )